@@ -9,6 +9,7 @@ from pathlib import Path
 from dotenv import load_dotenv
 from .morphological_analyzer import MorphologicalAnalyzer
 from .grammar_db import GrammarDB
+from .grammar_server import DEFAULT_SOCKET_PATH, GrammarDBClient
 from .anthropic_provider import AnthropicProvider
 from .gemini_provider import GeminiProvider
 from .setup_logging import setup_logging
@@ -51,6 +52,12 @@ async def main():
     parser.add_argument("-b", "--base", default="../grammar-base/", help="Шлях да граматычнай базы (па змоўчанні: ../grammar-base/)")
     parser.add_argument("-i", "--input", nargs="*", default=[], help="Шляхі да файлаў для апрацоўкі (падтрымліваецца globbing)")
     parser.add_argument("-o", "--output", help="Шлях для захавання выніку. Калі зададзены некалькі ўваходных файлаў, можа быць тэчкай")
+    parser.add_argument("--workers", type=int, default=1, help="Колькасць працэсаў для індэксацыі граматычнай базы (0 - па колькасці ядраў)")
+    parser.add_argument("--pravapis", type=lambda value: value.split(","), help="Выкарыстоўваць толькі формы гэтых правапісаў праз коску, напрыклад A2008")
+    parser.add_argument("--slouniki", type=lambda value: value.split(","), help="Выкарыстоўваць толькі формы з гэтых слоўнікаў праз коску, напрыклад sbm2012")
+    parser.add_argument(
+        "--grammar-server", nargs="?", const=DEFAULT_SOCKET_PATH, type=Path, help="Выкарыстоўваць запушчаны сервер граматычнай базы (python -m automations.grammar_server) замест загрузкі базы"
+    )
     parser.add_argument("--log-level", default=log_level, help="Узровень лагавання (DEBUG, INFO, WARNING, ERROR, CRITICAL)")
 
     args = parser.parse_args()
@@ -68,10 +75,14 @@ async def main():
         provider = GeminiProvider(model)
 
     logger.info(f"Выкарыстоўваем мадэль {model}")
-    logger.info(f"Індэксацыя граматычнай базы...")
-    grammar_db = GrammarDB()
-    grammar_db.load_directory(Path(args.base))
-    logger.info(f"Індэксацыя граматычнай базы выканана")
+    if args.grammar_server:
+        logger.info(f"Падключэнне да сервера граматычнай базы '{args.grammar_server}'")
+        grammar_db = GrammarDBClient(args.grammar_server)
+    else:
+        logger.info(f"Індэксацыя граматычнай базы...")
+        grammar_db = GrammarDB()
+        grammar_db.load_directory(Path(args.base), workers=args.workers, pravapis=args.pravapis, slouniki=args.slouniki)
+        logger.info(f"Індэксацыя граматычнай базы выканана")
 
     # Ініцыялізуем аналізатар
     analyzer = MorphologicalAnalyzer(grammar_db, provider)
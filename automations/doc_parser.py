@@ -7,13 +7,32 @@ from .linguistic_bits import СorpusDocument, Paragraph, Sentence
 
 
 class DocParser:
-    def __init__(self, reader: Type[DocReader]):
+    def __init__(self, reader: Type[DocReader], fused: bool = True):
+        """
+        Args:
+            reader: Клас чытача дакументаў
+            fused: Разбіваць параграфы на сказы адным праходам Tokenizer.iter_sentences,
+                а не праз токены Tokenizer і Sentencer. Вынік аднолькавы.
+        """
         self.reader = reader()
         self.tokenizer = Tokenizer()
         self.sentencer = Sentencer()
+        self.fused = fused
 
     def parse(self, file_path: str | Path) -> СorpusDocument[SentenceItem]:
-        """Чытае дакумент па шляху і вяртае СorpusDocument з метададзенымі і параграфамі."""
+        """
+        Чытае дакумент па шляху і вяртае СorpusDocument з метададзенымі і параграфамі.
+
+        Параграфы разбіваюцца на сказы генератарамі, таму спіс токенаў параграфа не ствараецца.
+        Але чытач вяртае ўвесь тэкст дакумента, а вынік утрымлівае ўсе сказы, таму памяць
+        усё роўна расце з памерам дакумента.
+
+        Args:
+            file_path: Шлях да дакумента
+
+        Returns:
+            Дакумент з усімі параграфамі і сказамі
+        """
         source_doc = self.reader.read(file_path)
 
         document = СorpusDocument[SentenceItem](
@@ -25,10 +44,12 @@ class DocParser:
 
         # Апрацоўваем кожны параграф
         for paragraph in source_doc.paragraphs:
-            # Токенізуем параграф
-            tokens = self.tokenizer.parse(paragraph)
-            # Разбіваем на сказы
-            sentences = self.sentencer.to_sentences(tokens)
+            if self.fused:
+                # Разбіваем параграф на сказы адразу, без токенаў
+                sentences = self.tokenizer.iter_sentences(paragraph)
+            else:
+                # Токенізуем параграф і адразу разбіваем на сказы, не захоўваючы ўсе токены параграфа
+                sentences = self.sentencer.iter_sentences(self.tokenizer.iter_tokens(paragraph))
             # Ствараем аб'екты Sentence з SentenceItem
             sentence_objects = [Sentence(items=sentence) for sentence in sentences]
             # Дадаем параграф з сказамі
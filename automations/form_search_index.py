@@ -0,0 +1,105 @@
+"""
+Пошук формаў па пачатку слова і па падабенстве для інтэрактыўнага пошуку.
+"""
+
+from bisect import bisect_left
+from typing import Iterable, List, Tuple
+
+
+class FormSearchIndex:
+    """
+    Індэкс нармалізаваных формаў для дапаўнення па прэфіксе і пошуку «магчыма, вы мелі на ўвазе».
+
+    Формы захоўваюцца адным адсартаваным спісам, які працуе як няяўнае прэфікснае дрэва:
+    усе формы з агульным прэфіксам ляжаць побач, а межы такога дыяпазону знаходзяцца бінарным пошукам.
+    Пошук па падабенстве абыходзіць гэтае дрэва з радкамі матрыцы Левенштэйна, агульнымі для агульных
+    прэфіксаў, і цалкам прапускае дыяпазоны, дзе адлегласць ужо перавысіла мяжу. Асобны слоўнік
+    выдаленняў (SymSpell) для поўнай базы заняў бы ў дзясяткі разоў больш памяці, чым сам індэкс.
+    """
+
+    def __init__(self, forms: Iterable[str]):
+        """
+        Args:
+            forms: Нармалізаваныя формы
+        """
+        self._forms = sorted(set(forms))
+
+    def __len__(self) -> int:
+        return len(self._forms)
+
+    def complete_prefix(self, prefix: str, limit: int = 20) -> List[str]:
+        """
+        Формы, што пачынаюцца з прэфікса, у алфавітным парадку.
+
+        Args:
+            prefix: Нармалізаваны прэфікс
+            limit: Максімальная колькасць вынікаў
+
+        Returns:
+            Спіс формаў
+        """
+        result = []
+        index = bisect_left(self._forms, prefix)
+        while index < len(self._forms) and len(result) < limit and self._forms[index].startswith(prefix):
+            result.append(self._forms[index])
+            index += 1
+        return result
+
+    def find_similar(self, word: str, max_distance: int = 2, limit: int = 10) -> List[Tuple[str, int]]:
+        """
+        Формы, адлегласць Левенштэйна да якіх не перавышае max_distance.
+
+        Args:
+            word: Нармалізаванае слова
+            max_distance: Максімальная адлегласць рэдагавання
+            limit: Максімальная колькасць вынікаў
+
+        Returns:
+            Спіс (форма, адлегласць), адсартаваны па адлегласці і па форме
+        """
+        forms = self._forms
+        word_length = len(word)
+        # rows[depth] - радок матрыцы Левенштэйна для першых depth сімвалаў бягучай формы
+        rows = [list(range(word_length + 1))]
+        previous_form = ""
+        matches = []
+
+        index = 0
+        while index < len(forms):
+            form = forms[index]
+
+            # Радкі для агульнага з папярэдняй формай прэфікса ўжо падлічаныя
+            common = 0
+            max_common = min(len(previous_form), len(form), len(rows) - 1)
+            while common < max_common and previous_form[common] == form[common]:
+                common += 1
+            del rows[common + 1 :]
+
+            pruned_depth = None
+            for depth in range(common, len(form)):
+                char = form[depth]
+                previous_row = rows[-1]
+                row = [previous_row[0] + 1]
+                for position in range(1, word_length + 1):
+                    substitution = previous_row[position - 1] + (word[position - 1] != char)
+                    row.append(min(row[position - 1] + 1, previous_row[position] + 1, substitution))
+                rows.append(row)
+                if min(row) > max_distance:
+                    pruned_depth = depth + 1
+                    break
+
+            if pruned_depth is not None:
+                # Ніводная форма з гэтым прэфіксам не падыходзіць, пераскокваем увесь яго дыяпазон
+                prefix = form[:pruned_depth]
+                previous_form = prefix
+                index = bisect_left(forms, prefix[:-1] + chr(ord(prefix[-1]) + 1), index + 1)
+                continue
+
+            distance = rows[-1][word_length]
+            if distance <= max_distance:
+                matches.append((distance, form))
+            previous_form = form
+            index += 1
+
+        matches.sort()
+        return [(form, distance) for distance, form in matches[:limit]]
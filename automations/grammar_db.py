@@ -2,17 +2,173 @@
 Модуль для працы з граматычнай базай.
 """
 
+import hashlib
+import logging
+import os
+import pickle
+import re
+import sys
+import time
+from collections import Counter, OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, replace
 from pathlib import Path
-from typing import Dict, List, Optional, Set, Tuple
+from typing import Any, Callable, Dict, FrozenSet, Iterable, Iterator, List, Mapping, Optional, Set, Tuple, TypeVar
 from lxml import etree
-from functools import reduce
-from .linguistic_bits import ParadigmFormId, LinguisticTag, GrammarInfo
+from functools import lru_cache, reduce
+from .form_search_index import FormSearchIndex
+from .suffix_guesser import SuffixGuess, SuffixGuesser
+from .tag_index import TagIndex
+from .linguistic_bits import ParadigmFormId, LinguisticTag, GrammarInfo, GrammarProperties
 from .normalizer import Normalizer
 
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+@dataclass(slots=True)
+class LookupStats:
+    """Лічыльнікі пакетнага пошуку па ўсіх уваходных словах, уключна з паўторамі."""
+
+    hits: int = 0  # Словы, знойдзеныя ў базе
+    misses: int = 0  # Словы, якіх няма ў базе
+    ambiguous: int = 0  # Знойдзеныя словы без адназначнага разбору, уваходзяць і ў hits
+    unique: int = 0  # Розныя напісанні слоў, кожнае з якіх шукалася толькі адзін раз
+
+    def __str__(self) -> str:
+        return f"знойдзена {self.hits} (неадназначна {self.ambiguous}), не знойдзена {self.misses}, розных {self.unique}"
+
+
+@dataclass(frozen=True, slots=True)
+class GrammarFilter:
+    """
+    Абмежаванне базы правапісам і слоўнікамі. None азначае, што па гэтай прыкмеце абмежавання няма.
+
+    Форма застаецца, калі яе правапіс (уласны ці варыянта) уваходзіць у pravapis, а слоўнікі
+    (уласныя ці варыянта) перасякаюцца з slouniki. Формы без адпаведнага атрыбута адкідаюцца.
+    """
+
+    pravapis: Optional[FrozenSet[str]] = None
+    slouniki: Optional[FrozenSet[str]] = None
+
+    @staticmethod
+    def create(pravapis: Optional[Iterable[str]] = None, slouniki: Optional[Iterable[str]] = None) -> Optional["GrammarFilter"]:
+        """
+        Args:
+            pravapis: Дапушчальныя правапісы, напрыклад ["A2008"]
+            slouniki: Дапушчальныя слоўнікі з slouniki.list, напрыклад ["sbm2012"]
+
+        Returns:
+            Фільтр або None, калі абмежаванняў няма
+        """
+        if pravapis is None and slouniki is None:
+            return None
+        return GrammarFilter(
+            frozenset(item.strip() for item in pravapis) if pravapis is not None else None,
+            frozenset(item.strip() for item in slouniki) if slouniki is not None else None,
+        )
+
+    def combine(self, other: Optional["GrammarFilter"]) -> "GrammarFilter":
+        """Фільтр, які прапускае толькі тое, што прапускаюць абодва фільтры."""
+        if other is None:
+            return self
+
+        def intersect(first: Optional[FrozenSet[str]], second: Optional[FrozenSet[str]]) -> Optional[FrozenSet[str]]:
+            if first is None or second is None:
+                return first if second is None else second
+            return first & second
+
+        return GrammarFilter(intersect(self.pravapis, other.pravapis), intersect(self.slouniki, other.slouniki))
+
+    def accepts(self, variant_pravapis: Optional[str], form_pravapis: Optional[str], variant_slouniki: Optional[str], form_slouniki: Optional[str]) -> bool:
+        """
+        Ці праходзіць форма праз фільтр.
+
+        Args:
+            variant_pravapis: Атрыбут pravapis варыянта
+            form_pravapis: Атрыбут pravapis формы
+            variant_slouniki: Атрыбут slouniki варыянта
+            form_slouniki: Атрыбут slouniki формы
+
+        Returns:
+            True, калі форму трэба пакінуць
+        """
+        if self.pravapis is not None and self.pravapis.isdisjoint(_split_list_attribute(form_pravapis or variant_pravapis)):
+            return False
+        return self.slouniki is None or not self.slouniki.isdisjoint(_split_list_attribute(form_slouniki or variant_slouniki))
+
+    def accepts_properties(self, properties: Mapping[str, Optional[str]]) -> bool:
+        """
+        Ці праходзіць праз фільтр ужо праіндэксаваная форма.
+
+        Args:
+            properties: GrammarInfo.properties
+
+        Returns:
+            True, калі форму трэба пакінуць
+        """
+        return self.accepts(properties["variant_pravapis"], properties["form_pravapis"], properties["variant_slouniki"], properties["form_slouniki"])
+
+    def snapshot_key(self) -> Tuple[Optional[List[str]], Optional[List[str]]]:
+        """Прадстаўленне фільтра для ключа здымка, не залежнае ад парадку элементаў."""
+        return (sorted(self.pravapis) if self.pravapis is not None else None, sorted(self.slouniki) if self.slouniki is not None else None)
+
+
+@dataclass(slots=True)
+class _GrammarIndex:
+    """
+    Усе структуры індэкса GrammarDB разам.
+
+    refresh і filtered будуюць новы аб'ект і падмяняюць ім стары адным прысвойваннем, таму
+    чытач, які ўзяў спасылку на індэкс, бачыць узгодненыя структуры нават падчас падмены.
+    Вытворныя індэксы будуюцца пры першым выкарыстанні і знікаюць разам з індэксам, з якога пабудаваныя.
+    """
+
+    word_forms: Dict[str, List[GrammarInfo]] = field(default_factory=dict)
+    # Гатовыя вынікі infer_grammar_info для кожнай нармалізаванай формы з індэкса
+    inferences: Dict[str, Tuple[Optional[ParadigmFormId], Optional[str], Optional[LinguisticTag]]] = field(default_factory=dict)
+    # Адваротныя індэксы: ідэнтыфікатар парадыгмы -> усе яе формы ў парадку файла,
+    # нармалізаваная лема -> ідэнтыфікатары парадыгмаў
+    paradigms: Dict[int, List[GrammarInfo]] = field(default_factory=dict)
+    lemma_paradigms: Dict[str, List[int]] = field(default_factory=dict)
+    # Ідэнтыфікатар парадыгмы -> (імя файла, байтавы зрух пачатку, байтавы зрух канца) у XML файле
+    paradigm_offsets: Dict[int, Tuple[str, int, int]] = field(default_factory=dict)
+    # Імя XML файла -> шлях да яго, каб чытаць зыходны тэкст парадыгмаў
+    xml_paths: Dict[str, Path] = field(default_factory=dict)
+    # Што даў у індэкс кожны XML файл: нармалізаваныя формы і ідэнтыфікатары парадыгмаў, для refresh
+    file_forms: Dict[str, List[str]] = field(default_factory=dict)
+    file_paradigms: Dict[str, List[int]] = field(default_factory=dict)
+    # Імя XML файла -> (імя, памер, час мадыфікацыі, sha256 або None) на момант індэксацыі
+    fingerprints: Dict[str, Tuple[str, int, int, Optional[str]]] = field(default_factory=dict)
+    # Фільтр правапісу і слоўнікаў, з якім будаваўся індэкс
+    filter: Optional[GrammarFilter] = None
+    # Індэкс для пошуку па прэфіксе і па падабенстве
+    search_index: Optional[FormSearchIndex] = None
+    # Індэкс па пазіцыях граматычных тэгаў
+    tag_index: Optional[TagIndex] = None
+    # Статыстыка канчаткаў для здагадак пра невядомыя словы
+    suffix_guesser: Optional[SuffixGuesser] = None
+    # Апошнія разборы слоў са злучком, якіх няма ў індэксе: слова пасля grammar_db_light_normalize -> (варыянты, вынік infer).
+    # Абмежаваны GrammarDB.COMPOUND_CACHE_SIZE, бо ў доўгім працэсе такіх слоў колькі заўгодна
+    compounds: "OrderedDict[str, Tuple[Optional[List[GrammarInfo]], Tuple[Optional[ParadigmFormId], Optional[str], Optional[LinguisticTag]]]]" = field(default_factory=OrderedDict)
+
+    def reset_derived(self) -> None:
+        """Скід вытворных індэксаў пасля змены асноўных структур."""
+        self.search_index = None
+        self.tag_index = None
+        self.suffix_guesser = None
+        self.compounds = OrderedDict()
+
 
 class GrammarDB:
     """Клас для працы з граматычнай базай."""
 
+    # Версія фармату здымка індэкса. Трэба павялічваць пры кожнай зьмене структуры індэкса
+    SNAPSHOT_VERSION = 8
+    # Імя файла здымка па змоўчанні, ляжыць побач з XML файламі
+    SNAPSHOT_FILE_NAME = ".grammar_db.snapshot"
+
     # Маппінг частак мовы
     POS_MAPPING = {
         "N": "назоўнік",
@@ -87,10 +243,36 @@ class GrammarDB:
         "S": "найвышэйшая ступень",
     }
 
+    # Назвы граматычных уласцівасцяў у GrammarInfo.properties
+    PROPERTY_NAMES = GrammarProperties.NAMES
+
+    # Часціцы, якія пішуцца праз злучок пасля слова (хто-небудзь) і перад ім (абы-хто): галоўнае ў такім слове - астатняя частка
+    TRAILING_PARTICLES = frozenset(["небудзь", "нібудзь", "колечы", "то", "такі", "ка"])
+    LEADING_PARTICLES = frozenset(["абы"])
+    # Колькі апошніх разбораў слоў са злучком захоўваецца ў індэксе
+    COMPOUND_CACHE_SIZE = 16384
+
     def __init__(self):
-        self._word_forms: Dict[str, List[GrammarInfo]] = {}
+        # Усе структуры індэкса, падмяняюцца толькі цалкам
+        self._index = _GrammarIndex()
+        # Дырэкторыя з load_directory, у якой refresh шукае новыя і выдаленыя файлы
+        self._directory: Optional[Path] = None
+        self._last_refresh = time.monotonic()
         self._normalizer = Normalizer()
 
+        # Кэшы агульных нязменных частак GrammarInfo, патрэбныя толькі падчас індэксацыі
+        self._shared_properties: Dict[Tuple[Optional[str], ...], GrammarProperties] = {}
+        self._shared_descriptions: Dict[Tuple[str, Optional[str]], Tuple[str, ...]] = {}
+        self._shared_tags: Dict[Tuple[str, Optional[str]], LinguisticTag] = {}
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Нармалізатар не перадаём паміж працэсамі, ён лёгка ствараецца нанова
+        return self._index_state()
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__init__()
+        self._restore_index_state(state)
+
     def _decode_noun_form_tag(self, form_tag: str) -> List[str]:
         """
         Расшыфроўка граматычных пазнак для назоўнікаў.
@@ -334,99 +516,731 @@ class GrammarDB:
 
         return result
 
+    def _shared_tag(self, paradigm_tag: str, form_tag: Optional[str]) -> LinguisticTag:
+        """
+        Агульны для ўсіх аднолькавых формаў экзэмпляр LinguisticTag.
+
+        Args:
+            paradigm_tag: Тэг парадыгмы (ці варыянта)
+            form_tag: Тэг формы
+
+        Returns:
+            LinguisticTag, які нельга змяняць
+        """
+        key = (paradigm_tag, form_tag)
+        linguistic_tag = self._shared_tags.get(key)
+        if linguistic_tag is None:
+            linguistic_tag = self._shared_tags[key] = LinguisticTag(paradigm_tag, form_tag)
+        return linguistic_tag
+
+    def _shared_property_map(self, values: Tuple[Optional[str], ...]) -> GrammarProperties:
+        """
+        Агульныя граматычныя ўласцівасці для аднолькавых значэнняў.
+
+        Args:
+            values: Значэнні ўласцівасцяў у парадку PROPERTY_NAMES
+
+        Returns:
+            Нязменныя ўласцівасці, агульныя для ўсіх формаў з такімі значэннямі
+        """
+        properties = self._shared_properties.get(values)
+        if properties is None:
+            values = tuple(_intern(value) for value in values)
+            properties = self._shared_properties[values] = GrammarProperties(values)
+        return properties
+
+    def _describe_form(self, pos_id: str, form_tag: Optional[str]) -> Tuple[str, ...]:
+        """
+        Расшыфроўка граматычных пазнак формы, адна на кожную пару (часціна мовы, тэг формы).
+
+        Args:
+            pos_id: Літара часціны мовы
+            form_tag: Тэг формы
+
+        Returns:
+            Картэж расшыфраваных пазнак
+        """
+        key = (pos_id, form_tag)
+        form_description = self._shared_descriptions.get(key)
+        if form_description is not None:
+            return form_description
+
+        form_description = []
+        if pos_id == "N" and form_tag:  # Калі гэта назоўнік
+            form_description = self._decode_noun_form_tag(form_tag)
+        elif pos_id == "A" and form_tag:  # Калі гэта прыметнік
+            form_description = self._decode_adjective_form_tag(form_tag)
+        elif pos_id == "V" and form_tag:  # Калі гэта дзеяслоў
+            form_description = self._decode_verb_form_tag(form_tag)
+        elif pos_id == "P" and form_tag:  # Калі гэта дзеепрыметнік
+            form_description = self._decode_participle_form_tag(form_tag)
+        elif pos_id == "M" and form_tag:  # Калі гэта лічэбнік
+            form_description = self._decode_numeral_form_tag(form_tag)
+        elif pos_id == "S" and form_tag:  # Калі гэта займеннік
+            form_description = self._decode_pronoun_form_tag(form_tag)
+        elif pos_id == "R" and form_tag:  # Калі гэта прыслоўе
+            form_description = self._decode_adverb_form_tag(form_tag)
+
+        form_description = self._shared_descriptions[key] = tuple(form_description)
+        return form_description
+
     def load_from_xml(self, xml_path: Path) -> None:
         """
         Загрузка і індэксаванне граматычнай базы з XML файла.
 
+        Файл чытаецца плынню па адной парадыгме, апрацаваныя элементы адразу выдаляюцца,
+        таму ў памяці побач з індэксам ніколі не ляжыць увесь DOM файла.
+
         Args:
             xml_path: Шлях да XML файла
         """
-        tree = etree.parse(str(xml_path))
-        root = tree.getroot()
-
-        # Загружаем парадыгмы
-        for paradigm in root.findall(".//Paradigm"):
-            paradigm_tag = paradigm.get("tag")
-            paradigm_id = paradigm.get("pdgId")
-            paradigm_meaning = paradigm.get("meaning")
-
-            for variant in paradigm.findall("./Variant"):
-                variant_id = variant.get("id")
-                lemma = variant.get("lemma")
-                normalized_lemma = self._normalizer.grammar_db_light_normalize(lemma)
-                variant_pravapis = variant.get("pravapis")
-                variant_slouniki = variant.get("slouniki")
-                variant_type = variant.get("type")
-                variant_tag = variant.get("tag")
-
-                effective_tag = variant_tag if variant_tag else paradigm_tag
-                pos_id = effective_tag[0]
-
-                for form in variant.findall("./Form"):
-                    form_tag = form.get("tag")
-                    form_slouniki = form.get("slouniki")
-                    form_options = form.get("options")
-                    form_value = form.text
-
-                    if form_value is not None:
-                        # Нармалізуем форму для індэксавання
-                        normalized_form = self._normalizer.grammar_db_aggressive_normalize(form_value)
-
-                        # Збіраем граматычныя ўласцівасці
-                        properties = {
-                            "variant_pravapis": variant_pravapis,
-                            "variant_slouniki": variant_slouniki,
-                            "form_slouniki": form_slouniki,
-                            "form_options": form_options,
-                            "variant_type": variant_type,
-                        }
-
-                        # Расшыфроўваем граматычныя пазнакі
-                        form_description = []
-                        if pos_id == "N" and form_tag:  # Калі гэта назоўнік
-                            form_description = self._decode_noun_form_tag(form_tag)
-                        elif pos_id == "A" and form_tag:  # Калі гэта прыметнік
-                            form_description = self._decode_adjective_form_tag(form_tag)
-                        elif pos_id == "V" and form_tag:  # Калі гэта дзеяслоў
-                            form_description = self._decode_verb_form_tag(form_tag)
-                        elif pos_id == "P" and form_tag:  # Калі гэта дзеепрыметнік
-                            form_description = self._decode_participle_form_tag(form_tag)
-                        elif pos_id == "M" and form_tag:  # Калі гэта лічэбнік
-                            form_description = self._decode_numeral_form_tag(form_tag)
-                        elif pos_id == "S" and form_tag:  # Калі гэта займеннік
-                            form_description = self._decode_pronoun_form_tag(form_tag)
-                        elif pos_id == "R" and form_tag:  # Калі гэта прыслоўе
-                            form_description = self._decode_adverb_form_tag(form_tag)
-
-                        grammar_info = GrammarInfo(
-                            paradigma_form_id=ParadigmFormId(int(paradigm_id), variant_id, form_tag),
-                            paradigm_line=paradigm.sourceline,
-                            form_line=form.sourceline,
-                            linguistic_tag=LinguisticTag(effective_tag, form_tag),
-                            pos_id=pos_id,
-                            pos=self.POS_MAPPING.get(pos_id, "невядома"),
-                            file_name=xml_path.name,
-                            lemma=lemma,
-                            normalized_lemma=normalized_lemma,
-                            meaning=paradigm_meaning,
-                            properties=properties,
-                            form_description=form_description,
-                        )
-
-                        # Дадаем форму ў індэкс
-                        if normalized_form not in self._word_forms:
-                            self._word_forms[normalized_form] = []
-                        self._word_forms[normalized_form].append(grammar_info)
-
-    def load_directory(self, directory: Path) -> None:
+        self._index.reset_derived()
+        file_name = sys.intern(xml_path.name)
+        self._index.xml_paths[file_name] = xml_path
+        stat = xml_path.stat()
+        self._index.fingerprints[file_name] = (file_name, stat.st_size, stat.st_mtime_ns, None)
+        file_forms: Set[str] = set(self._index.file_forms.get(file_name, ()))
+        file_paradigms = self._index.file_paradigms.setdefault(file_name, [])
+        # Парадыгмы не ўкладзеныя адна ў адну, таму n-ы элемент з iterparse адпавядае n-й знойдзенай мяжы.
+        # Нумары радкоў для супастаўлення не падыходзяць: libxml2 скажае sourceline пасля 65535 радка
+        paradigm_spans = self._scan_paradigm_spans(xml_path)
+        parsed_ids = []
+        for _, paradigm in etree.iterparse(str(xml_path), events=("end",), tag="Paradigm"):
+            paradigm_id = int(paradigm.get("pdgId"))
+            self._index_paradigm(paradigm, file_name, file_forms)
+            file_paradigms.append(paradigm_id)
+            parsed_ids.append(paradigm_id)
+
+            # Вызваляем памяць: ачышчаем парадыгму і выдаляем ужо апрацаваных суседзяў з бацькоўскага элемента
+            paradigm.clear(keep_tail=False)
+            parent = paradigm.getparent()
+            while paradigm.getprevious() is not None:
+                del parent[0]
+
+        # Межы знойдзеныя па радках, таму іх супастаўленне з разборам правяраецца па ідэнтыфікатарах
+        if [paradigm_id for paradigm_id, _, _ in paradigm_spans] == parsed_ids:
+            for paradigm_id, start, end in paradigm_spans:
+                self._index.paradigm_offsets[paradigm_id] = (file_name, start, end)
+        else:
+            logger.warning(f"Межы парадыгмаў у '{xml_path}' не супалі з разборам XML ({len(paradigm_spans)} супраць {len(parsed_ids)}), зыходны тэкст будзе шукацца па радках")
+
+        self._index.file_forms[file_name] = list(file_forms)
+
+    @staticmethod
+    def _scan_paradigm_spans(xml_path: Path) -> List[Tuple[Optional[int], int, int]]:
+        """
+        Байтавыя межы ўсіх парадыгмаў файла за адзін плынны праход па радках.
+
+        Args:
+            xml_path: Шлях да XML файла
+
+        Returns:
+            Спіс (pdgId або None, калі ён не ў радку пачатку, зрух пачатку, зрух канца) у парадку парадыгмаў у файле
+        """
+        spans = []
+        start = None
+        paradigm_id = None
+        offset = 0
+        with open(xml_path, "rb") as f:
+            for line in f:
+                start_index = line.find(b"<Paradigm")
+                if start_index >= 0:
+                    start = offset + start_index
+                    match = _PARADIGM_ID_RE.search(line, start_index)
+                    paradigm_id = int(match.group(1)) if match else None
+                end_index = line.find(b"</Paradigm>")
+                if end_index >= 0 and start is not None:
+                    spans.append((paradigm_id, start, offset + end_index + len(b"</Paradigm>")))
+                    start = None
+                offset += len(line)
+        return spans
+
+    @staticmethod
+    def _read_paradigm_lines(xml_path: Path, paradigm_id: int) -> Optional[str]:
+        """
+        Зыходны тэкст парадыгмы, знойдзены праходам па радках файла, для файлаў без захаваных межаў.
+
+        Args:
+            xml_path: Шлях да XML файла
+            paradigm_id: Ідэнтыфікатар парадыгмы
+
+        Returns:
+            Тэкст ад <Paradigm да </Paradigm> або None, калі парадыгма не знойдзена
+        """
+        chunks = None
+        with open(xml_path, "rb") as f:
+            for line in f:
+                if chunks is None:
+                    start_index = line.find(b"<Paradigm")
+                    if start_index < 0:
+                        continue
+                    match = _PARADIGM_ID_RE.search(line, start_index)
+                    if match is None or int(match.group(1)) != paradigm_id:
+                        continue
+                    chunks = []
+                    line = line[start_index:]
+                end_index = line.find(b"</Paradigm>")
+                if end_index >= 0:
+                    chunks.append(line[: end_index + len(b"</Paradigm>")])
+                    return b"".join(chunks).decode("utf-8")
+                chunks.append(line)
+        return None
+
+    def _index_paradigm(self, paradigm: etree._Element, file_name: str, file_forms: Set[str]) -> None:
+        """
+        Індэксаванне ўсіх формаў адной парадыгмы.
+
+        Args:
+            paradigm: Элемент Paradigm
+            file_name: Імя XML файла, з якога паходзіць парадыгма
+            file_forms: Мноства нармалізаваных формаў файла, дапаўняецца формамі парадыгмы
+        """
+        # Інтэрнуюцца толькі радкі, што паўтараюцца ў розных парадыгмах; лема і так адна на ўсе формы варыянта
+        paradigm_tag = _intern(paradigm.get("tag"))
+        paradigm_id = int(paradigm.get("pdgId"))
+        paradigm_meaning = paradigm.get("meaning")
+        file_name = sys.intern(file_name)
+        paradigm_forms = self._index.paradigms.setdefault(paradigm_id, [])
+
+        for variant in paradigm.findall("./Variant"):
+            variant_id = _intern(variant.get("id"))
+            lemma = variant.get("lemma")
+            normalized_lemma = self._normalizer.grammar_db_light_normalize(lemma)
+            variant_pravapis = variant.get("pravapis")
+            variant_slouniki = variant.get("slouniki")
+            variant_type = variant.get("type")
+            variant_tag = variant.get("tag")
+
+            effective_tag = _intern(variant_tag) if variant_tag else paradigm_tag
+            pos_id = effective_tag[0]
+            pos = self.POS_MAPPING.get(pos_id, "невядома")
+            forms_before = len(paradigm_forms)
+
+            for form in variant.findall("./Form"):
+                form_tag = _intern(form.get("tag"))
+                form_slouniki = form.get("slouniki")
+                form_options = form.get("options")
+                form_pravapis = form.get("pravapis")
+                form_value = form.text
+
+                if self._index.filter is not None and not self._index.filter.accepts(variant_pravapis, form_pravapis, variant_slouniki, form_slouniki):
+                    continue
+
+                if form_value is not None:
+                    # Нармалізуем форму для індэксавання
+                    normalized_form = self._normalizer.grammar_db_aggressive_normalize(form_value)
+
+                    grammar_info = GrammarInfo(
+                        paradigma_form_id=ParadigmFormId(paradigm_id, variant_id, form_tag),
+                        paradigm_line=paradigm.sourceline,
+                        form_line=form.sourceline,
+                        linguistic_tag=self._shared_tag(effective_tag, form_tag),
+                        pos_id=pos_id,
+                        pos=pos,
+                        file_name=file_name,
+                        lemma=lemma,
+                        normalized_lemma=normalized_lemma,
+                        meaning=paradigm_meaning,
+                        properties=self._shared_property_map((variant_pravapis, variant_slouniki, form_slouniki, form_options, variant_type, form_pravapis)),
+                        form_description=self._describe_form(pos_id, form_tag),
+                    )
+
+                    # Дадаем форму ў індэкс
+                    if normalized_form not in self._index.word_forms:
+                        self._index.word_forms[normalized_form] = []
+                    self._index.word_forms[normalized_form].append(grammar_info)
+                    self._index.inferences.pop(normalized_form, None)
+                    paradigm_forms.append(grammar_info)
+                    file_forms.add(normalized_form)
+
+            # Лема шукаецца толькі сярод варыянтаў, ад якіх у індэксе засталіся формы
+            if len(paradigm_forms) > forms_before:
+                self._add_lemma_paradigm(self._normalizer.grammar_db_aggressive_normalize(lemma), paradigm_id)
+
+        if not paradigm_forms:
+            del self._index.paradigms[paradigm_id]
+
+    def _add_lemma_paradigm(self, lemma_key: str, paradigm_id: int) -> None:
+        """
+        Дадае парадыгму ў адваротны індэкс лем.
+
+        Args:
+            lemma_key: Лема пасля grammar_db_aggressive_normalize
+            paradigm_id: Ідэнтыфікатар парадыгмы
+        """
+        paradigm_ids = self._index.lemma_paradigms.setdefault(lemma_key, [])
+        if paradigm_id not in paradigm_ids:
+            paradigm_ids.append(paradigm_id)
+
+    def load_directory(
+        self,
+        directory: Path,
+        use_snapshot: bool = True,
+        snapshot_path: Optional[Path] = None,
+        workers: int = 1,
+        pravapis: Optional[Iterable[str]] = None,
+        slouniki: Optional[Iterable[str]] = None,
+    ) -> None:
         """
         Загрузка ўсіх XML файлаў з дырэкторыі.
 
+        Пабудаваны індэкс захоўваецца ў здымак на дыску. Пры наступных запусках,
+        калі ні адзін XML файл не зьмяніўся, індэкс чытаецца са здымка без разбору XML.
+
         Args:
             directory: Шлях да дырэкторыі з XML файламі
+            use_snapshot: Ці выкарыстоўваць здымак індэкса
+            snapshot_path: Шлях да файла здымка (па змоўчанні SNAPSHOT_FILE_NAME у той жа дырэкторыі)
+            workers: Колькасць працэсаў для індэксацыі (1 - без паралелізму, 0 - па колькасці ядраў)
+            pravapis: Індэксаваць толькі формы гэтых правапісаў, напрыклад ["A2008"]
+            slouniki: Індэксаваць толькі формы, зафіксаваныя ў гэтых слоўніках, напрыклад ["sbm2012"]
+        """
+        xml_files = sorted(directory.glob("*.xml"))
+        self._directory = directory
+        grammar_filter = GrammarFilter.create(pravapis, slouniki)
+        if grammar_filter is not None:
+            self._index.filter = grammar_filter.combine(self._index.filter)
+            self._check_slouniki(directory, grammar_filter)
+
+        # Здымак апісвае толькі індэкс з гэтай дырэкторыі, таму для ўжо запоўненай базы не падыходзіць
+        if not use_snapshot or self._index.word_forms:
+            self._load_files(xml_files, workers)
+            self._finish_loading()
+            return
+
+        snapshot_key = self._snapshot_key(xml_files)
+        if snapshot_path is None:
+            # Для кожнага фільтра свой здымак, каб загрузкі з рознымі фільтрамі не перазапісвалі адна адну
+            snapshot_path = directory / self.SNAPSHOT_FILE_NAME
+            if self._index.filter is not None:
+                snapshot_path = snapshot_path.with_name(f"{snapshot_path.name}.{hashlib.sha256(repr(snapshot_key['filter']).encode()).hexdigest()[:12]}")
+        if self._load_snapshot(snapshot_path, snapshot_key):
+            # Здымак мог быць зроблены ў іншым месцы, файлы шукаем там, адкуль іх загружаюць цяпер
+            self._index.xml_paths = {sys.intern(xml_file.name): xml_file for xml_file in xml_files}
+            self._index.fingerprints = {fingerprint[0]: fingerprint for fingerprint in snapshot_key["files"]}
+            return
+
+        self._load_files(xml_files, workers)
+        self._finish_loading()
+        # Адбіткі з хэшамі ўжо падлічаныя для ключа здымка
+        self._index.fingerprints = {fingerprint[0]: fingerprint for fingerprint in snapshot_key["files"]}
+        self._save_snapshot(snapshot_path, snapshot_key)
+
+    @staticmethod
+    def _check_slouniki(directory: Path, grammar_filter: GrammarFilter) -> None:
+        """
+        Папярэджанне пра слоўнікі, якіх няма ў slouniki.list: такі фільтр, хутчэй за ўсё, памылковы.
+
+        Args:
+            directory: Дырэкторыя граматычнай базы
+            grammar_filter: Фільтр
+        """
+        slouniki_list = directory / "slouniki.list"
+        if grammar_filter.slouniki is None or not slouniki_list.exists():
+            return
+        known = {line.split("=", 1)[0].strip() for line in slouniki_list.read_text(encoding="utf-8").splitlines() if "=" in line}
+        unknown = grammar_filter.slouniki - known
+        if unknown:
+            logger.warning(f"Слоўнікаў {', '.join(sorted(unknown))} няма ў '{slouniki_list}'")
+
+    def filtered(self, pravapis: Optional[Iterable[str]] = None, slouniki: Optional[Iterable[str]] = None) -> "GrammarDB":
+        """
+        Вытворная база з толькі тымі формамі, што праходзяць праз фільтр.
+
+        Новая база мае ўласныя слоўнікі індэкса, таму пошук у ёй каштуе гэтулькі ж, колькі ў поўнай,
+        а GrammarInfo і нязменныя спісы варыянтаў агульныя з гэтай базай.
+
+        Args:
+            pravapis: Дапушчальныя правапісы
+            slouniki: Дапушчальныя слоўнікі
+
+        Returns:
+            Новая база
+        """
+        grammar_filter = GrammarFilter.create(pravapis, slouniki)
+        view = GrammarDB()
+        view._index.filter = grammar_filter.combine(self._index.filter) if grammar_filter is not None else self._index.filter
+        view._directory = self._directory
+        if grammar_filter is None:
+            view._restore_index_state({name: dict(value) if isinstance(value, dict) else value for name, value in self._index_state().items()})
+            return view
+
+        # Аб'екты properties агульныя для аднолькавых формаў, таму фільтр правяраецца адзін раз на кожны з іх
+        accepted_properties: Dict[int, bool] = {}
+
+        def accepts(grammar_info: GrammarInfo) -> bool:
+            accepted = accepted_properties.get(id(grammar_info.properties))
+            if accepted is None:
+                accepted = accepted_properties[id(grammar_info.properties)] = grammar_filter.accepts_properties(grammar_info.properties)
+            return accepted
+
+        for normalized_form, grammar_info_list in self._index.word_forms.items():
+            kept = [grammar_info for grammar_info in grammar_info_list if accepts(grammar_info)]
+            if len(kept) == len(grammar_info_list):
+                view._index.word_forms[normalized_form] = grammar_info_list
+                if normalized_form in self._index.inferences:
+                    view._index.inferences[normalized_form] = self._index.inferences[normalized_form]
+            elif kept:
+                view._index.word_forms[normalized_form] = kept
+
+        for paradigm_id, paradigm_forms in self._index.paradigms.items():
+            kept = [grammar_info for grammar_info in paradigm_forms if accepts(grammar_info)]
+            if kept:
+                view._index.paradigms[paradigm_id] = kept
+                if paradigm_id in self._index.paradigm_offsets:
+                    view._index.paradigm_offsets[paradigm_id] = self._index.paradigm_offsets[paradigm_id]
+        # Як і пры загрузцы з фільтрам, лема застаецца толькі за парадыгмамі, дзе ў яе варыянтаў ёсць формы
+        kept_lemmas: Dict[int, Set[str]] = {}
+        for lemma_key, paradigm_ids in self._index.lemma_paradigms.items():
+            kept_ids = []
+            for paradigm_id in paradigm_ids:
+                if paradigm_id not in view._index.paradigms:
+                    continue
+                if paradigm_id not in kept_lemmas:
+                    kept_lemmas[paradigm_id] = {self._normalizer.grammar_db_aggressive_normalize(lemma) for lemma in {info.lemma for info in view._index.paradigms[paradigm_id]}}
+                if lemma_key in kept_lemmas[paradigm_id]:
+                    kept_ids.append(paradigm_id)
+            if kept_ids:
+                view._index.lemma_paradigms[lemma_key] = kept_ids
+
+        view._index.xml_paths = dict(self._index.xml_paths)
+        view._index.file_forms = dict(self._index.file_forms)
+        view._index.file_paradigms = dict(self._index.file_paradigms)
+        view._index.fingerprints = dict(self._index.fingerprints)
+        view._finish_loading()
+        return view
+
+    def _finish_loading(self) -> None:
+        """
+        Завяршэнне індэксацыі: пабудова вытворных табліц і вызваленне кэшаў індэксацыі.
+        Ужо створаныя GrammarInfo па-ранейшаму спасылаюцца на агульныя аб'екты.
+        """
+        for normalized_form, grammar_info_list in self._index.word_forms.items():
+            if normalized_form not in self._index.inferences:
+                self._index.inferences[normalized_form] = self._infer_from_variants(grammar_info_list)
+
+        self._shared_properties.clear()
+        self._shared_descriptions.clear()
+        self._shared_tags.clear()
+        # Кэшы нармалізатара запоўнены амаль толькі формамі з XML, якія ўжо ёсць у індэксе ў нармалізаваным выглядзе
+        self._normalizer.cache_clear()
+
+    def _load_files(self, xml_files: List[Path], workers: int) -> None:
+        """
+        Індэксаванне XML файлаў паслядоўна ці ў пуле працэсаў.
+
+        Пры паралельнай загрузцы кожны файл індэксуецца асобна, а вынікі аб'ядноўваюцца
+        ў тым жа парадку файлаў, што і пры паслядоўнай загрузцы. Таму парадак варыянтаў
+        для кожнай формы не залежыць ад колькасці працэсаў.
+
+        Args:
+            xml_files: Спіс XML файлаў у патрэбным парадку
+            workers: Колькасць працэсаў (1 - без паралелізму, 0 - па колькасці ядраў)
+        """
+        workers = workers or os.cpu_count() or 1
+        if workers <= 1 or len(xml_files) <= 1:
+            for xml_file in xml_files:
+                self.load_from_xml(xml_file)
+            return
+
+        with ProcessPoolExecutor(max_workers=min(workers, len(xml_files))) as executor:
+            # Самыя вялікія файлы запускаем першымі, каб яны не засталіся апошнімі ў чарзе
+            futures = {xml_file: executor.submit(_index_xml_file, xml_file, self._index.filter) for xml_file in sorted(xml_files, key=lambda f: f.stat().st_size, reverse=True)}
+            for xml_file in xml_files:
+                self._merge(futures[xml_file].result())
+
+    def _merge(self, other: "GrammarDB") -> None:
+        """
+        Дадае індэкс іншай базы ў канец гэтага, захоўваючы парадак варыянтаў.
+
+        Args:
+            other: База, праіндэксаваная з іншых файлаў
+        """
+        self._index.reset_derived()
+        for normalized_form, grammar_infos in other._index.word_forms.items():
+            if normalized_form not in self._index.word_forms:
+                self._index.word_forms[normalized_form] = []
+            self._index.word_forms[normalized_form].extend(grammar_infos)
+            self._index.inferences.pop(normalized_form, None)
+        for paradigm_id, grammar_infos in other._index.paradigms.items():
+            self._index.paradigms.setdefault(paradigm_id, []).extend(grammar_infos)
+        self._index.paradigm_offsets.update(other._index.paradigm_offsets)
+        self._index.xml_paths.update(other._index.xml_paths)
+        self._index.file_forms.update(other._index.file_forms)
+        self._index.file_paradigms.update(other._index.file_paradigms)
+        self._index.fingerprints.update(other._index.fingerprints)
+        for lemma_key, paradigm_ids in other._index.lemma_paradigms.items():
+            for paradigm_id in paradigm_ids:
+                self._add_lemma_paradigm(lemma_key, paradigm_id)
+
+    def refresh(self) -> List[str]:
+        """
+        Пераіндэксаванне толькі тых XML файлаў, што змяніліся, з'явіліся ці зніклі пасля загрузкі.
+
+        Файл лічыцца змененым, калі адрозніваецца памер ці час мадыфікацыі і пры гэтым не супадае sha256.
+        Новы індэкс будуецца з копій слоўнікаў, а старыя спісы варыянтаў не змяняюцца, таму да канца
+        абнаўлення пошук працуе са старым індэксам, а потым усе структуры падмяняюцца разам.
+
+        Файл, які не атрымалася прачытаць ці разабраць (напрыклад, захаваны напалову), застаецца ў індэксе
+        ў ранейшым выглядзе, а яго адбітак не абнаўляецца, таму наступны refresh паспрабуе яго зноў.
+
+        Returns:
+            Імёны пераіндэксаваных і выдаленых файлаў
+        """
+        self._last_refresh = time.monotonic()
+        index = self._index
+        xml_files = sorted(self._directory.glob("*.xml")) if self._directory is not None else []
+        # Файлы, дададзеныя праз load_from_xml па-за дырэкторыяй, правяраюцца пасля яе файлаў у парадку загрузкі,
+        # а выдаленымі лічацца, толькі калі іх больш няма на дыску
+        listed = {xml_file.name for xml_file in xml_files}
+        xml_files += [xml_path for xml_path in index.xml_paths.values() if xml_path.name not in listed and xml_path.exists()]
+        fingerprints = dict(index.fingerprints)
+        removed = [file_name for file_name in fingerprints if file_name not in {xml_file.name for xml_file in xml_files}]
+        changed = []
+        fresh = []
+        for xml_file in xml_files:
+            old = fingerprints.get(xml_file.name)
+            try:
+                stat = xml_file.stat()
+                if old is not None and old[1:3] == (stat.st_size, stat.st_mtime_ns):
+                    continue
+                fingerprint = self._file_fingerprint(xml_file)
+                if old is None or old[3] != fingerprint[3]:
+                    fresh.append(_index_xml_file(xml_file, index.filter))
+                    changed.append(xml_file)
+            except (etree.XMLSyntaxError, OSError) as e:
+                logger.warning(f"Не атрымалася пераіндэксаваць '{xml_file}', застаецца ранейшы індэкс файла: {e}")
+                continue
+            fingerprints[fingerprint[0]] = fingerprint
+
+        if not changed and not removed:
+            index.fingerprints = fingerprints
+            return []
+
+        state = self._replace_files(set(removed) | {xml_file.name for xml_file in changed}, fresh, [xml_file.name for xml_file in xml_files])
+        for file_name in removed:
+            del fingerprints[file_name]
+        state["fingerprints"] = fingerprints
+
+        self._restore_index_state(state)
+        updated = sorted(removed + [xml_file.name for xml_file in changed])
+        logger.info(f"Граматычная база абноўлена: {', '.join(updated)}")
+        return updated
+
+    def refresh_if_due(self, interval: float) -> List[str]:
+        """
+        Хук для доўгіх працэсаў: выклікае refresh, калі з папярэдняй праверкі прайшло не менш за interval секунд.
+
+        Args:
+            interval: Мінімальны інтэрвал паміж праверкамі ў секундах
+
+        Returns:
+            Імёны пераіндэксаваных і выдаленых файлаў
+        """
+        if time.monotonic() - self._last_refresh < interval:
+            return []
+        return self.refresh()
+
+    def _replace_files(self, replaced: Set[str], fresh: List["GrammarDB"], file_order: List[str]) -> Dict[str, Any]:
+        """
+        Новы стан індэкса, у якім запісы файлаў replaced замененыя індэксамі fresh.
+        Бягучы стан пры гэтым не змяняецца.
+
+        Args:
+            replaced: Імёны файлаў, чые запісы трэба выдаліць
+            fresh: Індэксы асобных файлаў, праіндэксаваных нанова
+            file_order: Імёны ўсіх файлаў у парадку загрузкі
+
+        Returns:
+            Стан індэкса ў фармаце _index_state
+        """
+        file_rank = {file_name: rank for rank, file_name in enumerate(file_order)}
+        state = {name: dict(value) if isinstance(value, dict) else value for name, value in self._index_state().items()}
+        word_forms, inferences = state["word_forms"], state["inferences"]
+
+        # Формы, варыянты якіх змяняюцца, складаюцца нанова ў тым жа парадку файлаў, што і пры поўнай загрузцы
+        affected = set()
+        for file_name in replaced:
+            affected.update(self._index.file_forms.get(file_name, ()))
+        for other in fresh:
+            affected.update(other._index.word_forms)
+        for normalized_form in affected:
+            variants = [grammar_info for grammar_info in word_forms.get(normalized_form, ()) if grammar_info.file_name not in replaced]
+            for other in fresh:
+                variants.extend(other._index.word_forms.get(normalized_form, ()))
+            inferences.pop(normalized_form, None)
+            if variants:
+                variants.sort(key=lambda grammar_info: file_rank.get(grammar_info.file_name, len(file_rank)))
+                word_forms[normalized_form] = variants
+                inferences[normalized_form] = self._infer_from_variants(variants)
+            else:
+                word_forms.pop(normalized_form, None)
+
+        removed_paradigms = {paradigm_id for file_name in replaced for paradigm_id in self._index.file_paradigms.get(file_name, ())}
+        for paradigm_id in removed_paradigms:
+            state["paradigms"].pop(paradigm_id, None)
+            state["paradigm_offsets"].pop(paradigm_id, None)
+        for file_name in replaced:
+            for name in ("xml_paths", "file_forms", "file_paradigms"):
+                state[name].pop(file_name, None)
+        for other in fresh:
+            state["paradigms"].update(other._index.paradigms)
+            state["paradigm_offsets"].update(other._index.paradigm_offsets)
+            for name in ("xml_paths", "file_forms", "file_paradigms"):
+                state[name].update(getattr(other._index, name))
+        # Парадак xml_paths - парадак загрузкі, па ім наступны refresh ставіць файлы па-за дырэкторыяй
+        state["xml_paths"] = {file_name: state["xml_paths"][file_name] for file_name in sorted(state["xml_paths"], key=lambda file_name: file_rank.get(file_name, len(file_rank)))}
+
+        # Спісы парадыгмаў лем, якія змяняюцца, таксама складаюцца нанова ў парадку файлаў і парадыгмаў у іх
+        affected_lemmas = {lemma_key for lemma_key, paradigm_ids in self._index.lemma_paradigms.items() if not removed_paradigms.isdisjoint(paradigm_ids)}
+        for other in fresh:
+            affected_lemmas.update(other._index.lemma_paradigms)
+        if affected_lemmas:
+            paradigm_rank: Dict[int, int] = {}
+            for file_name in sorted(state["file_paradigms"], key=lambda file_name: file_rank.get(file_name, len(file_rank))):
+                for paradigm_id in state["file_paradigms"][file_name]:
+                    paradigm_rank.setdefault(paradigm_id, len(paradigm_rank))
+            lemma_paradigms = state["lemma_paradigms"]
+            for lemma_key in affected_lemmas:
+                paradigm_ids = {paradigm_id for paradigm_id in self._index.lemma_paradigms.get(lemma_key, ()) if paradigm_id not in removed_paradigms}
+                for other in fresh:
+                    paradigm_ids.update(other._index.lemma_paradigms.get(lemma_key, ()))
+                if paradigm_ids:
+                    lemma_paradigms[lemma_key] = sorted(paradigm_ids, key=lambda paradigm_id: paradigm_rank.get(paradigm_id, len(paradigm_rank)))
+                else:
+                    lemma_paradigms.pop(lemma_key, None)
+        return state
+
+    @staticmethod
+    def _file_fingerprint(xml_file: Path) -> Tuple[str, int, int, str]:
+        """
+        Адбітак XML файла для праверкі актуальнасці здымка.
+
+        Args:
+            xml_file: Шлях да XML файла
+
+        Returns:
+            Імя файла, памер, час мадыфікацыі (нс) і sha256 зьмесціва
+        """
+        stat = xml_file.stat()
+        digest = hashlib.sha256()
+        with open(xml_file, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+        return (xml_file.name, stat.st_size, stat.st_mtime_ns, digest.hexdigest())
+
+    def _snapshot_key(self, xml_files: List[Path]) -> Dict[str, Any]:
+        """
+        Ключ здымка: версіі фармату і нармалізатара, а таксама адбіткі ўсіх XML файлаў.
+
+        Args:
+            xml_files: Адсартаваны спіс XML файлаў
+
+        Returns:
+            Слоўнік, які павінен супасьці з захаваным у здымку
+        """
+        return {
+            "snapshot_version": self.SNAPSHOT_VERSION,
+            "normalizer_version": Normalizer.VERSION,
+            "filter": self._index.filter.snapshot_key() if self._index.filter is not None else None,
+            "files": [self._file_fingerprint(xml_file) for xml_file in xml_files],
+        }
+
+    def _index_state(self) -> Dict[str, Any]:
+        """Стан індэкса, які захоўваецца ў здымак."""
+        index = self._index
+        return {
+            "word_forms": index.word_forms,
+            "inferences": index.inferences,
+            "paradigms": index.paradigms,
+            "lemma_paradigms": index.lemma_paradigms,
+            "paradigm_offsets": index.paradigm_offsets,
+            "xml_paths": index.xml_paths,
+            "file_forms": index.file_forms,
+            "file_paradigms": index.file_paradigms,
+            "fingerprints": index.fingerprints,
+            "filter": index.filter,
+        }
+
+    def _restore_index_state(self, state: Dict[str, Any]) -> None:
+        """
+        Аднаўленне індэкса са стану, захаванага праз _index_state.
+
+        Args:
+            state: Стан індэкса
+        """
+        self._index = _GrammarIndex(**state)
+
+    def _load_snapshot(self, snapshot_path: Path, snapshot_key: Dict[str, Any]) -> bool:
+        """
+        Загрузка індэкса са здымка, калі ён існуе і адпавядае ключу.
+
+        Args:
+            snapshot_path: Шлях да файла здымка
+            snapshot_key: Чаканы ключ здымка
+
+        Returns:
+            True, калі індэкс загружаны са здымка
+        """
+        if not snapshot_path.exists():
+            return False
+
+        try:
+            with open(snapshot_path, "rb") as f:
+                # Спачатку чытаем толькі ключ, каб не распакоўваць увесь індэкс дарма
+                if pickle.load(f) != snapshot_key:
+                    logger.info(f"Здымак граматычнай базы '{snapshot_path}' састарэў, пераіндэксацыя")
+                    return False
+                state = pickle.load(f)
+        except Exception as e:
+            logger.warning(f"Не атрымалася прачытаць здымак граматычнай базы '{snapshot_path}': {e}")
+            return False
+
+        self._restore_index_state(state)
+        logger.debug(f"Індэкс граматычнай базы загружаны са здымка '{snapshot_path}'")
+        return True
+
+    def _save_snapshot(self, snapshot_path: Path, snapshot_key: Dict[str, Any]) -> None:
+        """
+        Захаванне індэкса ў здымак. Памылкі запісу не спыняюць працу, бо здымак толькі паскарае наступныя запускі.
+
+        Args:
+            snapshot_path: Шлях да файла здымка
+            snapshot_key: Ключ здымка
+        """
+        tmp_path = snapshot_path.with_name(f"{snapshot_path.name}.{os.getpid()}.tmp")
+        try:
+            with open(tmp_path, "wb") as f:
+                pickle.dump(snapshot_key, f, protocol=pickle.HIGHEST_PROTOCOL)
+                pickle.dump(self._index_state(), f, protocol=pickle.HIGHEST_PROTOCOL)
+            # Замяняем файл цалкам, каб іншыя працэсы ніколі не бачылі напалову запісаны здымак
+            os.replace(tmp_path, snapshot_path)
+        except OSError as e:
+            logger.warning(f"Не атрымалася захаваць здымак граматычнай базы '{snapshot_path}': {e}")
+            tmp_path.unlink(missing_ok=True)
+
+    def iter_index(self) -> Iterator[Tuple[str, List[GrammarInfo], Tuple[Optional[ParadigmFormId], Optional[str], Optional[LinguisticTag]]]]:
+        """
+        Абыход усяго індэкса, напрыклад для пабудовы іншых сховішчаў.
+
+        Returns:
+            Ітэратар па (нармалізаваная форма, варыянты, вынік infer_grammar_info)
+        """
+        index = self._index
+        for normalized_form, grammar_info_list in index.word_forms.items():
+            inference = index.inferences.get(normalized_form)
+            if inference is None:
+                inference = self._infer_from_variants(grammar_info_list)
+            yield normalized_form, grammar_info_list, inference
+
+    def iter_paradigms(self) -> Iterator[Tuple[int, List[GrammarInfo]]]:
         """
-        for xml_file in directory.glob("*.xml"):
-            self.load_from_xml(xml_file)
+        Абыход усіх парадыгмаў у парадку загрузкі, напрыклад для пабудовы іншых сховішчаў.
+
+        Returns:
+            Ітэратар па (ідэнтыфікатар парадыгмы, формы ў парадку файла)
+        """
+        return iter(self._index.paradigms.items())
 
     def lookup_word(self, word: str) -> Optional[List[GrammarInfo]]:
         """
@@ -439,22 +1253,349 @@ class GrammarDB:
             Спіс магчымых граматычных варыянтаў або None, калі слова не знойдзена
         """
         normalized_word = self._normalizer.grammar_db_aggressive_normalize(word)
-        return self._word_forms.get(normalized_word)
+        return self._index.word_forms.get(normalized_word)
+
+    def lookup_words(self, words: Iterable[str], stats: Optional[LookupStats] = None) -> List[Optional[List[GrammarInfo]]]:
+        """
+        Пошук адразу многіх слоў, напрыклад усіх слоў дакумента.
+        Кожнае напісанне нармалізуецца і шукаецца толькі адзін раз, колькі б разоў яно ні сустракалася.
+
+        Args:
+            words: Словы для пошуку
+            stats: Лічыльнікі, да якіх дадаюцца вынікі гэтага пошуку
+
+        Returns:
+            Вынікі lookup_word у тым жа парадку, што і словы
+        """
+        return GrammarDB.resolve_lookups(words, self.lookup_word, stats)
+
+    def infer_many(self, words: Iterable[str], stats: Optional[LookupStats] = None) -> List[Tuple[Optional[ParadigmFormId], Optional[str], Optional[LinguisticTag]]]:
+        """
+        Вывад граматычнай інфармацыі адразу для многіх слоў.
+        Кожнае напісанне нармалізуецца і шукаецца толькі адзін раз, колькі б разоў яно ні сустракалася.
+
+        Args:
+            words: Словы для аналізу
+            stats: Лічыльнікі, да якіх дадаюцца вынікі гэтага пошуку
+
+        Returns:
+            Вынікі infer_grammar_info у тым жа парадку, што і словы
+        """
+        return GrammarDB.resolve_inferences(words, self.infer_grammar_info, stats)
+
+    @staticmethod
+    def resolve_lookups(words: Iterable[str], lookup_word: Callable[[str], Optional[List[GrammarInfo]]], stats: Optional[LookupStats] = None) -> List[Optional[List[GrammarInfo]]]:
+        """
+        Агульная частка lookup_words для іншых сховішчаў: кожнае напісанне шукаецца адзін раз, а stats падлічваюцца па ўсіх словах.
+
+        Args:
+            words: Словы для пошуку
+            lookup_word: Пошук аднаго слова з вынікам як у lookup_word
+            stats: Лічыльнікі, да якіх дадаюцца вынікі гэтага пошуку
+
+        Returns:
+            Вынікі lookup_word у тым жа парадку, што і словы
+        """
+        return _resolve_batch(words, lookup_word, stats, _is_lookup_miss, _is_lookup_ambiguous)
+
+    @staticmethod
+    def resolve_inferences(
+        words: Iterable[str], infer_grammar_info: Callable[[str], Tuple[Optional[ParadigmFormId], Optional[str], Optional[LinguisticTag]]], stats: Optional[LookupStats] = None
+    ) -> List[Tuple[Optional[ParadigmFormId], Optional[str], Optional[LinguisticTag]]]:
+        """
+        Агульная частка infer_many для іншых сховішчаў: кожнае напісанне аналізуецца адзін раз, а stats падлічваюцца па ўсіх словах.
+
+        Args:
+            words: Словы для аналізу
+            infer_grammar_info: Аналіз аднаго слова з вынікам як у infer_grammar_info
+            stats: Лічыльнікі, да якіх дадаюцца вынікі гэтага пошуку
+
+        Returns:
+            Вынікі infer_grammar_info у тым жа парадку, што і словы
+        """
+        return _resolve_batch(words, infer_grammar_info, stats, _is_inference_miss, _is_inference_ambiguous)
+
+    def lookup_compound(self, word: str) -> Optional[List[GrammarInfo]]:
+        """
+        Пошук слова, а калі яго няма ў базе - пошук па частках слова са злучком.
+
+        Галоўная частка слова са злучком - апошняя (сацыяльна-эканамічны), а калі апошняя частка -
+        часціца з TRAILING_PARTICLES (штосьці-небудзь) - усё перад ёй; пасля часціцы з LEADING_PARTICLES
+        (абы-хто) галоўнае - усё пасля яе. Галоўная частка шукаецца гэтак жа, таму можа і сама мець злучок.
+        Варыянты галоўнай часткі вяртаюцца з лемай усяго слова, а paradigma_form_id паказвае на парадыгму
+        галоўнай часткі. Разбор запамінаецца для кожнага нармалізаванага напісання.
+
+        Args:
+            word: Слова для пошуку
+
+        Returns:
+            Спіс магчымых граматычных варыянтаў або None, калі не знойдзена ні слова, ні яго галоўная частка
+        """
+        variants = self.lookup_word(word)
+        if variants is not None or self._normalizer.DASH not in word:
+            return variants
+        return self._compound(word)[0]
+
+    def infer_compound(self, word: str) -> Tuple[Optional[ParadigmFormId], Optional[str], Optional[LinguisticTag]]:
+        """
+        infer_grammar_info з пошукам па частках слова са злучком, як у lookup_compound.
+
+        Для слова, знойдзенага толькі па частках, ParadigmFormId не вызначаецца: такога слова няма ў базе.
+
+        Args:
+            word: Слова для аналізу
+
+        Returns:
+            ParadigmaFormId, лемма, LinguisticTag
+        """
+        if self._normalizer.DASH not in word or self.lookup_word(word) is not None:
+            return self.infer_grammar_info(word)
+        return self._compound(word)[1]
+
+    def _compound(self, word: str) -> Tuple[Optional[List[GrammarInfo]], Tuple[Optional[ParadigmFormId], Optional[str], Optional[LinguisticTag]]]:
+        """
+        Разбор слова са злучком па частках, запомнены для кожнага напісання.
+
+        Args:
+            word: Слова, якога няма ў індэксе
+
+        Returns:
+            (варыянты або None, вынік infer_grammar_info)
+        """
+        # Лема складаецца з напісання слова, таму ключ захоўвае вялікія літары і ў
+        key = self._normalizer.grammar_db_light_normalize(word)
+        # Разбор запамінаецца ў тым індэксе, з якога ўзяты кэш, і знікае разам з ім пры refresh
+        compounds = self._index.compounds
+        compound = compounds.get(key)
+        if compound is not None:
+            try:
+                compounds.move_to_end(key)
+            except KeyError:
+                # Іншы паток ужо выцесніў гэты разбор
+                pass
+            return compound
+
+        variants = self._decompose(key)
+        if variants:
+            _, lemma, linguistic_tag = self._infer_from_variants(variants)
+            compound = (variants, (None, lemma, linguistic_tag))
+        else:
+            compound = (None, _NO_INFERENCE)
+        compounds[key] = compound
+        while len(compounds) > self.COMPOUND_CACHE_SIZE:
+            try:
+                compounds.popitem(last=False)
+            except KeyError:
+                break
+        return compound
+
+    def _decompose(self, word: str) -> Optional[List[GrammarInfo]]:
+        """
+        Варыянты галоўнай часткі слова са злучком з лемай усяго слова.
+
+        Args:
+            word: Слова пасля grammar_db_light_normalize
+
+        Returns:
+            Спіс варыянтаў або None
+        """
+        parts = word.split(self._normalizer.DASH)
+        if len(parts) < 2 or not all(parts):
+            return None
+
+        if self._normalizer.grammar_db_aggressive_normalize(parts[-1]) in self.TRAILING_PARTICLES:
+            head, prefix, suffix = self._normalizer.DASH.join(parts[:-1]), "", self._normalizer.DASH + parts[-1]
+        elif self._normalizer.grammar_db_aggressive_normalize(parts[0]) in self.LEADING_PARTICLES:
+            head, prefix, suffix = self._normalizer.DASH.join(parts[1:]), parts[0] + self._normalizer.DASH, ""
+        else:
+            head, prefix, suffix = parts[-1], self._normalizer.DASH.join(parts[:-1]) + self._normalizer.DASH, ""
+
+        variants = self.lookup_word(head)
+        if variants is None and self._normalizer.DASH in head:
+            variants = self._compound(head)[0]
+        if not variants:
+            return None
+        return [replace(info, lemma=prefix + info.lemma + suffix, normalized_lemma=prefix + info.normalized_lemma + suffix) for info in variants]
+
+    def get_paradigm(self, paradigm_id: int) -> Optional[Dict[str, List[GrammarInfo]]]:
+        """
+        Усе формы парадыгмы, згрупаваныя па варыянтах.
+
+        Args:
+            paradigm_id: Ідэнтыфікатар парадыгмы
+
+        Returns:
+            Слоўнік ідэнтыфікатар варыянта -> формы ў парадку файла, або None, калі парадыгмы няма
+        """
+        paradigm_forms = self._index.paradigms.get(paradigm_id)
+        if not paradigm_forms:
+            return None
+
+        variants: Dict[str, List[GrammarInfo]] = {}
+        for grammar_info in paradigm_forms:
+            variants.setdefault(grammar_info.paradigma_form_id.variant_id, []).append(grammar_info)
+        return variants
+
+    def paradigm_location(self, paradigm_id: int) -> Optional[Tuple[str, int]]:
+        """
+        Месцазнаходжанне парадыгмы ў XML файлах.
+
+        Args:
+            paradigm_id: Ідэнтыфікатар парадыгмы
+
+        Returns:
+            Картэж (імя файла, нумар радка) або None, калі парадыгмы няма
+        """
+        paradigm_forms = self._index.paradigms.get(paradigm_id)
+        if not paradigm_forms:
+            return None
+        return (paradigm_forms[0].file_name, paradigm_forms[0].paradigm_line)
+
+    def paradigm_source(self, paradigm_id: int) -> Optional[str]:
+        """
+        Зыходны XML тэкст парадыгмы, прачытаны наўпрост з файла па захаваных зрухах.
+
+        Args:
+            paradigm_id: Ідэнтыфікатар парадыгмы
+
+        Returns:
+            Тэкст ад <Paradigm да </Paradigm> або None, калі парадыгмы няма
+        """
+        index = self._index
+        offsets = index.paradigm_offsets.get(paradigm_id)
+        if offsets is None:
+            # Межы не захаваныя, калі не супалі з разборам файла
+            paradigm_forms = index.paradigms.get(paradigm_id)
+            if not paradigm_forms:
+                return None
+            return self._read_paradigm_lines(index.xml_paths[paradigm_forms[0].file_name], paradigm_id)
+
+        file_name, start, end = offsets
+        with open(index.xml_paths[file_name], "rb") as f:
+            f.seek(start)
+            return f.read(end - start).decode("utf-8")
+
+    def find_paradigms_by_lemma(self, lemma: str) -> List[int]:
+        """
+        Пошук парадыгмаў па леме без уліку націску і вялікіх літар.
+
+        Args:
+            lemma: Лема
+
+        Returns:
+            Ідэнтыфікатары парадыгмаў у парадку загрузкі
+        """
+        return list(self._index.lemma_paradigms.get(self._normalizer.grammar_db_aggressive_normalize(lemma), []))
+
+    def complete_prefix(self, prefix: str, limit: int = 20) -> List[str]:
+        """
+        Дапаўненне слова па пачатку.
+
+        Args:
+            prefix: Пачатак слова
+            limit: Максімальная колькасць вынікаў
+
+        Returns:
+            Нармалізаваныя формы з індэкса, што пачынаюцца з prefix
+        """
+        return self._form_search_index().complete_prefix(self._normalizer.grammar_db_aggressive_normalize(prefix), limit)
+
+    def find_similar(self, word: str, max_distance: int = 2, limit: int = 10) -> List[Tuple[str, int]]:
+        """
+        Пошук падобных формаў для слова з памылкай.
+
+        Args:
+            word: Слово для пошуку
+            max_distance: Максімальная адлегласць рэдагавання
+            limit: Максімальная колькасць вынікаў
+
+        Returns:
+            Спіс (нармалізаваная форма, адлегласць), бліжэйшыя першымі
+        """
+        return self._form_search_index().find_similar(self._normalizer.grammar_db_aggressive_normalize(word), max_distance, limit)
+
+    def _form_search_index(self) -> FormSearchIndex:
+        """Індэкс для пошуку па прэфіксе і па падабенстве, будуецца пры першым выкарыстанні."""
+        index = self._index
+        if index.search_index is None:
+            index.search_index = FormSearchIndex(index.word_forms)
+        return index.search_index
+
+    def find_by_tag(self, paradigm_tag: Optional[str] = None, form_tag: Optional[str] = None, limit: Optional[int] = None) -> List[Tuple[str, GrammarInfo]]:
+        """
+        Пошук формаў па граматычных тэгах, напрыклад find_by_tag("NC", "GP").
+
+        Args:
+            paradigm_tag: Пачатак paradigm_tag, LinguisticTag.MISSING на пазіцыі азначае любы сімвал
+            form_tag: Пачатак form_tag, LinguisticTag.MISSING на пазіцыі азначае любы сімвал
+            limit: Максімальная колькасць вынікаў
+
+        Returns:
+            Пары (нармалізаваная форма, варыянт)
+        """
+        return self._form_tag_index().query(paradigm_tag, form_tag, limit)
+
+    def _form_tag_index(self) -> TagIndex:
+        """Індэкс па пазіцыях тэгаў, будуецца пры першым выкарыстанні."""
+        index = self._index
+        if index.tag_index is None:
+            index.tag_index = TagIndex((normalized_form, grammar_info) for normalized_form, grammar_info_list in index.word_forms.items() for grammar_info in grammar_info_list)
+        return index.tag_index
+
+    def guess(self, word: str, limit: int = 5) -> List[SuffixGuess]:
+        """
+        Здагадкі пра тэгі і лему слова, якога няма ў базе, па канчатках вядомых формаў.
+
+        Args:
+            word: Слова
+            limit: Максімальная колькасць здагадак
 
-    def infer_grammar_info(self, word: str) -> Tuple[ParadigmFormId, str, LinguisticTag]:
+        Returns:
+            Здагадкі, найбольш імаверныя першымі, або пусты спіс
+        """
+        index = self._index
+        if index.suffix_guesser is None:
+            index.suffix_guesser = SuffixGuesser(index.word_forms.items())
+        return list(index.suffix_guesser.guess(self._normalizer.grammar_db_light_normalize(word))[:limit])
+
+    def infer_grammar_info(self, word: str) -> Tuple[Optional[ParadigmFormId], Optional[str], Optional[LinguisticTag]]:
         """
         Выводзіць граматычную інфармацыю для слова.
 
+        Вынік залежыць толькі ад нармалізаванай формы, таму для ўсіх формаў з індэкса ён
+        падлічваецца загадзя падчас загрузкі і захоўваецца ў здымку разам з індэксам.
+        Вернутыя аб'екты агульныя для ўсіх выклікаў і не павінны змяняцца.
+
         Args:
             word: Слова для аналізу
 
         Returns:
             ParadigmaFormId, лемма, LinguisticTag
         """
-        grammar_info_list = self.lookup_word(word)
+        normalized_word = self._normalizer.grammar_db_aggressive_normalize(word)
+        index = self._index
+        inference = index.inferences.get(normalized_word)
+        if inference is not None:
+            return inference
+
+        grammar_info_list = index.word_forms.get(normalized_word)
         if not grammar_info_list:
-            return [None, None, None]
+            return _NO_INFERENCE
+
+        # Форма дададзеная ў індэкс пасля load_directory, напрыклад праз load_from_xml
+        inference = index.inferences[normalized_word] = self._infer_from_variants(grammar_info_list)
+        return inference
+
+    def _infer_from_variants(self, grammar_info_list: List[GrammarInfo]) -> Tuple[Optional[ParadigmFormId], Optional[str], Optional[LinguisticTag]]:
+        """
+        Агульная для ўсіх варыянтаў граматычная інфармацыя адной формы.
+
+        Args:
+            grammar_info_list: Непусты спіс варыянтаў формы
 
+        Returns:
+            ParadigmaFormId, лемма, LinguisticTag
+        """
         # Калі знайшлі адназначнае супадзенне
         if len(grammar_info_list) == 1:
             grammar_info = grammar_info_list[0]
@@ -470,8 +1611,8 @@ class GrammarDB:
         linguistic_tag = map(lambda x: x.linguistic_tag, grammar_info_list)
         intersection_linguistic_tag = reduce(lambda acc, x: acc.intersect_with(x) if acc else None, linguistic_tag)
 
-        # Правяраем, ці можа толькі аманімічныя леммы?
-        lemmas = [self._normalizer.grammar_db_light_normalize(info.lemma) for info in grammar_info_list]
+        # Правяраем, ці можа толькі аманімічныя леммы? normalized_lemma - гэта і ёсць лема пасля grammar_db_light_normalize
+        lemmas = [info.normalized_lemma for info in grammar_info_list]
         intersection_lemma = lemmas[0] if len(set(lemmas)) == 1 else None
 
         if not intersection_lemma:
@@ -481,3 +1622,96 @@ class GrammarDB:
 
         # Калі знайшліся зусім розныя варыянты - вяртаем пустыя значэнні
         return (intersection_paradigma_form_id, intersection_lemma, intersection_linguistic_tag)
+
+
+# Вынік infer_grammar_info для слова, якога няма ў базе
+_NO_INFERENCE = (None, None, None)
+
+# Ідэнтыфікатар парадыгмы ў радку з пачаткам элемента Paradigm
+_PARADIGM_ID_RE = re.compile(rb'pdgId="(\d+)"')
+
+
+def _is_lookup_miss(variants: Optional[List[GrammarInfo]]) -> bool:
+    return not variants
+
+
+def _is_lookup_ambiguous(variants: List[GrammarInfo]) -> bool:
+    return len(variants) > 1
+
+
+def _is_inference_miss(inference: Tuple[Optional[ParadigmFormId], Optional[str], Optional[LinguisticTag]]) -> bool:
+    return inference == _NO_INFERENCE
+
+
+def _is_inference_ambiguous(inference: Tuple[Optional[ParadigmFormId], Optional[str], Optional[LinguisticTag]]) -> bool:
+    return inference[0] is None or not inference[0].is_singular()
+
+
+def _resolve_batch(words: Iterable[str], resolve: Callable[[str], T], stats: Optional[LookupStats], is_miss: Callable[[T], bool], is_ambiguous: Callable[[T], bool]) -> List[T]:
+    """
+    Агульная частка пакетных пошукаў: кожнае напісанне апрацоўваецца адзін раз.
+
+    Args:
+        words: Словы для пошуку
+        resolve: Пошук аднаго слова
+        stats: Лічыльнікі для абнаўлення або None
+        is_miss: Ці азначае вынік, што слова не знойдзена
+        is_ambiguous: Ці з'яўляецца знойдзены вынік неадназначным
+
+    Returns:
+        Вынікі ў парадку слоў
+    """
+    words = words if isinstance(words, list) else list(words)
+    counts = Counter(words)
+    results = {}
+    for word, count in counts.items():
+        result = results[word] = resolve(word)
+        if stats is None:
+            continue
+        if is_miss(result):
+            stats.misses += count
+        else:
+            stats.hits += count
+            if is_ambiguous(result):
+                stats.ambiguous += count
+    if stats is not None:
+        stats.unique += len(counts)
+    return [results[word] for word in words]
+
+
+@lru_cache(maxsize=None)
+def _split_list_attribute(value: Optional[str]) -> FrozenSet[str]:
+    """
+    Разбор атрыбутаў pravapis і slouniki: "A1957, A2008" ці "piskunou2012:1168,sbm2012" (без нумароў старонак).
+
+    Args:
+        value: Значэнне атрыбута
+
+    Returns:
+        Мноства назваў
+    """
+    if not value:
+        return frozenset()
+    return frozenset(item.split(":", 1)[0].strip() for item in value.split(","))
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    """Інтэрнаванне радка, які паўтараецца ў тысячах формаў."""
+    return sys.intern(value) if value is not None else None
+
+
+def _index_xml_file(xml_path: Path, grammar_filter: Optional[GrammarFilter] = None) -> GrammarDB:
+    """
+    Індэксаванне аднаго XML файла ў асобную базу. Выконваецца ў працоўным працэсе.
+
+    Args:
+        xml_path: Шлях да XML файла
+        grammar_filter: Фільтр правапісу і слоўнікаў
+
+    Returns:
+        База з індэксам аднаго файла
+    """
+    grammar_db = GrammarDB()
+    grammar_db._index.filter = grammar_filter
+    grammar_db.load_from_xml(xml_path)
+    return grammar_db
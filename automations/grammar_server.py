@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+"""
+Лакальны сервер граматычнай базы і кліент да яго.
+
+Сервер адзін раз загружае GrammarDB і адказвае на пакетныя запыты праз Unix сокет,
+таму некалькі адначасовых працэсаў verti fog ці analyze_cli не будуюць кожны свой індэкс.
+
+Пратакол - JSON радкі. Запыт: {"id": 1, "method": "lookup" | "infer", "words": [...]}.
+Адказ: {"id": 1, "result": [...]} або {"id": 1, "error": "..."}. Адказы на запыты
+аднаго злучэння ідуць у тым жа парадку, што і запыты, таму кліент можа адпраўляць
+наступныя запыты, не чакаючы адказаў на папярэднія.
+"""
+
+import argparse
+import errno
+import json
+import logging
+import os
+import socket
+import socketserver
+import stat
+import tempfile
+import threading
+from dotenv import load_dotenv
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from .grammar_db import GrammarDB, LookupStats
+from .linguistic_bits import GrammarInfo, GrammarProperties, LinguisticTag, ParadigmFormId
+from .setup_logging import setup_logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SOCKET_PATH = Path(tempfile.gettempdir()) / "grammar_db.sock"
+
+
+def encode_grammar_info(info: GrammarInfo) -> Dict[str, Any]:
+    """
+    GrammarInfo у выглядзе, прыдатным для JSON.
+
+    Args:
+        info: Граматычная інфармацыя
+
+    Returns:
+        Слоўнік з палямі GrammarInfo
+    """
+    return {
+        "paradigma_form_id": _encode_paradigma_form_id(info.paradigma_form_id),
+        "paradigm_line": info.paradigm_line,
+        "form_line": info.form_line,
+        "linguistic_tag": _encode_linguistic_tag(info.linguistic_tag),
+        "pos_id": info.pos_id,
+        "pos": info.pos,
+        "file_name": info.file_name,
+        "lemma": info.lemma,
+        "normalized_lemma": info.normalized_lemma,
+        "meaning": info.meaning,
+        "properties": dict(info.properties),
+        "form_description": info.form_description,
+    }
+
+
+def decode_grammar_info(data: Dict[str, Any]) -> GrammarInfo:
+    """
+    Аднаўленне GrammarInfo з выніку encode_grammar_info.
+
+    Args:
+        data: Слоўнік з палямі GrammarInfo
+
+    Returns:
+        GrammarInfo
+    """
+    return GrammarInfo(
+        **{
+            **data,
+            "paradigma_form_id": _decode_paradigma_form_id(data["paradigma_form_id"]),
+            "linguistic_tag": _decode_linguistic_tag(data["linguistic_tag"]),
+            "properties": GrammarProperties(tuple(data["properties"].get(name) for name in GrammarProperties.NAMES)),
+            "form_description": tuple(data["form_description"]),
+        }
+    )
+
+
+def _encode_paradigma_form_id(paradigma_form_id: Optional[ParadigmFormId]) -> Optional[List[Any]]:
+    return [paradigma_form_id.paradigm_id, paradigma_form_id.variant_id, paradigma_form_id.form_tag] if paradigma_form_id is not None else None
+
+
+def _decode_paradigma_form_id(data: Optional[List[Any]]) -> Optional[ParadigmFormId]:
+    return ParadigmFormId(*data) if data is not None else None
+
+
+def _encode_linguistic_tag(linguistic_tag: Optional[LinguisticTag]) -> Optional[List[Optional[str]]]:
+    return [linguistic_tag.paradigm_tag, linguistic_tag.form_tag] if linguistic_tag is not None else None
+
+
+def _decode_linguistic_tag(data: Optional[List[Optional[str]]]) -> Optional[LinguisticTag]:
+    return LinguisticTag(*data) if data is not None else None
+
+
+def _remove_stale_socket(socket_path: Path) -> None:
+    """
+    Выдаленне сокета, які застаўся пасля спыненага сервера.
+
+    Args:
+        socket_path: Шлях да Unix сокета
+
+    Raises:
+        OSError: Калі на гэтым шляху ўжо слухае іншы сервер
+    """
+    try:
+        if not stat.S_ISSOCK(socket_path.stat().st_mode):
+            # Не сокет - такі файл не выдаляецца, bind сам паведаміць пра памылку
+            return
+    except FileNotFoundError:
+        return
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+        try:
+            probe.connect(str(socket_path))
+        except ConnectionRefusedError:
+            socket_path.unlink(missing_ok=True)
+            return
+    raise OSError(errno.EADDRINUSE, f"Сокет '{socket_path}' ужо выкарыстоўваецца іншым серверам")
+
+
+class GrammarDBServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Сервер граматычнай базы на Unix сокеце, кожнае злучэнне апрацоўваецца ў сваім патоку."""
+
+    daemon_threads = True
+
+    def __init__(self, grammar_db: GrammarDB, socket_path: Path, refresh_interval: float = 0):
+        """
+        Args:
+            grammar_db: Загружаная граматычная база
+            socket_path: Шлях да Unix сокета, стары сокет выдаляецца, толькі калі яго ніхто не слухае
+            refresh_interval: Як часта (у секундах) правяраць змены XML файлаў (0 - не правяраць)
+        """
+        self.grammar_db = grammar_db
+        self.refresh_interval = refresh_interval
+        self._refresh_lock = threading.Lock()
+        _remove_stale_socket(socket_path)
+        super().__init__(str(socket_path), _GrammarDBRequestHandler)
+        # Доступ толькі для ўладальніка, як і да самой граматычнай базы
+        os.chmod(socket_path, 0o600)
+
+    def handle_request_data(self, request: Dict[str, Any]) -> List[Any]:
+        """
+        Выкананне аднаго запыту.
+
+        Args:
+            request: Разабраны JSON запыт
+
+        Returns:
+            Вынікі ў парадку слоў запыту
+        """
+        # Астатнія патокі тым часам чытаюць стары індэкс: refresh падмяняе яго адным прысвойваннем
+        if self.refresh_interval > 0 and self._refresh_lock.acquire(blocking=False):
+            try:
+                self.grammar_db.refresh_if_due(self.refresh_interval)
+            except Exception as e:
+                # Няўдалае абнаўленне не павінна ператвараць запыт у памылку, адказваем са старога індэкса
+                logger.warning(f"Памылка абнаўлення граматычнай базы: {e}")
+            finally:
+                self._refresh_lock.release()
+
+        method = request.get("method")
+        words = request["words"]
+        if method == "lookup":
+            return [[encode_grammar_info(info) for info in variants] if variants else None for variants in self.grammar_db.lookup_words(words)]
+        if method == "infer":
+            return [[_encode_paradigma_form_id(paradigma_form_id), lemma, _encode_linguistic_tag(linguistic_tag)] for paradigma_form_id, lemma, linguistic_tag in self.grammar_db.infer_many(words)]
+        raise ValueError(f"Невядомы метад: {method}")
+
+
+class _GrammarDBRequestHandler(socketserver.StreamRequestHandler):
+    """Апрацоўка JSON радкоў аднаго злучэння."""
+
+    def handle(self) -> None:
+        for line in self.rfile:
+            request_id = None
+            try:
+                request = json.loads(line)
+                request_id = request.get("id")
+                response = {"id": request_id, "result": self.server.handle_request_data(request)}
+            except Exception as e:
+                logger.warning(f"Памылка апрацоўкі запыту: {e}")
+                response = {"id": request_id, "error": str(e)}
+            self.wfile.write(json.dumps(response, ensure_ascii=False).encode("utf-8") + b"\n")
+
+
+class GrammarDBClient:
+    """
+    Кліент да GrammarDBServer з тым жа API пошуку, што і GrammarDB.
+
+    Пакетныя метады адпраўляюць кожнае напісанне адзін раз, кавалкамі па batch_size слоў.
+    Кавалкі пішуцца ў сокет асобным патокам, а адказы чытаюцца адначасова, таму
+    затрымка адной перадачы плаціцца адзін раз на ўвесь пакет, а не на кожны кавалак.
+    """
+
+    def __init__(self, socket_path: Path = DEFAULT_SOCKET_PATH, batch_size: int = 1024):
+        """
+        Args:
+            socket_path: Шлях да Unix сокета сервера
+            batch_size: Колькасць слоў у адным запыце
+        """
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._socket.connect(str(socket_path))
+        self._reader = self._socket.makefile("rb")
+        self._batch_size = batch_size
+        self._next_id = 0
+        # Адно злучэнне не падзяляецца паміж адначасовымі выклікамі
+        self._lock = threading.Lock()
+        # Ці разышліся запыты і адказы пасля збою, тады злучэнне нельга выкарыстоўваць
+        self._broken = False
+
+    def close(self) -> None:
+        """Закрыццё злучэння."""
+        self._reader.close()
+        self._socket.close()
+
+    def __enter__(self) -> "GrammarDBClient":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def lookup_word(self, word: str) -> Optional[List[GrammarInfo]]:
+        """
+        Пошук слова ў базе.
+
+        Args:
+            word: Слова для пошуку
+
+        Returns:
+            Спіс магчымых граматычных варыянтаў або None, калі слова не знойдзена
+        """
+        return self.lookup_words([word])[0]
+
+    def infer_grammar_info(self, word: str) -> Tuple[Optional[ParadigmFormId], Optional[str], Optional[LinguisticTag]]:
+        """
+        Выводзіць граматычную інфармацыю для слова.
+
+        Args:
+            word: Слова для аналізу
+
+        Returns:
+            ParadigmaFormId, лемма, LinguisticTag
+        """
+        return self.infer_many([word])[0]
+
+    def lookup_words(self, words: Iterable[str], stats: Optional[LookupStats] = None) -> List[Optional[List[GrammarInfo]]]:
+        """
+        Пошук адразу многіх слоў, гл. GrammarDB.lookup_words.
+
+        Args:
+            words: Словы для пошуку
+            stats: Лічыльнікі, да якіх дадаюцца вынікі гэтага пошуку
+
+        Returns:
+            Вынікі lookup_word у тым жа парадку, што і словы
+        """
+        words = list(words)
+        unique_words = list(dict.fromkeys(words))
+        results = {word: [decode_grammar_info(info) for info in variants] if variants else None for word, variants in zip(unique_words, self._call("lookup", unique_words))}
+        return GrammarDB.resolve_lookups(words, results.__getitem__, stats)
+
+    def infer_many(self, words: Iterable[str], stats: Optional[LookupStats] = None) -> List[Tuple[Optional[ParadigmFormId], Optional[str], Optional[LinguisticTag]]]:
+        """
+        Вывад граматычнай інфармацыі адразу для многіх слоў, гл. GrammarDB.infer_many.
+
+        Args:
+            words: Словы для аналізу
+            stats: Лічыльнікі, да якіх дадаюцца вынікі гэтага пошуку
+
+        Returns:
+            Вынікі infer_grammar_info у тым жа парадку, што і словы
+        """
+        words = list(words)
+        unique_words = list(dict.fromkeys(words))
+        results = {
+            word: (_decode_paradigma_form_id(paradigma_form_id), lemma, _decode_linguistic_tag(linguistic_tag))
+            for word, (paradigma_form_id, lemma, linguistic_tag) in zip(unique_words, self._call("infer", unique_words))
+        }
+        return GrammarDB.resolve_inferences(words, results.__getitem__, stats)
+
+    def _call(self, method: str, words: List[str]) -> List[Any]:
+        """
+        Выкананне метаду сервера для ўсіх слоў кавалкамі з канвеерызацыяй запытаў.
+
+        Args:
+            method: Метад сервера
+            words: Словы
+
+        Returns:
+            Аб'яднаныя вынікі ўсіх кавалкаў
+        """
+        with self._lock:
+            if self._broken:
+                raise ConnectionError("Злучэнне з серверам граматычнай базы страчана, патрэбны новы кліент")
+            requests = []
+            for start in range(0, len(words), self._batch_size):
+                requests.append({"id": self._next_id, "method": method, "words": words[start : start + self._batch_size]})
+                self._next_id += 1
+
+            # Пакуль адзін паток піша запыты, гэты ўжо чытае адказы, таму буферы сокета не могуць
+            # запоўніцца адначасова з двух бакоў
+            data = b"".join(json.dumps(request, ensure_ascii=False).encode("utf-8") + b"\n" for request in requests)
+            writer = threading.Thread(target=self._socket.sendall, args=(data,), daemon=True)
+            writer.start()
+
+            # Адказы чытаюцца ўсе, нават пасля памылкі ў адным з іх, інакш наступны выклік атрымаў бы чужыя адказы
+            result = []
+            error = None
+            try:
+                for request in requests:
+                    line = self._reader.readline()
+                    if not line:
+                        raise ConnectionError("Сервер граматычнай базы закрыў злучэнне")
+                    response = json.loads(line)
+                    if response.get("id") != request["id"]:
+                        raise RuntimeError(f"Чакаўся адказ на запыт {request['id']}, атрыманы {response.get('id')}")
+                    if "error" in response:
+                        error = error or RuntimeError(f"Памылка сервера граматычнай базы: {response['error']}")
+                    else:
+                        result.extend(response["result"])
+            except Exception:
+                # Адказы больш нельга супаставіць з запытамі, злучэнне далей не выкарыстоўваецца
+                self._broken = True
+                try:
+                    # Разблакуе паток запісу, калі сервер больш не чытае запыты
+                    self._socket.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+                raise
+            finally:
+                writer.join()
+            if error is not None:
+                raise error
+            return result
+
+
+def main():
+    load_dotenv()
+
+    setup_logging(os.getenv("LOG_LEVEL", "INFO"))
+
+    parser = argparse.ArgumentParser(description="Сервер граматычнай базы для адначасовых працэсаў на адной машыне")
+    parser.add_argument("grammar_base_path", help="Шлях да дырэкторыі з граматычнай базай")
+    parser.add_argument("--socket", type=Path, default=DEFAULT_SOCKET_PATH, help=f"Шлях да Unix сокета (па змоўчанні {DEFAULT_SOCKET_PATH})")
+    parser.add_argument("--workers", type=int, default=1, help="Колькасць працэсаў для індэксацыі граматычнай базы (0 - па колькасці ядраў)")
+    parser.add_argument("--pravapis", type=lambda value: value.split(","), help="Выкарыстоўваць толькі формы гэтых правапісаў праз коску, напрыклад A2008")
+    parser.add_argument("--slouniki", type=lambda value: value.split(","), help="Выкарыстоўваць толькі формы з гэтых слоўнікаў праз коску, напрыклад sbm2012")
+    parser.add_argument("--refresh-interval", type=float, default=0, help="Як часта (у секундах) правяраць змены XML файлаў (0 - не правяраць)")
+    args = parser.parse_args()
+
+    logger.info("Індэксаванне граматычнай базы...")
+    grammar_db = GrammarDB()
+    grammar_db.load_directory(Path(args.grammar_base_path), workers=args.workers, pravapis=args.pravapis, slouniki=args.slouniki)
+
+    with GrammarDBServer(grammar_db, args.socket, args.refresh_interval) as server:
+        logger.info(f"Сервер граматычнай базы слухае '{args.socket}'")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            args.socket.unlink(missing_ok=True)
+
+
+if __name__ == "__main__":
+    main()
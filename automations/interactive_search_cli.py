@@ -2,36 +2,37 @@
 """
 Інтэрактыўная праграма для пошуку словаў у граматычнай базе.
 """
+
 import os
 import sys
 import logging
+import argparse
 from dotenv import load_dotenv
 from pathlib import Path
-from typing import Optional
-from lxml import etree
 
 from .setup_logging import setup_logging
 from .grammar_db import GrammarDB
 
 
-def find_paradigm_location(xml_path: Path, paradigm_tag: str) -> Optional[tuple[int, str]]:
+def print_paradigm(db: GrammarDB, paradigm_id: int) -> None:
     """
-    Пошук месцазнаходжання парадыгмы ў XML файле.
+    Друкуе ўсе формы парадыгмы па варыянтах разам з яе месцазнаходжаннем.
 
     Args:
-        xml_path: Шлях да XML файла
-        paradigm_tag: Тэг парадыгмы
-
-    Returns:
-        Картэж (нумар радка, шлях да файла) або None, калі парадыгма не знойдзена
+        db: Граматычная база
+        paradigm_id: Ідэнтыфікатар парадыгмы
     """
-    tree = etree.parse(str(xml_path))
-    root = tree.getroot()
+    variants = db.get_paradigm(paradigm_id)
+    if variants is None:
+        print(f"Парадыгма {paradigm_id} не знойдзена ў базе")
+        return
 
-    for elem in root.findall(".//Paradigm"):
-        if elem.get("tag") == paradigm_tag:
-            return (elem.sourceline, str(xml_path))
-    return None
+    file_name, paradigm_line = db.paradigm_location(paradigm_id)
+    print(f"\nПарадыгма {paradigm_id} // {file_name}:{paradigm_line}")
+    for variant_id, forms in variants.items():
+        print(f'  Варыянт {variant_id} "{forms[0].normalized_lemma}":')
+        for form in forms:
+            print(f"    {form.paradigma_form_id.form_tag or '-'}\t{', '.join(form.form_description)} // {form.file_name}:{form.form_line}")
 
 
 def main():
@@ -42,19 +43,25 @@ def main():
     setup_logging(log_level)
     logger = logging.getLogger(__name__)
 
-    if len(sys.argv) != 2:
-        print("Выкарыстанне: python interactive-search.py <шлях да дырэкторыі з XML файламі>")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(description="Інтэрактыўны пошук словаў у граматычнай базе")
+    parser.add_argument("xml_dir", help="Шлях да дырэкторыі з XML файламі")
+    parser.add_argument("--workers", type=int, default=1, help="Колькасць працэсаў для індэксацыі граматычнай базы (0 - па колькасці ядраў)")
+    parser.add_argument("--pravapis", type=lambda value: value.split(","), help="Выкарыстоўваць толькі формы гэтых правапісаў праз коску, напрыклад A2008")
+    parser.add_argument("--slouniki", type=lambda value: value.split(","), help="Выкарыстоўваць толькі формы з гэтых слоўнікаў праз коску, напрыклад sbm2012")
+    parser.add_argument("--refresh-interval", type=float, default=2.0, help="Як часта (у секундах) правяраць змены XML файлаў перад пошукам (0 - не правяраць)")
+    args = parser.parse_args()
 
-    xml_dir = Path(sys.argv[1])
+    xml_dir = Path(args.xml_dir)
     if not xml_dir.exists() or not xml_dir.is_dir():
         print(f"Памылка: дырэкторыя {xml_dir} не існуе")
         sys.exit(1)
 
     logger.info("Індэксаванне граматычнай базы...")
     db = GrammarDB()
-    db.load_directory(xml_dir)
-    logger.info("Індэксаванне завершана. Увядзіце слова для пошуку (або 'q' для выхаду):")
+    db.load_directory(xml_dir, workers=args.workers, pravapis=args.pravapis, slouniki=args.slouniki)
+    logger.info(
+        "Індэксаванне завершана. Увядзіце слова для пошуку, пачатак слова з '*' на канцы для дапаўнення, 'paradigm <id>' або 'lemma <лема>' для прагляду парадыгмаў, 'source <id>' для XML парадыгмы, 'tag NC|GP' для пошуку па тэгах (або 'q' для выхаду):"
+    )
 
     output_format = "tags"
 
@@ -63,6 +70,10 @@ def main():
         if word.lower() == "q" or word.lower() == "exit":
             break
 
+        # Падхопліваем праўкі граматычнай базы без перазапуску, пераіндэксуюцца толькі змененыя файлы
+        if args.refresh_interval > 0:
+            db.refresh_if_due(args.refresh_interval)
+
         if word.lower() == "details":
             output_format = "details"
             print("Фармат вываду зменены на падрабязны")
@@ -73,9 +84,48 @@ def main():
             print("Фармат вываду зменены на тэгі")
             continue
 
+        command, _, argument = word.partition(" ")
+        if command.lower() == "paradigm" and argument.strip().isdigit():
+            print_paradigm(db, int(argument))
+            continue
+
+        if command.lower() == "source" and argument.strip().isdigit():
+            source = db.paradigm_source(int(argument))
+            print(source if source is not None else f"Парадыгма {argument.strip()} не знойдзена ў базе")
+            continue
+
+        if command.lower() == "lemma" and argument.strip():
+            paradigm_ids = db.find_paradigms_by_lemma(argument.strip())
+            if not paradigm_ids:
+                print(f"Лема '{argument.strip()}' не знойдзена ў базе")
+            for paradigm_id in paradigm_ids:
+                print_paradigm(db, paradigm_id)
+            continue
+
+        if command.lower() == "tag" and argument.strip():
+            # Тэг у фармаце LinguisticTag: "NC|GP", "V..P" ці "|GP"
+            paradigm_tag, _, form_tag = argument.strip().partition("|")
+            forms = db.find_by_tag(paradigm_tag or None, form_tag or None, limit=50)
+            if not forms:
+                print(f"Формаў з тэгам '{argument.strip()}' у базе няма")
+            for normalized_form, variant in forms:
+                print(f"{normalized_form}\t{variant.linguistic_tag}\t{variant.normalized_lemma} // {variant.file_name}:{variant.form_line}")
+            continue
+
+        if word.endswith("*"):
+            completions = db.complete_prefix(word[:-1])
+            if completions:
+                print(", ".join(completions))
+            else:
+                print(f"Слоў, што пачынаюцца з '{word[:-1]}', у базе няма")
+            continue
+
         variants = db.lookup_word(word)
         if not variants:
             print(f"Слова '{word}' не знойдзена ў базе")
+            similar = db.find_similar(word)
+            if similar:
+                print(f"Магчыма, вы мелі на ўвазе: {', '.join(form for form, _ in similar)}")
             continue
 
         print(f"\nЗнойдзена {len(variants)} варыянтаў:")
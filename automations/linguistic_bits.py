@@ -1,7 +1,7 @@
 import logging
 from enum import Enum
 from dataclasses import dataclass, field
-from typing import List, Type, TypeVar, Generic, Dict, Optional
+from typing import Iterator, List, Type, TypeVar, Generic, Dict, Mapping, Optional, Tuple
 import re
 import uuid
 import datetime
@@ -84,7 +84,7 @@ POS_MAPPING = {
 }
 
 
-@dataclass
+@dataclass(slots=True)
 class ParadigmFormId:
     """Ідэнтыфікатар парадыгмы і формы з граматычнай базы. Але можа быць ня поўным, прыкладам калі ўдалося вызначыць парадыгму, але ня форму"""
 
@@ -150,7 +150,7 @@ class ParadigmFormId:
 TLinguisticTag = TypeVar("TLT", bound="LinguisticTag")
 
 
-@dataclass
+@dataclass(slots=True)
 class LinguisticTag:
     """Усе вядомыя граматычныя тэгі аднаго слова"""
 
@@ -506,9 +506,66 @@ class LinguisticItem(SentenceItem):
         return LinguisticItem(sentence_item.text, sentence_item.type, sentence_item.glue_next)
 
 
-@dataclass(frozen=True)
+class GrammarProperties(Mapping[str, Optional[str]]):
+    """
+    Нязменныя граматычныя ўласцівасці формы.
+
+    Значэнні захоўваюцца ў картэжы ў парадку NAMES, таму адзін экзэмпляр можна бяспечна
+    выкарыстоўваць для ўсіх формаў з аднолькавымі ўласцівасцямі і захоўваць у pickle.
+    """
+
+    NAMES = ("variant_pravapis", "variant_slouniki", "form_slouniki", "form_options", "variant_type", "form_pravapis")
+    _POSITIONS = {name: position for position, name in enumerate(NAMES)}
+
+    __slots__ = ("_values",)
+
+    def __init__(self, values: Tuple[Optional[str], ...]):
+        """
+        Args:
+            values: Значэнні ўласцівасцяў у парадку NAMES
+        """
+        if len(values) != len(self.NAMES):
+            raise ValueError(f"Чакалася {len(self.NAMES)} значэнняў уласцівасцяў, атрымана {len(values)}")
+        object.__setattr__(self, "_values", tuple(values))
+
+    def __setattr__(self, name: str, value: object) -> None:
+        raise AttributeError("GrammarProperties нельга змяняць")
+
+    def __getitem__(self, name: str) -> Optional[str]:
+        position = self._POSITIONS.get(name)
+        if position is None:
+            raise KeyError(name)
+        return self._values[position]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.NAMES)
+
+    def __len__(self) -> int:
+        return len(self.NAMES)
+
+    def __hash__(self) -> int:
+        return hash(self._values)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, GrammarProperties):
+            return self._values == other._values
+        return super().__eq__(other)
+
+    def __reduce__(self):
+        return GrammarProperties, (self._values,)
+
+    def __repr__(self) -> str:
+        return f"GrammarProperties({dict(self)!r})"
+
+
+@dataclass(frozen=True, slots=True)
 class GrammarInfo:
-    """Клас для захоўвання граматычнай інфармацыі."""
+    """
+    Клас для захоўвання граматычнай інфармацыі.
+
+    Экзэмпляраў у індэксе сотні тысяч, таму клас без __dict__, а linguistic_tag, properties
+    і form_description агульныя для ўсіх формаў з аднолькавымі значэннямі і не павінны змяняцца.
+    """
 
     paradigma_form_id: ParadigmFormId  # Ідэнтыфікатар парадыгмы і формы
     paradigm_line: int  # Нумар радка парадыгмы
@@ -520,5 +577,5 @@ class GrammarInfo:
     lemma: str  # Лема
     normalized_lemma: str  # Нормалізаваная лема
     meaning: str  # Значэнне
-    properties: Dict[str, str]  # Граматычныя ўласцівасці
-    form_description: List[str]  # Расшыфроўка граматычных пазнак
+    properties: GrammarProperties  # Граматычныя ўласцівасці
+    form_description: Tuple[str, ...]  # Расшыфроўка граматычных пазнак
@@ -0,0 +1,352 @@
+"""
+Граматычная база ў выглядзе скампіляваных файлаў, якія чытаюцца праз mmap.
+
+Індэкс не загружаецца ў памяць цалкам: пошук ідзе бінарным пошукам па адсартаваным
+файле ключоў, а GrammarInfo дэкадуюцца толькі для знойдзенай формы. Таму старт
+амаль імгненны, а памяць працэса прапарцыйная толькі прачытаным старонкам.
+
+Фармат (усе лікі - беззнакавыя 32-бітныя, little-endian, NONE = 0xFFFFFFFF):
+
+forms.idx
+    загаловак: магія, версія, колькасць ключоў
+    запісы ключоў, адсартаваныя па UTF-8 байтах ключа:
+        зрух і даўжыня ключа, першы запіс і колькасць запісаў у forms.rec,
+        гатовы вынік infer_grammar_info (paradigm_id, variant_id, form_tag, лема, paradigm_tag, form_tag)
+    байты ўсіх ключоў
+
+forms.rec
+    загаловак: магія, версія, колькасць запісаў, колькасць радкоў
+    запісы фіксаванай даўжыні з палямі GrammarInfo (радкі - нумары ў пуле радкоў)
+    зрухі радкоў у пуле
+    байты пула радкоў
+"""
+
+import argparse
+import mmap
+import os
+import struct
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from .grammar_db import GrammarDB
+from .linguistic_bits import GrammarInfo, GrammarProperties, LinguisticTag, ParadigmFormId
+from .normalizer import Normalizer
+
+NONE = 0xFFFFFFFF
+
+
+class MmapGrammarDB:
+    """Граматычная база з тым жа API пошуку, што і GrammarDB, але з індэксам на дыску."""
+
+    KEYS_FILE_NAME = "forms.idx"
+    RECORDS_FILE_NAME = "forms.rec"
+    VERSION = 2
+
+    KEYS_HEADER = struct.Struct("<4sII")
+    KEYS_MAGIC = b"GDBK"
+    # зрух ключа, даўжыня ключа, першы запіс, колькасць запісаў, 6 палёў выніку infer_grammar_info
+    KEY_ENTRY = struct.Struct("<10I")
+
+    RECORDS_HEADER = struct.Struct("<4sIII")
+    RECORDS_MAGIC = b"GDBR"
+    # paradigm_id, variant_id, form_tag, paradigm_line, form_line, paradigm_tag, pos_id, pos, file_name,
+    # lemma, normalized_lemma, meaning, уласцівасці ў парадку GrammarDB.PROPERTY_NAMES, form_description
+    RECORD = struct.Struct(f"<{13 + len(GrammarDB.PROPERTY_NAMES)}I")
+    STRING_OFFSET = struct.Struct("<I")
+
+    # Падзяляльнік пазнак form_description у пуле радкоў
+    DESCRIPTION_SEPARATOR = "\n"
+
+    def __init__(self, directory: Path, cache_size: int = 65536):
+        """
+        Адкрыццё скампіляванай базы.
+
+        Args:
+            directory: Дырэкторыя з файламі KEYS_FILE_NAME і RECORDS_FILE_NAME
+            cache_size: Колькасць формаў, для якіх захоўваюцца ўжо дэкадаваныя GrammarInfo
+        """
+        self._files = []
+        buffers = []
+        try:
+            for file_name in (self.KEYS_FILE_NAME, self.RECORDS_FILE_NAME):
+                f = open(directory / file_name, "rb")
+                self._files.append(f)
+                buffers.append(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+            self._attach(buffers[0], buffers[1], cache_size)
+        except BaseException:
+            # Пусты ці чужы файл: без close тут засталіся б адкрытыя дэскрыптары і mmap
+            for buffer in buffers:
+                buffer.close()
+            for f in self._files:
+                f.close()
+            raise
+
+    def _attach(self, keys, records, cache_size: int) -> None:
+        """
+        Падключэнне да буфераў з індэксам. Буферы могуць быць mmap ці любым іншым аб'ектам з buffer protocol.
+
+        Args:
+            keys: Буфер з фарматам KEYS_FILE_NAME
+            records: Буфер з фарматам RECORDS_FILE_NAME
+            cache_size: Памер кэша дэкадаваных формаў
+        """
+        magic, version, self._key_count = self.KEYS_HEADER.unpack_from(keys, 0)
+        if magic != self.KEYS_MAGIC or version != self.VERSION:
+            raise ValueError(f"Няправільны фармат файла ключоў: {magic!r} версіі {version}")
+        magic, version, self._record_count, string_count = self.RECORDS_HEADER.unpack_from(records, 0)
+        if magic != self.RECORDS_MAGIC or version != self.VERSION:
+            raise ValueError(f"Няправільны фармат файла запісаў: {magic!r} версіі {version}")
+
+        self._keys = keys
+        self._records = records
+        self._key_blob_offset = self.KEYS_HEADER.size + self._key_count * self.KEY_ENTRY.size
+        self._string_offsets_offset = self.RECORDS_HEADER.size + self._record_count * self.RECORD.size
+        self._string_blob_offset = self._string_offsets_offset + (string_count + 1) * self.STRING_OFFSET.size
+
+        self._normalizer = Normalizer()
+        self._find_entry = lru_cache(maxsize=cache_size)(self._find_entry_uncached)
+
+    def close(self) -> None:
+        """Закрыццё mmap і файлаў."""
+        self._find_entry.cache_clear()
+        for buffer in (self._keys, self._records):
+            buffer.close()
+        for f in self._files:
+            f.close()
+
+    def __enter__(self) -> "MmapGrammarDB":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self._key_count
+
+    def lookup_word(self, word: str) -> Optional[List[GrammarInfo]]:
+        """
+        Пошук слова ў базе.
+
+        Args:
+            word: Слова для пошуку
+
+        Returns:
+            Спіс магчымых граматычных варыянтаў або None, калі слова не знойдзена
+        """
+        entry = self._find_entry(self._normalizer.grammar_db_aggressive_normalize(word))
+        return list(entry[0]) if entry else None
+
+    def infer_grammar_info(self, word: str) -> Tuple[Optional[ParadigmFormId], Optional[str], Optional[LinguisticTag]]:
+        """
+        Выводзіць граматычную інфармацыю для слова. Вынік падлічаны загадзя пры кампіляцыі базы.
+
+        Args:
+            word: Слова для аналізу
+
+        Returns:
+            ParadigmaFormId, лемма, LinguisticTag
+        """
+        entry = self._find_entry(self._normalizer.grammar_db_aggressive_normalize(word))
+        return entry[1] if entry else (None, None, None)
+
+    # Пакетныя пошукі працуюць праз lookup_word і infer_grammar_info, таму агульныя з GrammarDB
+    lookup_words = GrammarDB.lookup_words
+    infer_many = GrammarDB.infer_many
+
+    def _find_entry_uncached(self, normalized_word: str) -> Optional[Tuple[Tuple[GrammarInfo, ...], Tuple]]:
+        """
+        Бінарны пошук нармалізаванай формы і дэкадаванне яе запісаў.
+
+        Args:
+            normalized_word: Нармалізаваная форма
+
+        Returns:
+            (варыянты, вынік infer_grammar_info) або None
+        """
+        key = normalized_word.encode("utf-8")
+        low, high = 0, self._key_count
+        while low < high:
+            middle = (low + high) // 2
+            entry = self.KEY_ENTRY.unpack_from(self._keys, self.KEYS_HEADER.size + middle * self.KEY_ENTRY.size)
+            key_start = self._key_blob_offset + entry[0]
+            middle_key = bytes(self._keys[key_start : key_start + entry[1]])
+            if middle_key < key:
+                low = middle + 1
+            elif middle_key > key:
+                high = middle
+            else:
+                return self._decode_entry(entry)
+        return None
+
+    def _decode_entry(self, entry: Tuple[int, ...]) -> Tuple[Tuple[GrammarInfo, ...], Tuple]:
+        """
+        Дэкадаванне знойдзенага запісу ключа.
+
+        Args:
+            entry: Распакаваны KEY_ENTRY
+
+        Returns:
+            (варыянты, вынік infer_grammar_info)
+        """
+        _, _, first_record, record_count, paradigm_id, variant_id, form_tag, lemma, paradigm_tag, tag_form_tag = entry
+        grammar_infos = tuple(self._decode_record(index) for index in range(first_record, first_record + record_count))
+
+        paradigma_form_id = ParadigmFormId(paradigm_id, self._string(variant_id), self._string(form_tag)) if paradigm_id != NONE else None
+        linguistic_tag = LinguisticTag(self._string(paradigm_tag), self._string(tag_form_tag)) if paradigm_tag != NONE else None
+        return grammar_infos, (paradigma_form_id, self._string(lemma), linguistic_tag)
+
+    def _decode_record(self, index: int) -> GrammarInfo:
+        """
+        Дэкадаванне аднаго GrammarInfo.
+
+        Args:
+            index: Нумар запісу ў RECORDS_FILE_NAME
+
+        Returns:
+            GrammarInfo
+        """
+        fields = self.RECORD.unpack_from(self._records, self.RECORDS_HEADER.size + index * self.RECORD.size)
+        paradigm_id, variant_id, form_tag, paradigm_line, form_line, paradigm_tag, pos_id, pos, file_name, lemma, normalized_lemma, meaning = fields[:12]
+        form_tag = self._string(form_tag)
+        paradigm_tag = self._string(paradigm_tag)
+        description = self._string(fields[-1])
+
+        return GrammarInfo(
+            paradigma_form_id=ParadigmFormId(paradigm_id, self._string(variant_id), form_tag),
+            paradigm_line=paradigm_line,
+            form_line=form_line,
+            linguistic_tag=LinguisticTag(paradigm_tag, form_tag),
+            pos_id=self._string(pos_id),
+            pos=self._string(pos),
+            file_name=self._string(file_name),
+            lemma=self._string(lemma),
+            normalized_lemma=self._string(normalized_lemma),
+            meaning=self._string(meaning),
+            properties=GrammarProperties(tuple(self._string(value) for value in fields[12:-1])),
+            form_description=tuple(description.split(self.DESCRIPTION_SEPARATOR)) if description else (),
+        )
+
+    def _string(self, index: int) -> Optional[str]:
+        """
+        Радок з пула радкоў.
+
+        Args:
+            index: Нумар радка або NONE
+
+        Returns:
+            Радок або None
+        """
+        if index == NONE:
+            return None
+        start, end = struct.unpack_from("<2I", self._records, self._string_offsets_offset + index * self.STRING_OFFSET.size)
+        return str(self._records[self._string_blob_offset + start : self._string_blob_offset + end], "utf-8")
+
+    @classmethod
+    def serialize(cls, grammar_db: GrammarDB) -> Tuple[bytes, bytes]:
+        """
+        Сэрыялізацыя загружанай GrammarDB у фарматы KEYS_FILE_NAME і RECORDS_FILE_NAME.
+
+        Args:
+            grammar_db: Загружаная граматычная база
+
+        Returns:
+            Байты файла ключоў і байты файла запісаў
+        """
+        strings: Dict[str, int] = {}
+        string_offsets = [0]
+        string_blob = bytearray()
+
+        def string_index(value: Optional[str]) -> int:
+            if value is None:
+                return NONE
+            index = strings.get(value)
+            if index is None:
+                index = strings[value] = len(strings)
+                string_blob.extend(value.encode("utf-8"))
+                string_offsets.append(len(string_blob))
+            return index
+
+        records = bytearray()
+        record_count = 0
+        key_entries = []
+        for normalized_form, grammar_info_list, inference in grammar_db.iter_index():
+            first_record = record_count
+            for info in grammar_info_list:
+                records.extend(
+                    cls.RECORD.pack(
+                        info.paradigma_form_id.paradigm_id,
+                        string_index(info.paradigma_form_id.variant_id),
+                        string_index(info.paradigma_form_id.form_tag),
+                        info.paradigm_line or 0,
+                        info.form_line or 0,
+                        string_index(info.linguistic_tag.paradigm_tag),
+                        string_index(info.pos_id),
+                        string_index(info.pos),
+                        string_index(info.file_name),
+                        string_index(info.lemma),
+                        string_index(info.normalized_lemma),
+                        string_index(info.meaning),
+                        *(string_index(info.properties.get(name)) for name in GrammarDB.PROPERTY_NAMES),
+                        string_index(cls.DESCRIPTION_SEPARATOR.join(info.form_description)),
+                    )
+                )
+                record_count += 1
+
+            paradigma_form_id, lemma, linguistic_tag = inference
+            inference_fields = (
+                paradigma_form_id.paradigm_id if paradigma_form_id else NONE,
+                string_index(paradigma_form_id.variant_id if paradigma_form_id else None),
+                string_index(paradigma_form_id.form_tag if paradigma_form_id else None),
+                string_index(lemma),
+                string_index(linguistic_tag.paradigm_tag if linguistic_tag else None),
+                string_index(linguistic_tag.form_tag if linguistic_tag else None),
+            )
+            key_entries.append((normalized_form.encode("utf-8"), first_record, len(grammar_info_list), inference_fields))
+
+        # Ключы сартуюцца па байтах, бо менавіта так іх параўноўвае бінарны пошук
+        key_entries.sort(key=lambda entry: entry[0])
+        keys = bytearray(cls.KEYS_HEADER.pack(cls.KEYS_MAGIC, cls.VERSION, len(key_entries)))
+        key_blob = bytearray()
+        for key, first_record, record_count_for_key, inference_fields in key_entries:
+            keys.extend(cls.KEY_ENTRY.pack(len(key_blob), len(key), first_record, record_count_for_key, *inference_fields))
+            key_blob.extend(key)
+        keys.extend(key_blob)
+
+        records_file = bytearray(cls.RECORDS_HEADER.pack(cls.RECORDS_MAGIC, cls.VERSION, record_count, len(strings)))
+        records_file.extend(records)
+        records_file.extend(struct.pack(f"<{len(string_offsets)}I", *string_offsets))
+        records_file.extend(string_blob)
+        return bytes(keys), bytes(records_file)
+
+    @classmethod
+    def build(cls, grammar_db: GrammarDB, directory: Path) -> None:
+        """
+        Запіс скампіляванай базы ў дырэкторыю.
+
+        Args:
+            grammar_db: Загружаная граматычная база
+            directory: Дырэкторыя для файлаў KEYS_FILE_NAME і RECORDS_FILE_NAME
+        """
+        directory.mkdir(parents=True, exist_ok=True)
+        keys, records = cls.serialize(grammar_db)
+        for file_name, data in ((cls.RECORDS_FILE_NAME, records), (cls.KEYS_FILE_NAME, keys)):
+            tmp_path = directory / f"{file_name}.{os.getpid()}.tmp"
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, directory / file_name)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Кампіляцыя граматычнай базы ў файлы для MmapGrammarDB")
+    parser.add_argument("grammar_base_path", help="Шлях да дырэкторыі з граматычнай базай")
+    parser.add_argument("output", help="Дырэкторыя для скампіляванай базы")
+    parser.add_argument("--pravapis", type=lambda value: value.split(","), help="Выкарыстоўваць толькі формы гэтых правапісаў праз коску, напрыклад A2008")
+    parser.add_argument("--slouniki", type=lambda value: value.split(","), help="Выкарыстоўваць толькі формы з гэтых слоўнікаў праз коску, напрыклад sbm2012")
+    args = parser.parse_args()
+
+    grammar_db = GrammarDB()
+    grammar_db.load_directory(Path(args.grammar_base_path), pravapis=args.pravapis, slouniki=args.slouniki)
+    MmapGrammarDB.build(grammar_db, Path(args.output))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,7 @@
 import re
 import logging
-from typing import List, Tuple, TextIO
-from .grammar_db import GrammarDB
+from typing import List, Optional, Tuple, TextIO
+from .grammar_db import GrammarDB, LookupStats
 from .linguistic_bits import GrammarInfo, POS_MAPPING
 from .base_provider import BaseProvider
 
@@ -19,6 +19,8 @@ class MorphologicalAnalyzer:
         self.grammar_db = grammar_db
         self.provider = provider
         self.logger = logging.getLogger(__name__)
+        # Лічыльнікі пошуку ў граматычнай базе за ўвесь час працы аналізатара
+        self.lookup_stats = LookupStats()
 
     def split_into_sentences(self, text: str) -> List[str]:
         """
@@ -67,11 +69,30 @@ class MorphologicalAnalyzer:
         word = tokens[word_index]
 
         # Апрацоўка знакаў прыпынку
-        if re.match(r"^\.{3}|[.,!?;«—»:]$", word):
+        if self._is_punctuation(word):
             return word
 
         # Пошук слова ў граматычнай базе
-        variants = self.grammar_db.lookup_word(word)
+        return await self._choose_variant(tokens, word_index, self.grammar_db.lookup_word(word))
+
+    @staticmethod
+    def _is_punctuation(token: str) -> bool:
+        """Ці з'яўляецца токен знакам прыпынку"""
+        return re.match(r"^\.{3}|[.,!?;«—»:]$", token) is not None
+
+    async def _choose_variant(self, tokens: List[str], word_index: int, variants: Optional[List[GrammarInfo]]) -> Tuple[GrammarInfo, float] | None:
+        """
+        Выбар варыянта ўжо знойдзенага слова, пры неабходнасці праз правайдэра
+
+        Args:
+            tokens: Спіс слоў у сказе
+            word_index: Індэкс слова для аналізу
+            variants: Вынік пошуку слова ў граматычнай базе
+
+        Returns:
+            Optional[Tuple[GrammarInfo, float]]: (граматычная інфармацыя, імавернасць) або None
+        """
+        word = tokens[word_index]
         if not variants:
             return None
 
@@ -153,6 +174,7 @@ class MorphologicalAnalyzer:
             await self._process_buffer(buffer, output_stream)
 
         output_stream.write("</doc>\n")
+        self.logger.info(f"Пошук у граматычнай базе: {self.lookup_stats}")
 
     async def _process_buffer(self, buffer: List[str], output_stream: TextIO) -> None:
         """
@@ -163,15 +185,26 @@ class MorphologicalAnalyzer:
             output_stream: Выходная плынь
         """
         text = " ".join(buffer)
-        sentences = self.split_into_sentences(text)
-
-        for sentence in sentences:
+        sentences = [self.tokenize_sentence(sentence) for sentence in self.split_into_sentences(text)]
+
+        # Шукаем адразу ўсе словы буфера, кожнае напісанне толькі адзін раз
+        words = [token for tokens in sentences for token in tokens if not self._is_punctuation(token)]
+        variants_by_word = dict(zip(words, self.grammar_db.lookup_words(words, self.lookup_stats)))
+        if isinstance(self.grammar_db, GrammarDB):
+            # Словы са злучком, якіх няма ў базе, шукаюцца па частках
+            for word, variants in variants_by_word.items():
+                if variants is None and "-" in word:
+                    variants_by_word[word] = self.grammar_db.lookup_compound(word)
+
+        for tokens in sentences:
             output_stream.write("<s>\n")
-            tokens = self.tokenize_sentence(sentence)
 
             for i, token in enumerate(tokens):
                 # await self._write_options(tokens, i, output_stream)
-                analysis = await self.analyze_word(tokens, i)
+                if self._is_punctuation(token):
+                    analysis = token
+                else:
+                    analysis = await self._choose_variant(tokens, i, variants_by_word[token])
                 if analysis is None:
                     output_stream.write(token + "\n")
                 elif isinstance(analysis, str):
@@ -1,7 +1,13 @@
 import re
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
 
 
 class Normalizer:
+    # Версія правілаў нармалізацыі. Трэба павялічваць пры кожнай зьмене табліц ніжэй,
+    # бо ад яе залежаць захаваныя здымкі індэкса граматычнай базы
+    VERSION = 3
+
     CORRECT_STRESS = "\u0301"
     GRAMMAR_DB_STRESS = "+"
     ALL_STRESSES = CORRECT_STRESS + "\u00b4"
@@ -10,77 +16,274 @@ class Normalizer:
     CORRECT_APOSTROPHE = "\u02bc"
     ALL_APOSTROPHES = CORRECT_APOSTROPHE + "'\u2019"
     DASH = "-"
-    LETTERS = ALL_STRESSES + ALL_APOSTROPHES + DASH + "ёйцукенгґшўзхфывапролджэячсмітьъбющиЁЙЦУКЕНГҐШЎЗХФЫВАПРОЛДЖЭЯЧСМІТЬЪБЮЩИ" + "qwertyuiopasdfghjklzxcvbnmQWERTYUIOPASDFGHJKLZXCVBNM0123456789"
+    # Літары з убудаваным націскам, якія часам ужываюць замест літары і асобнага знака націску
+    PRECOMPOSED_STRESSED = "áéíóúýÁÉÍÓÚÝ"
+    # Кірылічныя літары, замест якіх звычайна стаяць літары з убудаваным націскам
+    PRECOMPOSED_STRESSED_CYRILLIC = "аеіоууАЕІОУУ"
+    # Лацінскія літары тых жа літар без націску, для слоў зусім без кірыліцы
+    PRECOMPOSED_STRESSED_LATIN = "aeiouyAEIOUY"
+    CYRILLIC_RE = re.compile("[\u0400-\u04ff]")
+    LETTERS = (
+        PRECOMPOSED_STRESSED
+        + ALL_STRESSES
+        + ALL_APOSTROPHES
+        + DASH
+        + "ёйцукенгґшўзхфывапролджэячсмітьъбющиЁЙЦУКЕНГҐШЎЗХФЫВАПРОЛДЖЭЯЧСМІТЬЪБЮЩИ"
+        + "qwertyuiopasdfghjklzxcvbnmQWERTYUIOPASDFGHJKLZXCVBNM0123456789"
+    )
+
+    # Рэжымы нармалізацыі для normalize_many
+    TOKENIZATION = "tokenization"
+    GRAMMAR_DB_AGGRESSIVE = "grammar_db_aggressive"
+    GRAMMAR_DB_LIGHT = "grammar_db_light"
+    # Кэш stress_variants у cache_info
+    STRESS_VARIANTS = "stress_variants"
+
+    # Падзяляльнік слоў у normalize_many: табліцы яго выдаляюць, а пакетныя табліцы захоўваюць
+    BATCH_SEPARATOR = "\x00"
+
+    # Колькасць слоў, для якіх кожны рэжым нармалізацыі па змаўчанні захоўвае гатовы вынік
+    DEFAULT_CACHE_SIZE = 16384
+
+    def __init__(self, cache_size: Optional[int] = DEFAULT_CACHE_SIZE):
+        """
+        Args:
+            cache_size: Колькасць слоў у кэшы кожнага рэжыму нармалізацыі, 0 - без кэша, None - без абмежавання
+        """
+        # Табліцы будуюцца адзін раз на працэс, экзэмпляры толькі спасылаюцца на іх
+        tables = _shared_tables()
+        self._tokenization_normalize = tables.tokenization_normalize
+        self._lowercase_normalize = tables.lowercase_normalize
+        self._grammar_search_aggressive_normalize = tables.grammar_search_aggressive_normalize
+        self._grammar_search_light_normalize = tables.grammar_search_light_normalize
+        self._translate_tables = tables.translate_tables
+        self._batch_tables = tables.batch_tables
+
+        # Частотнасць слоў у тэкстах вельмі нераўнамерная: паўторнае слова бярэцца з кэша
+        # адным пошукам у слоўніку замест str.translate
+        self._cache_size = cache_size
+        self._caches = {mode: lru_cache(maxsize=cache_size)(_translator(table)) for mode, table in self._translate_tables.items()}
+        self.tokinization_normalize: Callable[[str], str] = self._caches[self.TOKENIZATION]
+        self.grammar_db_aggressive_normalize: Callable[[str], str] = self._caches[self.GRAMMAR_DB_AGGRESSIVE]
+        self.grammar_db_light_normalize: Callable[[str], str] = self._caches[self.GRAMMAR_DB_LIGHT]
+        self._unstress_tables = tables.unstress_tables
+        self._stress_tables = tables.stress_tables
+        self._db_stress_tables = tables.db_stress_tables
+        # Лемы паўтараюцца яшчэ часцей за формы, таму абодва варыянты лемы захоўваюцца ў кэшы
+        self._caches[self.STRESS_VARIANTS] = lru_cache(maxsize=cache_size)(self._stress_variants_uncached)
+        self.stress_variants: Callable[[str], Tuple[str, str]] = self._caches[self.STRESS_VARIANTS]
+
+    def __reduce__(self):
+        # Кэшы не перадаём паміж працэсамі, табліцы там будуюцца нанова
+        return Normalizer, (self._cache_size,)
+
+    def cache_info(self) -> Dict[str, Any]:
+        """
+        Стан кэшаў нармалізацыі.
+
+        Returns:
+            Для кожнага рэжыму і для STRESS_VARIANTS CacheInfo з колькасцю трапленняў (hits), промахаў (misses),
+            найбольшым (maxsize) і бягучым (currsize) памерам кэша
+        """
+        return {mode: cache.cache_info() for mode, cache in self._caches.items()}
+
+    def cache_clear(self) -> None:
+        """Ачышчае кэшы нармалізацыі і іх лічыльнікі."""
+        for cache in self._caches.values():
+            cache.cache_clear()
+
+    def normalize_many(self, words: Iterable[str], mode: str = GRAMMAR_DB_AGGRESSIVE) -> List[str]:
+        """
+        Нармалізацыя адразу многіх слоў адным выклікам str.translate.
+
+        Args:
+            words: Словы
+            mode: TOKENIZATION, GRAMMAR_DB_AGGRESSIVE ці GRAMMAR_DB_LIGHT
+
+        Returns:
+            Нармалізаваныя словы ў тым жа парадку
+        """
+        words = list(words)
+        # Кожнае напісанне нармалізуецца адзін раз, колькі б разоў яно ні сустракалася
+        unique = list(dict.fromkeys(words))
+        # Словы з кірыліцай і без яе нармалізуюцца рознымі табліцамі, кожная група адным выклікам
+        groups: Tuple[List[str], List[str]] = ([], [])
+        for word in unique:
+            groups[self._script(word)].append(word)
+
+        normalized = {}
+        for script, group in enumerate(groups):
+            if not group:
+                continue
+            text = self.BATCH_SEPARATOR.join(group)
+            if text.count(self.BATCH_SEPARATOR) != len(group) - 1:
+                # Падзяляльнік ёсць у самых словах, тады кожнае слова нармалізуецца асобна
+                table = self._translate_tables[mode][script]
+                normalized.update((word, word.translate(table)) for word in group)
+            else:
+                normalized.update(zip(group, text.translate(self._batch_tables[mode][script]).split(self.BATCH_SEPARATOR)))
+        return [normalized[word] for word in words]
+
+    def is_apostrophe(self, c: str) -> bool:
+        return c in self.ALL_APOSTROPHES
+
+    def is_letter(self, c: str) -> bool:
+        return c in self.LETTERS
+
+    def unstress(self, word: str) -> str:
+        """Выдаляе ўсе знакі націску са слова, у тым ліку з літар з убудаваным націскам."""
+        return word.translate(self._unstress_tables[self._script(word)])
+
+    def has_stress(self, word: str) -> bool:
+        return word.translate(self._unstress_tables[self._script(word)]) != word
+
+    def db_stress_normalize(self, word: str) -> str:
+        return word.translate(self._db_stress_tables[self._script(word)])
+
+    def _script(self, word: str) -> int:
+        """
+        Якой табліцай націскаў апрацоўваць слова.
+
+        Літара з убудаваным націскам у беларускім слове - гэта кірылічная літара з націскам,
+        а ў слове зусім без кірыліцы яна застаецца лацінскай.
+
+        Returns:
+            0 для слоў з кірыліцай, 1 для астатніх
+        """
+        return 0 if self.CYRILLIC_RE.search(word) else 1
+
+    def _stress_variants_uncached(self, word: str) -> Tuple[str, str]:
+        """
+        Слова без націскаў і слова з націскамі ў адным напісанні.
+
+        Args:
+            word: Слова, напрыклад лема, з націскамі ў любым напісанні
+
+        Returns:
+            Слова без націскаў і слова, у якім кожны націск - CORRECT_STRESS пасля літары
+        """
+        script = self._script(word)
+        return word.translate(self._unstress_tables[script]), word.translate(self._stress_tables[script])
+
+
+class _NormalizerTables:
+    """Табліцы канвэртацыі Normalizer, агульныя для ўсіх экзэмпляраў у працэсе."""
 
     def __init__(self):
         # Ініцыялізацыя табліц канвэртацыі
-        self._tokenization_normalize = {}
+        self.tokenization_normalize = {}
 
         # Запаўненне базавых табліц
         for c in range(0x2020):
             if chr(c).isalnum():
-                self._tokenization_normalize[chr(c)] = chr(c)
+                self.tokenization_normalize[chr(c)] = chr(c)
 
         # Апострафы
-        for c in self.ALL_APOSTROPHES:
-            self._tokenization_normalize[c] = self.CORRECT_APOSTROPHE
+        for c in Normalizer.ALL_APOSTROPHES:
+            self.tokenization_normalize[c] = Normalizer.CORRECT_APOSTROPHE
 
         # Націскі
-        for c in self.ALL_STRESSES:
-            self._tokenization_normalize[c] = self.CORRECT_STRESS
+        for c in Normalizer.ALL_STRESSES:
+            self.tokenization_normalize[c] = Normalizer.CORRECT_STRESS
 
         # Ангельская i ў беларускую
-        self._tokenization_normalize["i"] = "і"
-        self._tokenization_normalize["I"] = "І"
+        self.tokenization_normalize["i"] = "і"
+        self.tokenization_normalize["I"] = "І"
+
+        # Літары з убудаваным націскам у словах з кірыліцай замяняюцца кірылічнай літарай і націскам,
+        # бо ў граматычнай базе ёсць толькі кірылічныя словы. Для слоў без кірыліцы ёсць асобныя табліцы
+        # з лацінскай літарай, гл. Normalizer._script
+        for c, letter in zip(Normalizer.PRECOMPOSED_STRESSED, Normalizer.PRECOMPOSED_STRESSED_CYRILLIC):
+            self.tokenization_normalize[c] = letter + Normalizer.CORRECT_STRESS
 
         # Злучкі
-        self._tokenization_normalize[self.DASH] = self.DASH
-
-        self._lowercase_normalize = {key: value.lower() for key, value in self._tokenization_normalize.items()}
-        self._grammar_search_aggressive_normalize = self._lowercase_normalize.copy()
-
-        self._grammar_search_aggressive_normalize["ў"] = "у"
-        self._grammar_search_aggressive_normalize["Ў"] = "у"
-
-        self._grammar_search_light_normalize = self._tokenization_normalize.copy()
-        self._grammar_search_light_normalize[self.GRAMMAR_DB_STRESS] = self.CORRECT_STRESS
-
-    def tokinization_normalize(self, word: str) -> str:
-        result = []
-        for c in word:
-            if normalized := self._tokenization_normalize.get(c):
-                result.append(normalized)
-        return "".join(result)
-
-    def grammar_db_aggressive_normalize(self, word: str) -> str:
-        result = []
-        for c in word:
-            if normalized := self._grammar_search_aggressive_normalize.get(c):
-                result.append(normalized)
-        return "".join(result)
-
-    def grammar_db_light_normalize(self, word: str) -> str:
-        result = []
-        for c in word:
-            if normalized := self._grammar_search_light_normalize.get(c):
-                result.append(normalized)
-        return "".join(result)
+        self.tokenization_normalize[Normalizer.DASH] = Normalizer.DASH
 
-    def is_apostrophe(self, c: str) -> bool:
-        return c in self.ALL_APOSTROPHES
+        self.lowercase_normalize = {key: value.lower() for key, value in self.tokenization_normalize.items()}
+        self.grammar_search_aggressive_normalize = self.lowercase_normalize.copy()
 
-    def is_letter(self, c: str) -> bool:
-        # todo а што рабіць зь неахайнымі выпадкамі калі замест націску хтось ужыў адразу камбінаваныя літары, кшталту áéó
-        # прапанаванае вырашэньне - дадаць гэтыя літары ў LETTERS
-        # а таксама дадаць маппінг у літару з камбінацыйным націскам
-        return c in self.LETTERS
+        self.grammar_search_aggressive_normalize["ў"] = "у"
+        self.grammar_search_aggressive_normalize["Ў"] = "у"
 
-    def unstress(self, word: str) -> str:
-        """Выдаляе ўсе знакі націску са слова."""
-        return "".join(c for c in word if c not in self.COMPLETELY_ALL_STRESSES)
+        self.grammar_search_light_normalize = self.tokenization_normalize.copy()
+        self.grammar_search_light_normalize[Normalizer.GRAMMAR_DB_STRESS] = Normalizer.CORRECT_STRESS
 
-    def has_stress(self, word: str) -> bool:
-        return any(c in self.COMPLETELY_ALL_STRESSES for c in word)
+        # Табліцы для str.translate: увесь радок канвэртуецца адным выклікам у C замест цыкла па сімвалах.
+        # Па пары табліц: для слоў з кірыліцай і для слоў без яе, у якіх літары з націскам застаюцца лацінскімі
+        latin = {c: letter + Normalizer.CORRECT_STRESS for c, letter in zip(Normalizer.PRECOMPOSED_STRESSED, Normalizer.PRECOMPOSED_STRESSED_LATIN)}
+        self.translate_tables = {
+            mode: (_TranslateTable.create(mapping), _TranslateTable.create({**mapping, **{c: convert(letter) for c, letter in latin.items()}}))
+            for mode, mapping, convert in (
+                (Normalizer.TOKENIZATION, self.tokenization_normalize, str),
+                (Normalizer.GRAMMAR_DB_AGGRESSIVE, self.grammar_search_aggressive_normalize, str.lower),
+                (Normalizer.GRAMMAR_DB_LIGHT, self.grammar_search_light_normalize, str),
+            )
+        }
+        self.batch_tables = {mode: tuple(table.with_separator(Normalizer.BATCH_SEPARATOR) for table in tables) for mode, tables in self.translate_tables.items()}
 
-    def db_stress_normalize(self, word: str) -> str:
-        return self.DB_STRESS_REPLACE_RE.sub(self.GRAMMAR_DB_STRESS, word)
+        # Табліцы націскаў: усе знакі націску і літары з убудаваным націскам апрацоўваюцца адным выклікам str.translate
+        # Па пары табліц: для слоў з кірыліцай і для слоў без яе, гл. Normalizer._script
+        self.unstress_tables = ({ord(c): None for c in Normalizer.COMPLETELY_ALL_STRESSES}, {ord(c): None for c in Normalizer.COMPLETELY_ALL_STRESSES})
+        self.stress_tables = ({ord(c): Normalizer.CORRECT_STRESS for c in Normalizer.COMPLETELY_ALL_STRESSES}, {ord(c): Normalizer.CORRECT_STRESS for c in Normalizer.COMPLETELY_ALL_STRESSES})
+        self.db_stress_tables = ({ord(c): Normalizer.GRAMMAR_DB_STRESS for c in Normalizer.COMPLETELY_ALL_STRESSES}, {ord(c): Normalizer.GRAMMAR_DB_STRESS for c in Normalizer.COMPLETELY_ALL_STRESSES})
+        for script, letters in enumerate((Normalizer.PRECOMPOSED_STRESSED_CYRILLIC, Normalizer.PRECOMPOSED_STRESSED_LATIN)):
+            for c, letter in zip(Normalizer.PRECOMPOSED_STRESSED, letters):
+                self.unstress_tables[script][ord(c)] = letter
+                self.stress_tables[script][ord(c)] = letter + Normalizer.CORRECT_STRESS
+                self.db_stress_tables[script][ord(c)] = letter + Normalizer.GRAMMAR_DB_STRESS
+
+
+@lru_cache(maxsize=None)
+def _shared_tables() -> _NormalizerTables:
+    """
+    Табліцы канвэртацыі, пабудаваныя пры першым выкліку.
+
+    Пабудова абыходзіць 0x2020 сімвалаў і займае некалькі мілісекунд, таму робіцца
+    адзін раз на працэс, а не ў кожным Tokenizer, GrammarDB і VertIO.write_vert.
+    Табліцы толькі чытаюцца, таму іх можна дзяліць паміж экзэмплярамі і патокамі.
+    """
+    return _NormalizerTables()
+
+
+def _translator(tables: Tuple[Dict[int, Optional[str]], Dict[int, Optional[str]]]) -> Callable[[str], str]:
+    """Нармалізацыя слова адным выклікам str.translate з табліцай для слоў з кірыліцай ці без яе."""
+    cyrillic_table, latin_table = tables
+    search_cyrillic = Normalizer.CYRILLIC_RE.search
+
+    def translate(word: str) -> str:
+        return word.translate(cyrillic_table if search_cyrillic(word) else latin_table)
+
+    return translate
+
+
+class _TranslateTable(dict):
+    """
+    Табліца для str.translate, у якой сімвалы без пары выдаляюцца.
+
+    Пары для ўсіх сімвалаў да 0x2020 запоўненыя загадзя, таму __missing__ выклікаецца
+    толькі для рэдкіх сімвалаў з-за межаў гэтага дыяпазону.
+    """
+
+    DENSE_LIMIT = 0x2020
+
+    @classmethod
+    def create(cls, mapping: Dict[str, str]) -> "_TranslateTable":
+        """
+        Args:
+            mapping: Сімвал -> замена, усе астатнія сімвалы выдаляюцца
+
+        Returns:
+            Табліца для str.translate
+        """
+        table = cls.fromkeys(range(cls.DENSE_LIMIT))
+        table.update((ord(key), value) for key, value in mapping.items())
+        return table
+
+    def with_separator(self, separator: str) -> "_TranslateTable":
+        """Копія табліцы, якая пакідае separator без змен."""
+        table = _TranslateTable(self)
+        table[ord(separator)] = separator
+        return table
+
+    def __missing__(self, key: int) -> Optional[str]:
+        return None
@@ -1,4 +1,4 @@
-from typing import List
+from typing import Iterable, Iterator, List
 from .tokenizer import Token, TokenType
 from .linguistic_bits import SentenceItem, SentenceItemType
 
@@ -8,7 +8,21 @@ class Sentencer:
         pass
 
     def to_sentences(self, tokens: List[Token]) -> List[List[SentenceItem]]:
-        result = []
+        return list(self.iter_sentences(tokens))
+
+    def iter_sentences(self, tokens: Iterable[Token]) -> Iterator[List[SentenceItem]]:
+        """
+        Збірае токены ў сказы, аддаючы кожны сказ, як толькі ён скончыўся.
+
+        Токены чытаюцца па адным, таму разам з Tokenizer.iter_tokens спіс токенаў усяго тэксту не ствараецца,
+        а назапашваюцца толькі элементы бягучага сказа.
+
+        Args:
+            tokens: Токены, напрыклад з Tokenizer.iter_tokens
+
+        Yields:
+            Элементы аднаго сказа
+        """
         current_sentence = []
         next_glueable = False
 
@@ -16,7 +30,7 @@ class Sentencer:
             if token.type == TokenType.SentenceSeparator:
                 next_glueable = False
                 if current_sentence:
-                    result.append(current_sentence)
+                    yield current_sentence
                     current_sentence = []
                 continue
 
@@ -40,6 +54,4 @@ class Sentencer:
                     current_sentence.append(SentenceItem(stripped_text, SentenceItemType.Punctuation))
 
         if current_sentence:
-            result.append(current_sentence)
-
-        return result
+            yield current_sentence
@@ -0,0 +1,117 @@
+"""
+Граматычная база ў multiprocessing.shared_memory для паралельных працоўных працэсаў.
+
+Пры паралельнай апрацоўцы кожны працэс з уласнай GrammarDB хутка атрымлівае ўласную
+копію індэкса: нават чытанне слоўнікаў змяняе лічыльнікі спасылак, і старонкі,
+агульныя пасля fork, капіююцца. Тут індэкс ляжыць адным сегментам агульнай памяці
+ў тым жа плоскім фармаце, што і ў MmapGrammarDB (пул радкоў і масівы зрухаў), таму
+N працэсаў займаюць прыкладна адзін індэкс плюс невялікія кэшы.
+
+Фармат сегмента: загаловак (магія, даўжыня файла ключоў, даўжыня файла запісаў),
+потым байты MmapGrammarDB.KEYS_FILE_NAME і MmapGrammarDB.RECORDS_FILE_NAME.
+"""
+
+import struct
+from multiprocessing import resource_tracker, shared_memory
+from .grammar_db import GrammarDB
+from .mmap_grammar_db import MmapGrammarDB
+
+
+class SharedGrammarDB(MmapGrammarDB):
+    """
+    Граматычная база ў агульнай памяці з тым жа API пошуку, што і GrammarDB.
+
+    Галоўны працэс стварае сегмент праз create і перадае працоўным працэсам name,
+    а тыя падключаюцца праз attach толькі для чытання.
+    """
+
+    HEADER = struct.Struct("<4sQQ")
+    MAGIC = b"GDBS"
+
+    def __init__(self, segment: shared_memory.SharedMemory, owner: bool, cache_size: int = 65536):
+        """
+        Падключэнне да ўжо запоўненага сегмента. Выкарыстоўвайце create або attach.
+
+        Args:
+            segment: Сегмент агульнай памяці
+            owner: Ці выдаляць сегмент пры close
+            cache_size: Колькасць формаў, для якіх захоўваюцца ўжо дэкадаваныя GrammarInfo
+        """
+        self._files = []
+        self._segment = segment
+        self._owner = owner
+        magic, keys_size, records_size = self.HEADER.unpack_from(segment.buf, 0)
+        if magic != self.MAGIC:
+            raise ValueError(f"Няправільны фармат сегмента агульнай памяці: {magic!r}")
+        keys_start = self.HEADER.size
+        records_start = keys_start + keys_size
+        keys = segment.buf[keys_start:records_start]
+        records = segment.buf[records_start : records_start + records_size]
+        if not owner:
+            # Працоўныя працэсы толькі чытаюць, запіс у агульны індэкс пашкодзіў бы яго для ўсіх
+            keys, records = keys.toreadonly(), records.toreadonly()
+        self._attach(keys, records, cache_size)
+
+    @classmethod
+    def create(cls, grammar_db: GrammarDB, cache_size: int = 65536) -> "SharedGrammarDB":
+        """
+        Стварэнне сегмента агульнай памяці з індэксам загружанай базы.
+
+        Args:
+            grammar_db: Загружаная граматычная база, пасля стварэння яе можна вызваліць
+            cache_size: Памер кэша дэкадаваных формаў
+
+        Returns:
+            База, якая валодае сегментам і выдаляе яго пры close
+        """
+        keys, records = cls.serialize(grammar_db)
+        segment = shared_memory.SharedMemory(create=True, size=cls.HEADER.size + len(keys) + len(records))
+        cls.HEADER.pack_into(segment.buf, 0, cls.MAGIC, len(keys), len(records))
+        segment.buf[cls.HEADER.size : cls.HEADER.size + len(keys)] = keys
+        segment.buf[cls.HEADER.size + len(keys) : cls.HEADER.size + len(keys) + len(records)] = records
+        return cls(segment, owner=True, cache_size=cache_size)
+
+    @classmethod
+    def attach(cls, name: str, cache_size: int = 65536) -> "SharedGrammarDB":
+        """
+        Падключэнне да сегмента, створанага ў іншым працэсе.
+
+        Args:
+            name: SharedGrammarDB.name у працэсе-ўладальніку
+            cache_size: Памер кэша дэкадаваных формаў
+
+        Returns:
+            База толькі для чытання
+        """
+        try:
+            segment = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:
+            # Да Python 3.13 падключэнне рэгіструе сегмент у resource_tracker, і той выдаліць сегмент, калі скончыцца,
+            # таму рэгістрацыя адразу здымаецца. Калі resource_tracker агульны з уладальнікам (нашчадкі ўладальніка),
+            # гэта здымае і рэгістрацыю ўладальніка, і close уладальніка аднаўляе яе перад unlink
+            segment = shared_memory.SharedMemory(name=name)
+            resource_tracker.unregister(segment._name, "shared_memory")
+        return cls(segment, owner=False, cache_size=cache_size)
+
+    @property
+    def name(self) -> str:
+        """Імя сегмента для attach у іншых працэсах."""
+        return self._segment.name
+
+    def close(self) -> None:
+        """Адключэнне ад сегмента, а для ўладальніка і выдаленне сегмента."""
+        self._find_entry.cache_clear()
+        # Сегмент нельга закрыць, пакуль на яго буфер ёсць спасылкі
+        self._keys.release()
+        self._records.release()
+        self._segment.close()
+        if self._owner:
+            # unlink здымае рэгістрацыю ў resource_tracker, якую магло ўжо зняць падключэнне праз агульны resource_tracker
+            resource_tracker.register(self._segment._name, "shared_memory")
+            try:
+                self._segment.unlink()
+            except FileNotFoundError:
+                pass
+
+    def __enter__(self) -> "SharedGrammarDB":
+        return self
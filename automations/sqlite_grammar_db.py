@@ -0,0 +1,389 @@
+"""
+Граматычная база, скампіляваная ў адзін файл SQLite.
+
+Файл не патрабуе ні XML, ні індэксацыі пры старце і чытаецца любым кліентам SQLite,
+таму яго зручна пастаўляць у Lambda і ў бэкенд рэдактара. Пошук ідзе праз
+падрыхтаваныя запыты sqlite3, а перад імі стаіць LRU кэш ужо дэкадаваных формаў.
+
+Табліцы:
+
+paradigms
+    парадыгма: ідэнтыфікатар, значэнне, файл і радок у ім
+variants
+    варыянт парадыгмы: лема (як ёсць, пасля grammar_db_light_normalize і пасля
+    grammar_db_aggressive_normalize для пошуку), тэг, часціна мовы і ўласцівасці варыянта
+forms
+    форма варыянта: нармалізаваная форма, парадак сярод варыянтаў гэтай формы, тэг,
+    радок у файле, уласцівасці формы і расшыфроўка тэга
+inferences
+    гатовы вынік infer_grammar_info для кожнай нармалізаванай формы
+"""
+
+import argparse
+import os
+import sqlite3
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from .grammar_db import GrammarDB
+from .linguistic_bits import GrammarInfo, GrammarProperties, LinguisticTag, ParadigmFormId
+from .normalizer import Normalizer
+
+SCHEMA = """
+CREATE TABLE paradigms (
+    paradigm_id INTEGER PRIMARY KEY,
+    meaning TEXT,
+    file_name TEXT NOT NULL,
+    paradigm_line INTEGER
+);
+CREATE TABLE variants (
+    variant_key INTEGER PRIMARY KEY,
+    paradigm_id INTEGER NOT NULL REFERENCES paradigms (paradigm_id),
+    variant_id TEXT NOT NULL,
+    lemma TEXT,
+    normalized_lemma TEXT,
+    lemma_key TEXT,
+    paradigm_tag TEXT NOT NULL,
+    pos_id TEXT NOT NULL,
+    pos TEXT NOT NULL,
+    variant_pravapis TEXT,
+    variant_slouniki TEXT,
+    variant_type TEXT,
+    UNIQUE (paradigm_id, variant_id)
+);
+CREATE TABLE forms (
+    form_key INTEGER PRIMARY KEY,
+    normalized_form TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    variant_key INTEGER NOT NULL REFERENCES variants (variant_key),
+    form_tag TEXT,
+    form_line INTEGER,
+    form_slouniki TEXT,
+    form_options TEXT,
+    form_pravapis TEXT,
+    form_description TEXT NOT NULL
+);
+CREATE TABLE inferences (
+    normalized_form TEXT PRIMARY KEY,
+    paradigm_id INTEGER,
+    variant_id TEXT,
+    form_tag TEXT,
+    lemma TEXT,
+    paradigm_tag TEXT,
+    tag_form_tag TEXT
+) WITHOUT ROWID;
+"""
+
+# Індэксы ствараюцца пасля запаўнення табліц, так хутчэй, чым абнаўляць іх на кожны радок
+INDEXES = """
+CREATE INDEX forms_by_normalized_form ON forms (normalized_form, position);
+CREATE INDEX forms_by_variant ON forms (variant_key);
+CREATE INDEX variants_by_lemma_key ON variants (lemma_key);
+"""
+
+# Слупкі ў парадку палёў GrammarInfo, уласцівасці - у парадку GrammarDB.PROPERTY_NAMES.
+# sqlite3 кэшуе падрыхтаваныя запыты па іх тэксце, таму тэкст запыту не змяняецца паміж выклікамі
+LOOKUP_QUERY = """
+SELECT p.paradigm_id, v.variant_id, f.form_tag, p.paradigm_line, f.form_line, v.paradigm_tag, v.pos_id, v.pos, p.file_name,
+    v.lemma, v.normalized_lemma, p.meaning, v.variant_pravapis, v.variant_slouniki, f.form_slouniki, f.form_options, v.variant_type,
+    f.form_pravapis, f.form_description
+FROM forms f JOIN variants v ON v.variant_key = f.variant_key JOIN paradigms p ON p.paradigm_id = v.paradigm_id
+"""
+
+
+class SqliteGrammarDB:
+    """Граматычная база з тым жа API пошуку, што і GrammarDB, але з індэксам у файле SQLite."""
+
+    # Версія схемы ў PRAGMA user_version
+    VERSION = 1
+
+    # Падзяляльнік пазнак form_description
+    DESCRIPTION_SEPARATOR = "\n"
+
+    def __init__(self, path: Path, cache_size: int = 65536):
+        """
+        Адкрыццё скампіляванай базы толькі для чытання.
+
+        Args:
+            path: Шлях да файла SQLite
+            cache_size: Колькасць формаў, для якіх захоўваюцца ўжо дэкадаваныя GrammarInfo
+        """
+        if not Path(path).is_file():
+            raise FileNotFoundError(f"Файл граматычнай базы '{path}' не знойдзены")
+        self._connection = sqlite3.connect(f"{Path(path).resolve().as_uri()}?mode=ro", uri=True, check_same_thread=False)
+        (version,) = self._connection.execute("PRAGMA user_version").fetchone()
+        if version != self.VERSION:
+            self._connection.close()
+            raise ValueError(f"Няправільная версія схемы граматычнай базы: {version}")
+
+        self._normalizer = Normalizer()
+        self._find_forms = lru_cache(maxsize=cache_size)(self._find_forms_uncached)
+        self._find_inference = lru_cache(maxsize=cache_size)(self._find_inference_uncached)
+
+    def close(self) -> None:
+        """Закрыццё злучэння з базай."""
+        self._find_forms.cache_clear()
+        self._find_inference.cache_clear()
+        self._connection.close()
+
+    def __enter__(self) -> "SqliteGrammarDB":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self._connection.execute("SELECT count(*) FROM inferences").fetchone()[0]
+
+    def lookup_word(self, word: str) -> Optional[List[GrammarInfo]]:
+        """
+        Пошук слова ў базе.
+
+        Args:
+            word: Слова для пошуку
+
+        Returns:
+            Спіс магчымых граматычных варыянтаў або None, калі слова не знойдзена
+        """
+        grammar_infos = self._find_forms(self._normalizer.grammar_db_aggressive_normalize(word))
+        return list(grammar_infos) if grammar_infos else None
+
+    def infer_grammar_info(self, word: str) -> Tuple[Optional[ParadigmFormId], Optional[str], Optional[LinguisticTag]]:
+        """
+        Выводзіць граматычную інфармацыю для слова. Вынік падлічаны загадзя пры кампіляцыі базы.
+
+        Args:
+            word: Слова для аналізу
+
+        Returns:
+            ParadigmaFormId, лемма, LinguisticTag
+        """
+        return self._find_inference(self._normalizer.grammar_db_aggressive_normalize(word))
+
+    # Пакетныя пошукі працуюць праз lookup_word і infer_grammar_info, таму агульныя з GrammarDB
+    lookup_words = GrammarDB.lookup_words
+    infer_many = GrammarDB.infer_many
+
+    def get_paradigm(self, paradigm_id: int) -> Optional[Dict[str, List[GrammarInfo]]]:
+        """
+        Усе формы парадыгмы, згрупаваныя па варыянтах.
+
+        Args:
+            paradigm_id: Ідэнтыфікатар парадыгмы
+
+        Returns:
+            Слоўнік ідэнтыфікатар варыянта -> формы ў парадку файла, або None, калі парадыгмы няма
+        """
+        rows = self._connection.execute(f"{LOOKUP_QUERY} WHERE v.paradigm_id = ? ORDER BY f.form_key", (paradigm_id,)).fetchall()
+        if not rows:
+            return None
+
+        variants: Dict[str, List[GrammarInfo]] = {}
+        for row in rows:
+            grammar_info = self._decode_row(row)
+            variants.setdefault(grammar_info.paradigma_form_id.variant_id, []).append(grammar_info)
+        return variants
+
+    def paradigm_location(self, paradigm_id: int) -> Optional[Tuple[str, int]]:
+        """
+        Месцазнаходжанне парадыгмы ў XML файлах, з якіх скампіляваная база.
+
+        Args:
+            paradigm_id: Ідэнтыфікатар парадыгмы
+
+        Returns:
+            Картэж (імя файла, нумар радка) або None, калі парадыгмы няма
+        """
+        row = self._connection.execute("SELECT file_name, paradigm_line FROM paradigms WHERE paradigm_id = ?", (paradigm_id,)).fetchone()
+        return tuple(row) if row else None
+
+    def find_paradigms_by_lemma(self, lemma: str) -> List[int]:
+        """
+        Пошук парадыгмаў па леме без уліку націску і вялікіх літар.
+
+        Args:
+            lemma: Лема
+
+        Returns:
+            Ідэнтыфікатары парадыгмаў у парадку загрузкі
+        """
+        rows = self._connection.execute(
+            "SELECT paradigm_id FROM variants WHERE lemma_key = ? GROUP BY paradigm_id ORDER BY min(variant_key)",
+            (self._normalizer.grammar_db_aggressive_normalize(lemma),),
+        )
+        return [paradigm_id for (paradigm_id,) in rows]
+
+    def _find_forms_uncached(self, normalized_word: str) -> Tuple[GrammarInfo, ...]:
+        """
+        Варыянты нармалізаванай формы ў парадку GrammarDB.lookup_word.
+
+        Args:
+            normalized_word: Нармалізаваная форма
+
+        Returns:
+            Варыянты, пусты картэж калі формы няма
+        """
+        rows = self._connection.execute(f"{LOOKUP_QUERY} WHERE f.normalized_form = ? ORDER BY f.position", (normalized_word,))
+        return tuple(self._decode_row(row) for row in rows)
+
+    def _find_inference_uncached(self, normalized_word: str) -> Tuple[Optional[ParadigmFormId], Optional[str], Optional[LinguisticTag]]:
+        """
+        Загадзя падлічаны вынік infer_grammar_info.
+
+        Args:
+            normalized_word: Нармалізаваная форма
+
+        Returns:
+            ParadigmaFormId, лемма, LinguisticTag
+        """
+        row = self._connection.execute(
+            "SELECT paradigm_id, variant_id, form_tag, lemma, paradigm_tag, tag_form_tag FROM inferences WHERE normalized_form = ?",
+            (normalized_word,),
+        ).fetchone()
+        if row is None:
+            return (None, None, None)
+
+        paradigm_id, variant_id, form_tag, lemma, paradigm_tag, tag_form_tag = row
+        paradigma_form_id = ParadigmFormId(paradigm_id, variant_id, form_tag) if paradigm_id is not None else None
+        linguistic_tag = LinguisticTag(paradigm_tag, tag_form_tag) if paradigm_tag is not None else None
+        return (paradigma_form_id, lemma, linguistic_tag)
+
+    def _decode_row(self, row: Tuple) -> GrammarInfo:
+        """
+        Дэкадаванне аднаго радка LOOKUP_QUERY.
+
+        Args:
+            row: Радок з слупкамі ў парадку LOOKUP_QUERY
+
+        Returns:
+            GrammarInfo
+        """
+        paradigm_id, variant_id, form_tag, paradigm_line, form_line, paradigm_tag, pos_id, pos, file_name, lemma, normalized_lemma, meaning = row[:12]
+        description = row[-1]
+
+        return GrammarInfo(
+            paradigma_form_id=ParadigmFormId(paradigm_id, variant_id, form_tag),
+            paradigm_line=paradigm_line,
+            form_line=form_line,
+            linguistic_tag=LinguisticTag(paradigm_tag, form_tag),
+            pos_id=pos_id,
+            pos=pos,
+            file_name=file_name,
+            lemma=lemma,
+            normalized_lemma=normalized_lemma,
+            meaning=meaning,
+            properties=GrammarProperties(row[12:-1]),
+            form_description=tuple(description.split(self.DESCRIPTION_SEPARATOR)) if description else (),
+        )
+
+    @classmethod
+    def build(cls, grammar_db: GrammarDB, path: Path) -> None:
+        """
+        Запіс скампіляванай базы ў файл SQLite. Файл замяняецца цалкам, толькі калі запіс паспяховы.
+
+        Args:
+            grammar_db: Загружаная граматычная база
+            path: Шлях да файла SQLite
+        """
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp_path.unlink(missing_ok=True)
+        normalizer = Normalizer()
+
+        try:
+            connection = sqlite3.connect(tmp_path)
+            try:
+                connection.executescript(SCHEMA)
+                variant_keys: Dict[Tuple[int, str], int] = {}
+                with connection:
+                    for paradigm_id, paradigm_forms in grammar_db.iter_paradigms():
+                        first = paradigm_forms[0]
+                        connection.execute("INSERT INTO paradigms VALUES (?, ?, ?, ?)", (paradigm_id, first.meaning, first.file_name, first.paradigm_line))
+                        for info in paradigm_forms:
+                            variant = (paradigm_id, info.paradigma_form_id.variant_id)
+                            if variant in variant_keys:
+                                continue
+                            variant_keys[variant] = variant_key = len(variant_keys) + 1
+                            connection.execute(
+                                "INSERT INTO variants VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                                (
+                                    variant_key,
+                                    paradigm_id,
+                                    info.paradigma_form_id.variant_id,
+                                    info.lemma,
+                                    info.normalized_lemma,
+                                    normalizer.grammar_db_aggressive_normalize(info.lemma),
+                                    info.linguistic_tag.paradigm_tag,
+                                    info.pos_id,
+                                    info.pos,
+                                    info.properties.get("variant_pravapis"),
+                                    info.properties.get("variant_slouniki"),
+                                    info.properties.get("variant_type"),
+                                ),
+                            )
+
+                    # Формы ўстаўляюцца ў парадку парадыгмаў, каб get_paradigm вяртаў іх у парадку файла
+                    positions: Dict[int, Tuple[str, int]] = {}
+                    inference_rows = []
+                    for normalized_form, grammar_info_list, inference in grammar_db.iter_index():
+                        for position, info in enumerate(grammar_info_list):
+                            positions[id(info)] = (normalized_form, position)
+                        paradigma_form_id, lemma, linguistic_tag = inference
+                        inference_rows.append(
+                            (
+                                normalized_form,
+                                paradigma_form_id.paradigm_id if paradigma_form_id else None,
+                                paradigma_form_id.variant_id if paradigma_form_id else None,
+                                paradigma_form_id.form_tag if paradigma_form_id else None,
+                                lemma,
+                                linguistic_tag.paradigm_tag if linguistic_tag else None,
+                                linguistic_tag.form_tag if linguistic_tag else None,
+                            )
+                        )
+                    connection.executemany("INSERT INTO inferences VALUES (?, ?, ?, ?, ?, ?, ?)", inference_rows)
+
+                    for paradigm_id, paradigm_forms in grammar_db.iter_paradigms():
+                        connection.executemany(
+                            "INSERT INTO forms (normalized_form, position, variant_key, form_tag, form_line, form_slouniki, form_options, form_pravapis, form_description)"
+                            " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                            (
+                                (
+                                    *positions[id(info)],
+                                    variant_keys[(paradigm_id, info.paradigma_form_id.variant_id)],
+                                    info.paradigma_form_id.form_tag,
+                                    info.form_line,
+                                    info.properties.get("form_slouniki"),
+                                    info.properties.get("form_options"),
+                                    info.properties.get("form_pravapis"),
+                                    cls.DESCRIPTION_SEPARATOR.join(info.form_description),
+                                )
+                                for info in paradigm_forms
+                            ),
+                        )
+                    connection.executescript(INDEXES)
+                    connection.execute(f"PRAGMA user_version = {cls.VERSION}")
+                connection.execute("VACUUM")
+            finally:
+                connection.close()
+        except BaseException:
+            # Напалову запоўнены файл не павінен заставацца побач з базай
+            tmp_path.unlink(missing_ok=True)
+            raise
+        os.replace(tmp_path, path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Кампіляцыя граматычнай базы ў файл SQLite для SqliteGrammarDB")
+    parser.add_argument("grammar_base_path", help="Шлях да дырэкторыі з граматычнай базай")
+    parser.add_argument("output", help="Шлях да файла SQLite")
+    parser.add_argument("--pravapis", type=lambda value: value.split(","), help="Выкарыстоўваць толькі формы гэтых правапісаў праз коску, напрыклад A2008")
+    parser.add_argument("--slouniki", type=lambda value: value.split(","), help="Выкарыстоўваць толькі формы з гэтых слоўнікаў праз коску, напрыклад sbm2012")
+    args = parser.parse_args()
+
+    grammar_db = GrammarDB()
+    grammar_db.load_directory(Path(args.grammar_base_path), pravapis=args.pravapis, slouniki=args.slouniki)
+    SqliteGrammarDB.build(grammar_db, Path(args.output))
+
+
+if __name__ == "__main__":
+    main()
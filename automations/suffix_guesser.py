@@ -0,0 +1,145 @@
+"""
+Здагадкі пра граматыку слоў, якіх няма ў граматычнай базе, па іх канчатках.
+"""
+
+from collections import Counter
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, List, Set, Tuple
+from .linguistic_bits import GrammarInfo, LinguisticTag
+from .normalizer import Normalizer
+
+# Кандыдат: paradigm_tag, form_tag, колькі літар нармалізаванай формы адкінуць ад канца і што дапісаць
+# у напісанні лемы, каб атрымаць лему
+_Candidate = Tuple[str, str, int, str]
+
+
+@dataclass(frozen=True, slots=True)
+class SuffixGuess:
+    """Адна здагадка для невядомага слова."""
+
+    linguistic_tag: LinguisticTag  # Граматычныя тэгі
+    lemma: str  # Лема ў напісанні слова: пачатак слова пасля grammar_db_light_normalize і канчатак з напісання вядомай лемы
+    probability: float  # Доля гэтых тэгаў і правіла лемы сярод усіх разбораў вядомых формаў з гэтым канчаткам
+    suffix: str  # Самы доўгі вядомы канчатак, па якім зроблена здагадка
+
+
+class SuffixGuesser:
+    """
+    Статыстыка тэгаў і правілаў утварэння лемы для канчаткаў вядомых формаў.
+
+    Канчаткі да max_suffix_length літар ляжаць у адным слоўніку, які працуе як адваротнае
+    прэфікснае дрэва: вузел дрэва - гэта канчатак, а яго бацька - той жа канчатак без першай літары.
+    Для невядомага слова правяраюцца яго канчаткі ад самага доўгага, таму здагадка займае
+    не больш за max_suffix_length пошукаў у слоўніку і абапіраецца на найбольш падобныя вядомыя формы.
+    """
+
+    def __init__(self, word_forms: Iterable[Tuple[str, List[GrammarInfo]]], max_suffix_length: int = 6, min_count: int = 2, max_candidates: int = 10, cache_size: int = 65536):
+        """
+        Args:
+            word_forms: Пары (нармалізаваная форма, яе варыянты)
+            max_suffix_length: Найбольшая даўжыня канчатка ў літарах
+            min_count: Колькі розных формаў павінна мець канчатак, каб па ім рабіць здагадкі
+            max_candidates: Колькі самых частых кандыдатаў захоўваецца для канчатка
+            cache_size: Колькасць слоў, для якіх захоўваюцца гатовыя здагадкі
+        """
+        self._max_suffix_length = max_suffix_length
+        normalizer = self._normalizer = Normalizer()
+        lemma_keys: Dict[str, str] = {}
+        # (лема, колькі нармалізаваных літар у яе агульным з формай пачатку) -> канчатак лемы ў яе напісанні
+        endings: Dict[Tuple[str, int], str] = {}
+        counters: Dict[str, Counter] = {}
+        form_counts: Counter = Counter()
+
+        for normalized_form, grammar_info_list in word_forms:
+            candidates: Set[_Candidate] = set()
+            for grammar_info in grammar_info_list:
+                lemma_key = lemma_keys.get(grammar_info.lemma)
+                if lemma_key is None:
+                    lemma_key = lemma_keys[grammar_info.lemma] = normalizer.grammar_db_aggressive_normalize(grammar_info.lemma)
+                common = _common_prefix_length(normalized_form, lemma_key)
+                ending = endings.get((grammar_info.lemma, common))
+                if ending is None:
+                    ending = endings[(grammar_info.lemma, common)] = grammar_info.lemma[_spelling_prefix_length(grammar_info.lemma, common, normalizer.grammar_db_aggressive_normalize) :]
+                tag = grammar_info.linguistic_tag
+                candidates.add((tag.paradigm_tag, tag.form_tag, len(normalized_form) - common, ending))
+
+            for length in range(1, min(max_suffix_length, len(normalized_form)) + 1):
+                suffix = normalized_form[-length:]
+                form_counts[suffix] += 1
+                counter = counters.get(suffix)
+                if counter is None:
+                    counter = counters[suffix] = Counter()
+                counter.update(candidates)
+
+        # Пасля пабудовы ад лічыльнікаў застаюцца толькі самыя частыя кандыдаты
+        self._suffixes: Dict[str, Tuple[int, Tuple[Tuple[_Candidate, int], ...]]] = {
+            suffix: (sum(counter.values()), tuple(counter.most_common(max_candidates))) for suffix, counter in counters.items() if form_counts[suffix] >= min_count
+        }
+        self.guess = lru_cache(maxsize=cache_size)(self._guess_uncached)
+
+    def __len__(self) -> int:
+        return len(self._suffixes)
+
+    def _guess_uncached(self, word: str) -> Tuple[SuffixGuess, ...]:
+        """
+        Здагадкі для слова, найбольш імаверныя першымі.
+
+        Канчаткі шукаюцца па grammar_db_aggressive_normalize, а лема, як і ў lookup_compound, складаецца
+        з напісання слова пасля grammar_db_light_normalize, таму захоўвае ў, вялікія літары і націск.
+
+        Args:
+            word: Слова пасля grammar_db_light_normalize
+
+        Returns:
+            Здагадкі па самым доўгім вядомым канчатку або пусты картэж
+        """
+        normalize = self._normalizer.grammar_db_aggressive_normalize
+        normalized_word = normalize(word)
+        for length in range(min(self._max_suffix_length, len(normalized_word)), 0, -1):
+            suffix = normalized_word[-length:]
+            node = self._suffixes.get(suffix)
+            if node is None:
+                continue
+
+            total, candidates = node
+            guesses = tuple(
+                SuffixGuess(LinguisticTag(paradigm_tag, form_tag), word[: _spelling_prefix_length(word, len(normalized_word) - strip, normalize)] + ending, count / total, suffix)
+                for (paradigm_tag, form_tag, strip, ending), count in candidates
+                # Лема не можа быць утвораная, калі правіла адкідае ўсё слова
+                if strip < len(normalized_word)
+            )
+            if guesses:
+                return guesses
+        return ()
+
+
+def _spelling_prefix_length(spelling: str, normalized_length: int, normalize: Callable[[str], str]) -> int:
+    """
+    Даўжыня найдаўжэйшага пачатку напісання, які пасля нармалізацыі мае normalized_length літар.
+    Націск пасля апошняй літары пачатку застаецца ў ім.
+
+    Args:
+        spelling: Напісанне слова
+        normalized_length: Колькасць літар пачатку пасля нармалізацыі
+        normalize: Нармалізацыя, якая пераўтварае кожны сімвал асобна
+
+    Returns:
+        Колькасць сімвалаў напісання
+    """
+    length = 0
+    for index, c in enumerate(spelling):
+        normalized = normalize(c)
+        if length == normalized_length and normalized:
+            return index
+        length += len(normalized)
+    return len(spelling)
+
+
+def _common_prefix_length(first: str, second: str) -> int:
+    length = 0
+    for a, b in zip(first, second):
+        if a != b:
+            break
+        length += 1
+    return length
@@ -0,0 +1,126 @@
+"""
+Пошук формаў па пазіцыях граматычных тэгаў.
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+from .linguistic_bits import GrammarInfo, LinguisticTag
+
+
+class TagIndex:
+    """
+    Інвертаваны індэкс па сімвалах paradigm_tag і form_tag.
+
+    LinguisticTag пазіцыйны: кожны сімвал тэга на сваім месцы азначае адну граматычную катэгорыю.
+    Для кожнай пары (пазіцыя, сімвал) індэкс захоўвае бітавую карту формаў, у якіх на гэтай пазіцыі
+    стаіць гэты сімвал. Бітавыя карты - звычайныя цэлыя Python, таму перасячэнне некалькіх умоў -
+    гэта некалькі аперацый & над цэлымі, якія выконваюцца ў C па 30 біт за раз, без абыходу
+    ўсіх формаў у Python.
+    """
+
+    def __init__(self, forms: Iterable[Tuple[str, GrammarInfo]]):
+        """
+        Args:
+            forms: Пары (нармалізаваная форма, варыянт)
+        """
+        self._forms = list(forms)
+        size = len(self._forms)
+        self._paradigm_positions = self._build_positions(size, (grammar_info.linguistic_tag.paradigm_tag for _, grammar_info in self._forms))
+        self._form_positions = self._build_positions(size, (grammar_info.linguistic_tag.form_tag for _, grammar_info in self._forms))
+        self._all = (1 << size) - 1
+
+    def __len__(self) -> int:
+        return len(self._forms)
+
+    @staticmethod
+    def _build_positions(size: int, tags: Iterable[Optional[str]]) -> List[Dict[str, int]]:
+        """
+        Бітавыя карты для ўсіх пазіцый тэгаў.
+
+        Біты спачатку ставяцца ў bytearray: кожнае |= над вялікім цэлым стварала б новае цэлае.
+
+        Args:
+            size: Колькасць формаў
+            tags: Тэгі формаў па парадку, None для формаў без тэга
+
+        Returns:
+            Для кожнай пазіцыі слоўнік сімвал -> бітавая карта, пад ключом LinguisticTag.MISSING
+            карта ўсіх формаў, у тэгу якіх ёсць гэтая пазіцыя
+        """
+        positions: List[Dict[str, bytearray]] = []
+        for index, tag in enumerate(tags):
+            if not tag:
+                continue
+            byte_index, bit = index >> 3, 1 << (index & 7)
+            for position, char in enumerate(tag):
+                if position == len(positions):
+                    positions.append({LinguisticTag.MISSING: bytearray((size + 7) // 8)})
+                chars = positions[position]
+                bitmap = chars.get(char)
+                if bitmap is None:
+                    bitmap = chars[char] = bytearray((size + 7) // 8)
+                bitmap[byte_index] |= bit
+                chars[LinguisticTag.MISSING][byte_index] |= bit
+        return [{char: int.from_bytes(bitmap, "little") for char, bitmap in chars.items()} for chars in positions]
+
+    def _match(self, bits: int, positions: List[Dict[str, int]], pattern: Optional[str]) -> int:
+        """
+        Звужэнне бітавай карты ўмовай на адзін тэг.
+
+        Args:
+            bits: Бітавая карта формаў, якія падыходзяць пад папярэднія ўмовы
+            positions: Бітавыя карты пазіцый тэга
+            pattern: Пачатак тэга, LinguisticTag.MISSING на пазіцыі азначае любы сімвал
+
+        Returns:
+            Бітавая карта формаў, якія падыходзяць яшчэ і пад гэтую ўмову
+        """
+        if pattern is None:
+            return bits
+        for position, char in enumerate(pattern):
+            if not bits:
+                break
+            bits &= positions[position].get(char, 0) if position < len(positions) else 0
+        return bits
+
+    def _bits(self, paradigm_tag: Optional[str], form_tag: Optional[str]) -> int:
+        """Бітавая карта формаў, якія падыходзяць пад абедзве ўмовы."""
+        bits = self._match(self._all, self._paradigm_positions, paradigm_tag)
+        return self._match(bits, self._form_positions, form_tag)
+
+    def query(self, paradigm_tag: Optional[str] = None, form_tag: Optional[str] = None, limit: Optional[int] = None) -> List[Tuple[str, GrammarInfo]]:
+        """
+        Формы, тэгі якіх пачынаюцца з зададзеных узораў.
+
+        Напрыклад, paradigm_tag="NC" і form_tag="GP" - усе агульныя назоўнікі ў родным склоне множнага ліку,
+        а paradigm_tag="V..P" - дзеясловы з P на чацвёртай пазіцыі тэга парадыгмы.
+
+        Args:
+            paradigm_tag: Узор paradigm_tag або None, калі ён любы
+            form_tag: Узор form_tag або None, калі ён любы
+            limit: Максімальная колькасць вынікаў
+
+        Returns:
+            Пары (нармалізаваная форма, варыянт) у парадку індэкса
+        """
+        bits = self._bits(paradigm_tag, form_tag)
+        # Радок бітаў, малодшы біт першы: пошук адзінак у радку ідзе ў C, а не па адным біце ў Python
+        binary = bin(bits)[:1:-1]
+        result = []
+        index = binary.find("1")
+        while index != -1 and (limit is None or len(result) < limit):
+            result.append(self._forms[index])
+            index = binary.find("1", index + 1)
+        return result
+
+    def count(self, paradigm_tag: Optional[str] = None, form_tag: Optional[str] = None) -> int:
+        """
+        Колькасць формаў, тэгі якіх пачынаюцца з зададзеных узораў.
+
+        Args:
+            paradigm_tag: Узор paradigm_tag або None, калі ён любы
+            form_tag: Узор form_tag або None, калі ён любы
+
+        Returns:
+            Колькасць пар (нармалізаваная форма, варыянт)
+        """
+        return self._bits(paradigm_tag, form_tag).bit_count()
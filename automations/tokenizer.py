@@ -1,6 +1,9 @@
+import re
 from enum import Enum
+from functools import lru_cache
 from dataclasses import dataclass
-from typing import List
+from typing import Iterator, List, Optional, Tuple
+from .linguistic_bits import SentenceItem, SentenceItemType
 from .normalizer import Normalizer
 
 
@@ -27,93 +30,142 @@ class Tokenizer:
         self._process_simple_html = process_simple_html
 
     def parse(self, line: str) -> List[Token]:
-        result = []
-        current_word = []
-        current_tail = []
-
-        def append_znak(char: str):
-            nonlocal current_word
-            nonlocal current_tail
-            if not current_tail:
-                while current_word:
-                    last_char = current_word[-1]
-                    if self._normalizer.is_apostrophe(last_char) or last_char == self._normalizer.DASH:
-                        current_word.pop()
-                        current_tail.insert(0, last_char)
-                    else:
-                        break
-            current_tail.append(char)
-
-        def close_word():
-            nonlocal current_word
-            nonlocal current_tail
-            if current_word:
-                word = "".join(current_word)
-                normalized_word = self._normalizer.tokinization_normalize(word)
-                result.append(Token(normalized_word, TokenType.AlphaNumeric))
-
-            if current_tail:
-                result.append(Token("".join(current_tail), TokenType.NonAlphaNumeric))
-
-            current_word = []
-            current_tail = []
-
-        last_non_space_index = len(line) - 1
-        while 0 <= last_non_space_index and line[last_non_space_index].isspace():
-            last_non_space_index -= 1
-
-        i = 0
-        while i < len(line) and line[i].isspace():
-            i += 1
-        while i <= last_non_space_index:
-            char = line[i]
-
-            if char == "\n":
-                close_word()
-                result.append(Token(None, TokenType.LineBreak))
-
-            elif char in ".?!":
-                if not current_word and not current_tail and result and result[-1].type == TokenType.SentenceSeparator:
-                    prev = result[-2]
-                    if prev.type == TokenType.NonAlphaNumeric:
-                        prev.text += char
-                else:
-                    append_znak(char)
-                    close_word()
-                    result.append(Token(None, TokenType.SentenceSeparator))
-
-            # elif char == '<' and self._process_simple_html:
-            #    close_word()
-            #    tag = _parse_inline_tag(line, i)
-            #    result.add(InlineTag(tag))
-            #    i += len(tag) - 1
-
-            # elif char == '&' and self._process_simple_html:
-            #    char = _parse_char_name_or_number(line, i)
-            #    while i < len(line) and line[i] != ';':
-            #        i += 1
-            #    if char == '\0':
-            #        i += 1
-            #        continue
-
-            elif self._normalizer.is_apostrophe(char) or char == self._normalizer.DASH:
-                if current_word and not current_tail:
-                    current_word.append(char)
-                else:
-                    append_znak(char)
-
-            elif self._normalizer.is_letter(char) or char in "[]":
-                if current_tail:
-                    close_word()
-                current_word.append(char)
-
-            else:
-                append_znak(char)
-
-            i += 1
-
-        close_word()
-
+        """
+        Разбівае радок на токены.
+
+        Args:
+            line: Радок тэксту, напрыклад параграф
+
+        Returns:
+            Токены ў парадку тэксту
+        """
+        return list(self.iter_tokens(line))
+
+    def iter_tokens(self, line: str) -> Iterator[Token]:
+        """
+        Разбівае радок на токены, аддаючы іх па адным.
+
+        Спіс токенаў не ствараецца, але _iter_units трымае побач з радком радок класаў сімвалаў
+        той жа даўжыні, таму памяць расце з даўжынёй радка.
+
+        Args:
+            line: Радок тэксту, напрыклад параграф
+
+        Yields:
+            Токены ў парадку тэксту
+        """
+        # Знакі ў канцы сказа аддаюцца разам з падзяляльнікам сказаў толькі на наступным кроку,
+        # бо да іх яшчэ могуць далучыцца наступныя знакі шматкроп'я
+        pending: Optional[Token] = None
+
+        for word, tail, end in self._iter_units(line):
+            if end and end != "\n" and pending is not None and word is None and not tail:
+                pending.text += end
+                continue
+
+            if pending is not None:
+                yield pending
+                yield Token(None, TokenType.SentenceSeparator)
+                pending = None
+            if word is not None:
+                yield Token(word, TokenType.AlphaNumeric)
+            if end and end != "\n":
+                pending = Token(tail + end, TokenType.NonAlphaNumeric)
+                continue
+            if tail:
+                yield Token(tail, TokenType.NonAlphaNumeric)
+            if end:
+                yield Token(None, TokenType.LineBreak)
+
+        if pending is not None:
+            yield pending
+            yield Token(None, TokenType.SentenceSeparator)
+
+    def iter_sentences(self, line: str) -> Iterator[List[SentenceItem]]:
+        """
+        Разбівае радок адразу на сказы, без прамежкавых токенаў.
+
+        Дае тое ж, што Sentencer.iter_sentences(Tokenizer.iter_tokens(line)), але за адзін праход:
+        элементы сказа і пазнакі glue_next ствараюцца проста з кроку разбору, а Token не ствараюцца зусім.
+
+        Args:
+            line: Радок тэксту, напрыклад параграф
+
+        Yields:
+            Элементы аднаго сказа
+        """
+        sentence: List[SentenceItem] = []
+        next_glueable = False
+        # Сказ аддаецца толькі на наступным кроку, бо да яго апошняга знака яшчэ можа далучыцца шматкроп'е
+        finished = False
+
+        for word, tail, end in self._iter_units(line):
+            if finished:
+                if end and end != "\n" and word is None and not tail:
+                    sentence[-1].text += end
+                    continue
+                yield sentence
+                sentence = []
+                finished = False
+
+            if word is not None:
+                if next_glueable:
+                    sentence[-1].glue_next = True
+                sentence.append(SentenceItem(word, SentenceItemType.Word))
+                next_glueable = True
+            if end and end != "\n":
+                tail += end
+            if tail:
+                if next_glueable and not tail[0].isspace():
+                    sentence[-1].glue_next = True
+                next_glueable = not tail[-1].isspace()
+                stripped_tail = tail.strip()
+                if stripped_tail:
+                    sentence.append(SentenceItem(stripped_tail, SentenceItemType.Punctuation))
+
+            if end == "\n":
+                next_glueable = False
+                if sentence:
+                    sentence.append(SentenceItem(None, SentenceItemType.LineBreak))
+            elif end:
+                next_glueable = False
+                finished = True
+
+        if sentence:
+            yield sentence
+
+    def _iter_units(self, line: str) -> Iterator[Tuple[Optional[str], str, str]]:
+        """
+        Крокі разбору радка.
+
+        Кожны сімвал спачатку замяняецца класам з табліцы _char_classes адным выклікам str.translate,
+        потым скампіляваны выраз знаходзіць у радку класаў цэлыя слова і паслядоўнасці знакаў,
+        так што Python апрацоўвае токены, а не асобныя сімвалы. Радок класаў мае даўжыню ўсяго радка
+        і жыве, пакуль не скончыцца разбор.
+
+        Args:
+            line: Радок тэксту
+
+        Yields:
+            Нармалізаванае слова або None, калі слова няма, знакі пасля слова і знак канца сказа, "\\n" або пусты радок
+        """
+        normalize = self._normalizer.tokinization_normalize
+
+        line = line.strip()
+        classes = line.translate(_char_classes())
+        for match in _UNIT_RE.finditer(classes):
+            start, end = match.span()
+            word_end, tail_end = match.end(1), match.end(2)
+            word = line[start:word_end]
+            tail = line[word_end:tail_end]
+
+            if word and tail and classes[tail_end:end] != _SENTENCE_END and _OTHER not in classes[word_end:tail_end]:
+                # Апострафы і злучкі адразу пасля слова застаюцца ў слове, калі за імі няма іншых знакаў
+                word += tail
+                tail = ""
+            yield normalize(word) if word else None, tail, line[tail_end:end]
+
+        # Разбор простага HTML (process_simple_html) пакуль не падтрымліваецца, нататкі да яго:
         #        def _parse_inline_tag(self, text: str, start: int) -> str:
         #            end = text.find('>', start)
         #            if end == -1:
@@ -157,4 +209,39 @@ class Tokenizer:
         #
         #            return char_map.get(name, '\0')
 
-        return result
+
+# Класы сімвалаў для Tokenizer._iter_units
+_LETTER = "L"
+_JOINER = "J"
+_SENTENCE_END = "S"
+_LINE_BREAK = "N"
+_OTHER = "O"
+
+# Адзін крок разбору: слова (літары, паміж якімі могуць быць апострафы і злучкі), знакі пасля яго
+# і канец сказа ці радка, кожная частка можа быць пустой
+_UNIT_RE = re.compile(f"(?=.)({_LETTER}(?:{_JOINER}*{_LETTER})*|)([{_JOINER}{_OTHER}]*)([{_SENTENCE_END}{_LINE_BREAK}]?)", re.DOTALL)
+
+
+class _CharClasses(dict):
+    """
+    Табліца для str.translate, якая замяняе кожны сімвал яго класам.
+
+    Усе літары, апострафы, злучкі і знакі канца сказа ляжаць ніжэй за DENSE_LIMIT, таму
+    сімвалы гэтага дыяпазону запоўненыя загадзя, а __missing__ для астатніх вяртае _OTHER.
+    """
+
+    DENSE_LIMIT = 0x2020
+
+    def __missing__(self, key: int) -> str:
+        return _OTHER
+
+
+@lru_cache(maxsize=None)
+def _char_classes() -> _CharClasses:
+    """Табліца класаў сімвалаў, пабудаваная пры першым выкліку."""
+    classes = _CharClasses.fromkeys(range(_CharClasses.DENSE_LIMIT), _OTHER)
+    classes.update((ord(c), _LETTER) for c in Normalizer.LETTERS + "[]")
+    classes.update((ord(c), _JOINER) for c in Normalizer.ALL_APOSTROPHES + Normalizer.DASH)
+    classes.update((ord(c), _SENTENCE_END) for c in ".?!")
+    classes[ord("\n")] = _LINE_BREAK
+    return classes
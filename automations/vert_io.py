@@ -131,7 +131,7 @@ class VertIO:
                             f.write(f"{item.text}")
                             empty = ""  # bloody black makes " " out of ""
                             expanded_tags = item.linguistic_tag.to_expanded_string() if item.linguistic_tag else None
-                            lemma = normalizer.unstress(item.lemma) if item.lemma else None
+                            lemma = normalizer.stress_variants(item.lemma)[0] if item.lemma else None
                             f.write(f"\t{lemma or empty}\t{expanded_tags or empty}")
                             f.write("\n")
                             if item.glue_next:
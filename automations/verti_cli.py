@@ -4,6 +4,7 @@ import argparse
 import logging
 import glob
 import traceback
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from dotenv import load_dotenv
 from .doc_parser import DocParser
@@ -12,9 +13,13 @@ from .pdf_reader import PdfReader
 from .txt_reader import TxtReader
 from .epub_reader import EpubReader
 from .vert_io import VertIO
-from .grammar_db import GrammarDB
+from .grammar_db import GrammarDB, LookupStats
+from .mmap_grammar_db import MmapGrammarDB
+from .grammar_server import DEFAULT_SOCKET_PATH, GrammarDBClient
+from .shared_grammar_db import SharedGrammarDB
+from .sqlite_grammar_db import SqliteGrammarDB
 from .setup_logging import setup_logging
-from .linguistic_bits import SentenceItemType, LinguisticItemMetadata
+from .linguistic_bits import SentenceItemType, LinguisticItemMetadata, LinguisticTag
 import datetime
 from .meta_reader import MetaReader
 
@@ -77,7 +82,9 @@ def roundtrip_verti(input_path: str, output_path: str, logger: logging.Logger) -
     logger.info(f"Файл {input_path} паспяхова прачытаны і запісаны ў {output_path}")
 
 
-def fill_obvious_grammar(input_path: str, output_path: str, grammar_db: GrammarDB, logger: logging.Logger) -> None:
+def fill_obvious_grammar(
+    input_path: str, output_path: str, grammar_db: GrammarDB | MmapGrammarDB | SqliteGrammarDB | GrammarDBClient, logger: logging.Logger, guess_probability: float | None = None
+) -> None:
     """
     Запаўняе відавочную граматычную інфармацыю для слоў у адным verti файле.
 
@@ -86,35 +93,73 @@ def fill_obvious_grammar(input_path: str, output_path: str, grammar_db: GrammarD
         output_path: Шлях для захавання новага verti файла
         grammar_db: Загружаная граматычная база
         logger: Logger для запісу паведамленняў
+        guess_probability: Калі зададзена, словам, якіх няма ў базе, ставяцца тэгі і лема з GrammarDB.guess,
+            калі імавернасць здагадкі не меншая за гэтую
     """
     try:
         logger.info(f"Апрацоўка '{input_path}' -> '{output_path}'...")
         # Чытаем verti файл
         document = VertIO.read_verti(input_path)
 
-        # Праходзім па ўсіх словах у дакуменце
-        processed_count = 0
-        for paragraph in document.paragraphs:
-            for sentence in paragraph.sentences:
-                for item in sentence.items:
-                    if item.type == SentenceItemType.Word:
-                        # todo only infer compatible with already existing data, say of human has already provided the lemma or some linguistig tags
-                        (paradigma_form_id, lemma, linguistic_tag) = grammar_db.infer_grammar_info(item.text)
-                        # Аб'ядноўваем з існуючай інфармацыяй, калі яна ёсць
-                        item.paradigma_form_id = item.paradigma_form_id.union_with(paradigma_form_id) if item.paradigma_form_id else paradigma_form_id
-                        item.lemma = item.lemma or lemma  # Захоўваем першую знойдзеную лему, калі яе не было
-                        item.linguistic_tag = item.linguistic_tag.union_with(linguistic_tag) if item.linguistic_tag else linguistic_tag
-                        if paradigma_form_id is not None and paradigma_form_id.is_singular():
-                            item.metadata = LinguisticItemMetadata(None, datetime.date.today())
-                        processed_count += 1
+        # Збіраем усе словы дакумента, каб шукаць кожнае напісанне ў базе толькі адзін раз
+        word_items = [item for paragraph in document.paragraphs for sentence in paragraph.sentences for item in sentence.items if item.type == SentenceItemType.Word]
+        stats = LookupStats()
+        inferences = grammar_db.infer_many([item.text for item in word_items], stats)
+        if isinstance(grammar_db, GrammarDB):
+            # Словы са злучком, якіх няма ў базе, разбіраюцца па частках; разбор запамінаецца ў базе для кожнага напісання
+            inferences = [grammar_db.infer_compound(item.text) if "-" in item.text and inference == (None, None, None) else inference for item, inference in zip(word_items, inferences)]
+
+        for item, (paradigma_form_id, lemma, linguistic_tag) in zip(word_items, inferences):
+            # todo only infer compatible with already existing data, say of human has already provided the lemma or some linguistig tags
+            # Аб'ядноўваем з існуючай інфармацыяй, калі яна ёсць
+            item.paradigma_form_id = item.paradigma_form_id.union_with(paradigma_form_id) if item.paradigma_form_id else paradigma_form_id
+            item.lemma = item.lemma or lemma  # Захоўваем першую знойдзеную лему, калі яе не было
+            item.linguistic_tag = item.linguistic_tag.union_with(linguistic_tag) if item.linguistic_tag else linguistic_tag
+            if paradigma_form_id is not None and paradigma_form_id.is_singular():
+                item.metadata = LinguisticItemMetadata(None, datetime.date.today())
+
+        guessed = 0
+        if guess_probability is not None:
+            for item in word_items:
+                # Здагадка толькі для слоў, якіх зусім няма ў базе і якім чалавек яшчэ не паставіў тэгі
+                if item.linguistic_tag or grammar_db.lookup_word(item.text) is not None:
+                    continue
+                guesses = grammar_db.guess(item.text, limit=1)
+                if guesses and guesses[0].probability >= guess_probability:
+                    item.lemma = item.lemma or guesses[0].lemma
+                    item.linguistic_tag = LinguisticTag.clone(guesses[0].linguistic_tag)
+                    guessed += 1
 
         # Запісваем у новы файл
         VertIO.write_verti(document, output_path)
-        logger.info(f"Файл '{Path(input_path).name}' паспяхова апрацаваны ({processed_count} слоў) і запісаны ў '{output_path}'")
+        guessed_str = f", здагадак па канчатках {guessed}" if guess_probability is not None else ""
+        logger.info(f"Файл '{Path(input_path).name}' паспяхова апрацаваны ({len(word_items)} слоў: {stats}{guessed_str}) і запісаны ў '{output_path}'")
     except Exception as e:
         logger.error(f"Памылка пры апрацоўцы файла '{Path(input_path).name}': {e}\n{traceback.format_exc()}")
 
 
+# База, падключаная ў працоўным працэсе паралельнага fog
+_fog_worker_grammar_db = None
+
+
+def _init_fog_worker(open_grammar_db, argument) -> None:
+    """
+    Падключэнне працоўнага працэса да агульнай граматычнай базы.
+
+    Args:
+        open_grammar_db: SharedGrammarDB.attach, MmapGrammarDB, SqliteGrammarDB ці GrammarDBClient
+        argument: Імя сегмента, шлях да скампіляванай базы ці шлях да сокета
+    """
+    global _fog_worker_grammar_db
+    _fog_worker_grammar_db = open_grammar_db(argument)
+
+
+def _fill_obvious_grammar_in_worker(task: tuple) -> None:
+    """Апрацоўка пары (input_file, output_file) у працоўным працэсе."""
+    input_path, output_path = task
+    fill_obvious_grammar(input_path, output_path, _fog_worker_grammar_db, logging.getLogger(__name__))
+
+
 def convert_verti_to_vert(input_path: str, output_path: str, logger: logging.Logger) -> None:
     """
     Канвертуе verti файл у vert фармат.
@@ -194,7 +239,22 @@ def main():
 
     # Каманда для запаўнення відавочнай граматычнай інфармацыі
     fog_parser = subparsers.add_parser("fog", help="Запаўніць відавочную граматычную інфармацыю", parents=[io_parser])
-    fog_parser.add_argument("grammar_base_path", help="Шлях да дырэкторыі з граматычнай базай")
+    fog_parser.add_argument("grammar_base_path", help="Шлях да дырэкторыі з граматычнай базай, да дырэкторыі са скампіляванай базай для mmap ці да файла SQLite")
+    fog_parser.add_argument("--workers", type=int, default=1, help="Колькасць працэсаў для індэксацыі граматычнай базы (0 - па колькасці ядраў)")
+    fog_parser.add_argument("--jobs", type=int, default=1, help="Колькасць працэсаў для апрацоўкі файлаў; база для іх адна, у агульнай памяці")
+    fog_parser.add_argument(
+        "--grammar-server", nargs="?", const=DEFAULT_SOCKET_PATH, type=Path, help="Выкарыстоўваць запушчаны сервер граматычнай базы (python -m automations.grammar_server) замест загрузкі базы"
+    )
+    fog_parser.add_argument(
+        "--guess-unknown",
+        nargs="?",
+        const=0.8,
+        type=float,
+        metavar="MIN_PROBABILITY",
+        help="Ставіць словам, якіх няма ў базе, тэгі і лему па канчатку, калі імавернасць здагадкі не меншая за MIN_PROBABILITY (па змоўчанні 0.8)",
+    )
+    fog_parser.add_argument("--pravapis", type=lambda value: value.split(","), help="Выкарыстоўваць толькі формы гэтых правапісаў праз коску, напрыклад A2008")
+    fog_parser.add_argument("--slouniki", type=lambda value: value.split(","), help="Выкарыстоўваць толькі формы з гэтых слоўнікаў праз коску, напрыклад sbm2012")
 
     # Каманда для канвертацыі verti ў vert
     tovert_parser = subparsers.add_parser("tovert", help="Канвертаваць verti у vert", parents=[io_parser])
@@ -272,17 +332,53 @@ def main():
     elif args.command == "fog":
         # Загружаем базу адзін раз
         logger.info(f"Індэксацыя граматычнай базы '{args.grammar_base_path}'...")
-        grammar_db = GrammarDB()
+        grammar_base_path = Path(args.grammar_base_path)
         try:
-            grammar_db.load_directory(Path(args.grammar_base_path))
+            if args.grammar_server:
+                # База ўжо загружаная ў асобным працэсе, які абслугоўвае ўсе адначасовыя запускі
+                grammar_db = GrammarDBClient(args.grammar_server)
+            elif grammar_base_path.is_file() or (grammar_base_path / MmapGrammarDB.KEYS_FILE_NAME).exists():
+                # Скампіляваная база (python -m automations.mmap_grammar_db ці automations.sqlite_grammar_db) чытаецца без індэксацыі
+                if args.pravapis or args.slouniki:
+                    logger.warning("Фільтры для скампіляванай базы задаюцца пры кампіляцыі, --pravapis і --slouniki ігнаруюцца")
+                grammar_db = SqliteGrammarDB(grammar_base_path) if grammar_base_path.is_file() else MmapGrammarDB(grammar_base_path)
+            else:
+                grammar_db = GrammarDB()
+                grammar_db.load_directory(grammar_base_path, workers=args.workers, pravapis=args.pravapis, slouniki=args.slouniki)
             logger.info(f"Індэксацыя граматычнай базы выканана")
         except Exception as e:
             logger.error(f"Памылка загрузкі граматычнай базы: {e}\n{traceback.format_exc()}")
             return  # Спыняемся, калі база не загрузілася
 
-        # Выклікаем функцыю апрацоўкі для кожнай задачы
-        for input_f, output_f in tasks:
-            fill_obvious_grammar(input_f, output_f, grammar_db, logger)
+        guess_probability = args.guess_unknown
+        if guess_probability is not None and (not isinstance(grammar_db, GrammarDB) or (args.jobs > 1 and len(tasks) > 1)):
+            logger.warning("Здагадкі па канчатках працуюць толькі з XML базай без --jobs, --guess-unknown ігнаруецца")
+            guess_probability = None
+
+        if args.jobs > 1 and len(tasks) > 1:
+            # Працоўныя працэсы не капіююць базу, а падключаюцца да адной агульнай
+            shared_grammar_db = None
+            if isinstance(grammar_db, GrammarDBClient):
+                grammar_db.close()
+                initargs = (GrammarDBClient, args.grammar_server)
+            elif isinstance(grammar_db, (MmapGrammarDB, SqliteGrammarDB)):
+                grammar_db.close()
+                initargs = (type(grammar_db), grammar_base_path)
+            else:
+                shared_grammar_db = SharedGrammarDB.create(grammar_db)
+                initargs = (SharedGrammarDB.attach, shared_grammar_db.name)
+            del grammar_db
+            try:
+                with ProcessPoolExecutor(max_workers=args.jobs, initializer=_init_fog_worker, initargs=initargs) as executor:
+                    for _ in executor.map(_fill_obvious_grammar_in_worker, tasks):
+                        pass
+            finally:
+                if shared_grammar_db is not None:
+                    shared_grammar_db.close()
+        else:
+            # Выклікаем функцыю апрацоўкі для кожнай задачы
+            for input_f, output_f in tasks:
+                fill_obvious_grammar(input_f, output_f, grammar_db, logger, guess_probability)
     elif args.command == "tovert":
         for input_f, output_f in tasks:
             convert_verti_to_vert(input_f, output_f, logger)
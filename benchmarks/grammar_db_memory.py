@@ -0,0 +1,94 @@
+"""
+Вымярэнне памяці, якую займае індэкс граматычнай базы.
+
+Запуск:
+    poetry run python -m benchmarks.grammar_db_memory grammar-base
+"""
+
+import argparse
+import gc
+import tracemalloc
+from pathlib import Path
+from typing import Callable, List, Tuple
+from automations.grammar_db import GrammarDB
+
+# Байтаў на форму да кампактнага захоўвання GrammarInfo і наступных індэксаў, з чым параўноўваецца вынік
+BASELINE_BYTES_PER_FORM = 1152
+
+
+def _component_sizes(grammar_db: GrammarDB) -> List[Tuple[str, int]]:
+    """
+    Памяць асобных частак індэкса: колькі вызваляецца, калі выдаліць частку.
+
+    Часткі выдаляюцца па чарзе, таму базу пасля вымярэння выкарыстоўваць нельга.
+
+    Args:
+        grammar_db: Загружаная граматычная база
+
+    Returns:
+        Пары (назва часткі, байты)
+    """
+    index = grammar_db._index
+    # Часткі, дададзеныя пасля кампактнага захоўвання, на якіх найчасцей хаваюцца рэгрэсіі памяці
+    components: List[Tuple[str, Callable[[], None]]] = [
+        ("кэшы нармалізатара", grammar_db._normalizer.cache_clear),
+        ("вытворныя індэксы", index.reset_derived),
+        ("байтавыя зрухі парадыгмаў", index.paradigm_offsets.clear),
+        ("парадыгмы і лемы", lambda: (index.paradigms.clear(), index.lemma_paradigms.clear())),
+        ("звесткі для refresh", lambda: (index.file_forms.clear(), index.file_paradigms.clear())),
+    ]
+    sizes = []
+    for name, drop in components:
+        gc.collect()
+        before, _ = tracemalloc.get_traced_memory()
+        drop()
+        gc.collect()
+        after, _ = tracemalloc.get_traced_memory()
+        sizes.append((name, before - after))
+    return sizes
+
+
+def measure(directory: Path, baseline_per_form: float = BASELINE_BYTES_PER_FORM) -> None:
+    """
+    Будуе індэкс без здымка і друкуе колькасць байтаў Python аб'ектаў на адну форму
+    побач з базавым значэннем і раскладам па частках індэкса.
+
+    Args:
+        directory: Шлях да дырэкторыі з XML файламі
+        baseline_per_form: Байтаў на форму, з якімі параўноўваецца вынік
+    """
+    # Табліцы нармалізатара ствараюцца да пачатку вымярэння, каб лічыць толькі сам індэкс
+    grammar_db = GrammarDB()
+    gc.collect()
+    tracemalloc.start()
+    baseline, _ = tracemalloc.get_traced_memory()
+
+    grammar_db.load_directory(directory, use_snapshot=False)
+    gc.collect()
+
+    current, peak = tracemalloc.get_traced_memory()
+
+    keys = len(grammar_db._index.word_forms)
+    forms = sum(len(variants) for variants in grammar_db._index.word_forms.values())
+    index_bytes = current - baseline
+    per_form = index_bytes / forms
+
+    print(f"ключоў: {keys}, формаў: {forms}")
+    print(f"памяць індэкса: {index_bytes / 1024 / 1024:.1f} MiB, пік падчас загрузкі: {(peak - baseline) / 1024 / 1024:.1f} MiB")
+    print(f"байтаў на форму: {per_form:.0f} (базавае значэнне {baseline_per_form:.0f}, розніца {per_form - baseline_per_form:+.0f})")
+
+    for name, size in _component_sizes(grammar_db):
+        print(f"  {name}: {size / forms:.0f} байтаў на форму")
+    tracemalloc.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Памяць індэкса граматычнай базы")
+    parser.add_argument("grammar_base_path", help="Шлях да дырэкторыі з граматычнай базай")
+    parser.add_argument("--baseline", type=float, default=BASELINE_BYTES_PER_FORM, help=f"Байтаў на форму для параўнання (па змоўчанні {BASELINE_BYTES_PER_FORM})")
+    args = parser.parse_args()
+    measure(Path(args.grammar_base_path), args.baseline)
+
+
+if __name__ == "__main__":
+    main()
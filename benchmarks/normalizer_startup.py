@@ -0,0 +1,62 @@
+"""
+Вымярэнне кошту стварэння Normalizer і першага выкліку нармалізацыі.
+
+Першае стварэнне мераецца ў асобным працэсе, бо табліцы будуюцца адзін раз на працэс.
+
+Запуск:
+    poetry run python -m benchmarks.normalizer_startup
+"""
+
+import argparse
+import subprocess
+import sys
+import timeit
+from automations.normalizer import Normalizer
+
+# Код для новага працэса: друкуе час першага стварэння і першага выкліку ў секундах
+_COLD_START = """
+import time
+from automations.normalizer import Normalizer
+started = time.perf_counter()
+normalizer = Normalizer()
+created = time.perf_counter()
+normalizer.grammar_db_aggressive_normalize("Прывіта+ньне")
+called = time.perf_counter()
+print(created - started, called - created)
+"""
+
+
+def measure(runs: int, number: int) -> None:
+    """
+    Друкуе час першага стварэння, паўторнага стварэння і першага выкліку ў мікрасекундах.
+
+    Args:
+        runs: Колькасць новых працэсаў для вымярэння першага стварэння
+        number: Колькасць паўтораў для вымярэння паўторнага стварэння
+    """
+    cold_create = []
+    cold_call = []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, "-c", _COLD_START], check=True, capture_output=True, text=True).stdout
+        create, call = map(float, output.split())
+        cold_create.append(create)
+        cold_call.append(call)
+
+    Normalizer()
+    warm_create = min(timeit.repeat(Normalizer, number=number, repeat=5)) / number
+    warm_call = min(timeit.repeat(lambda: Normalizer().grammar_db_aggressive_normalize("Прывіта+ньне"), number=number, repeat=5)) / number
+
+    print(f"першае стварэнне ў працэсе: {min(cold_create) * 1e6:.0f} мкс, першы выклік пасля яго: {min(cold_call) * 1e6:.1f} мкс")
+    print(f"паўторнае стварэнне: {warm_create * 1e6:.2f} мкс, стварэнне і выклік: {warm_call * 1e6:.2f} мкс")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Кошт стварэння Normalizer")
+    parser.add_argument("--runs", type=int, default=5, help="Колькасць новых працэсаў")
+    parser.add_argument("--number", type=int, default=10000, help="Колькасць паўтораў у адным вымярэнні")
+    args = parser.parse_args()
+    measure(args.runs, args.number)
+
+
+if __name__ == "__main__":
+    main()
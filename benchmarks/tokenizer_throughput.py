@@ -0,0 +1,65 @@
+"""
+Вымярэнне хуткасці Tokenizer.parse у токенах за секунду і разбіўкі на сказы
+праз Sentencer і адным праходам Tokenizer.iter_sentences.
+
+Запуск:
+    poetry run python -m benchmarks.tokenizer_throughput [файл.txt]
+
+Без файла токенізуюцца сказы з README.
+"""
+
+import argparse
+import time
+from pathlib import Path
+from typing import Callable, List
+from automations.sentencer import Sentencer
+from automations.tokenizer import Tokenizer
+
+README_PATH = Path(__file__).parent.parent / "README.md"
+
+
+def _best_time(paragraphs: List[str], parse: Callable[[str], object], repeat: int) -> float:
+    """Найменшы з repeat часоў апрацоўкі ўсіх параграфаў."""
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for paragraph in paragraphs:
+            parse(paragraph)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def measure(paragraphs: List[str], repeat: int) -> None:
+    """
+    Апрацоўвае ўсе параграфы repeat разоў і друкуе найлепшую хуткасць.
+
+    Args:
+        paragraphs: Параграфы тэксту
+        repeat: Колькасць паўтораў
+    """
+    tokenizer = Tokenizer()
+    sentencer = Sentencer()
+    tokens = sum(len(tokenizer.parse(paragraph)) for paragraph in paragraphs)
+    print(f"параграфаў: {len(paragraphs)}, токенаў: {tokens}, сімвалаў: {sum(len(paragraph) for paragraph in paragraphs)}")
+
+    best = _best_time(paragraphs, tokenizer.parse, repeat)
+    print(f"токенізацыя: {tokens / best:.0f} токенаў/с")
+
+    two_stage = _best_time(paragraphs, lambda paragraph: list(sentencer.iter_sentences(tokenizer.iter_tokens(paragraph))), repeat)
+    fused = _best_time(paragraphs, lambda paragraph: list(tokenizer.iter_sentences(paragraph)), repeat)
+    print(f"сказы праз Sentencer: {tokens / two_stage:.0f} токенаў/с, адным праходам: {tokens / fused:.0f} токенаў/с")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Хуткасць токенізатара")
+    parser.add_argument("text_path", nargs="?", type=Path, default=README_PATH, help="Тэкставы файл, параграфы падзеленыя пустымі радкамі")
+    parser.add_argument("--repeat", type=int, default=5, help="Колькасць паўтораў")
+    args = parser.parse_args()
+    text = args.text_path.read_text(encoding="utf-8")
+    paragraphs = [paragraph for paragraph in text.split("\n\n") if paragraph.strip()]
+    measure(paragraphs, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,675 @@
+import os
+import pickle
+import socket
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from unittest import mock
+from automations import grammar_db
+from automations.grammar_db import GrammarDB, LookupStats
+from automations.grammar_server import GrammarDBClient, GrammarDBServer
+from automations.mmap_grammar_db import MmapGrammarDB
+from automations.shared_grammar_db import SharedGrammarDB
+from automations.sqlite_grammar_db import SqliteGrammarDB
+from automations.suffix_guesser import SuffixGuesser
+
+NOUNS_XML = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Wordlist>
+    <Paradigm pdgId="100" lemma="го+д" tag="NCIINM2">
+        <Variant id="a" lemma="го+д" pravapis="A2008">
+            <Form tag="NS" slouniki="sbm2012">го+д</Form>
+            <Form tag="GS" slouniki="sbm2012">го+да</Form>
+            <Form tag="NP" slouniki="sbm2012">гады+</Form>
+            <Form tag="AP" slouniki="sbm2012">гады+</Form>
+        </Variant>
+    </Paradigm>
+    <Paradigm pdgId="101" lemma="га+д" tag="NCAINM1">
+        <Variant id="a" lemma="га+д" pravapis="A2008">
+            <Form tag="NS">га+д</Form>
+            <Form tag="NP">гады+</Form>
+        </Variant>
+    </Paradigm>
+</Wordlist>
+"""
+
+PREPOSITIONS_XML = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Wordlist>
+    <Paradigm pdgId="200" lemma="на+" tag="I">
+        <Variant id="a" lemma="на+" pravapis="A2008">
+            <Form slouniki="sbm2012">на+</Form>
+        </Variant>
+    </Paradigm>
+</Wordlist>
+"""
+
+HOURS_XML = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Wordlist>
+    <Paradigm pdgId="102" lemma="гадзі+на" tag="NCIINF2">
+        <Variant id="a" lemma="гадзі+на" pravapis="A1957, A2008" slouniki="tsbm1984">
+            <Form tag="NS">гадзі+на</Form>
+            <Form tag="NP" slouniki="piskunou2012:123" pravapis="A1957">гадзі+ны</Form>
+            <Form tag="NP" slouniki="sbm2012" pravapis="A2008">гадзі+ны</Form>
+        </Variant>
+    </Paradigm>
+</Wordlist>
+"""
+
+
+class TestGrammarDB(unittest.TestCase):
+    def setUp(self):
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.base_path = Path(self._tmp_dir.name)
+        (self.base_path / "N.xml").write_text(NOUNS_XML, encoding="utf-8")
+        (self.base_path / "I.xml").write_text(PREPOSITIONS_XML, encoding="utf-8")
+
+    def tearDown(self):
+        self._tmp_dir.cleanup()
+
+    def _load(self, **kwargs) -> GrammarDB:
+        db = GrammarDB()
+        db.load_directory(self.base_path, **kwargs)
+        return db
+
+    def test_lookup_word(self):
+        db = self._load(use_snapshot=False)
+        variants = db.lookup_word("ГАДЫ")
+        self.assertEqual(len(variants), 3)
+        self.assertEqual([str(v.paradigma_form_id) for v in variants], ["100a.NP", "100a.AP", "101a.NP"])
+        self.assertEqual(variants[0].paradigm_line, 3)
+        self.assertEqual(variants[0].form_line, 7)
+        self.assertIsNone(db.lookup_word("невядома"))
+
+    def test_infer_grammar_info(self):
+        db = self._load(use_snapshot=False)
+        paradigma_form_id, lemma, linguistic_tag = db.infer_grammar_info("года")
+        self.assertEqual(str(paradigma_form_id), "100a.GS")
+        self.assertEqual(lemma, "го́д")
+        self.assertEqual(str(linguistic_tag), "NCIINM2|GS")
+
+        paradigma_form_id, lemma, linguistic_tag = db.infer_grammar_info("гады")
+        self.assertIsNone(paradigma_form_id)
+        self.assertIsNone(lemma)
+        self.assertEqual(str(linguistic_tag), "NC.INM.|.P")
+
+    def test_infer_grammar_info_is_precomputed(self):
+        self._load()
+        with mock.patch.object(GrammarDB, "_infer_from_variants") as infer_from_variants:
+            db = self._load()
+            paradigma_form_id, lemma, linguistic_tag = db.infer_grammar_info("На")
+            infer_from_variants.assert_not_called()
+        self.assertEqual(str(paradigma_form_id), "200a.")
+        self.assertEqual(lemma, "на́")
+        self.assertEqual(str(linguistic_tag), "I|")
+
+    def test_infer_grammar_info_after_load_from_xml(self):
+        db = self._load(use_snapshot=False)
+        self.assertEqual(str(db.infer_grammar_info("на")[0]), "200a.")
+
+        (self.base_path / "E.xml").write_text(PREPOSITIONS_XML.replace('pdgId="200" lemma="на+" tag="I"', 'pdgId="300" lemma="на+" tag="E"'), encoding="utf-8")
+        db.load_from_xml(self.base_path / "E.xml")
+        self.assertEqual(db.infer_grammar_info("на"), (None, "на́", None))
+
+    def test_lookup_words(self):
+        db = self._load(use_snapshot=False)
+        words = ["гады", "на", "невядома", "ГАДЫ", "на", "год"]
+        stats = LookupStats()
+        with mock.patch.object(db, "lookup_word", wraps=db.lookup_word) as lookup_word:
+            results = db.lookup_words(words, stats)
+            self.assertEqual(lookup_word.call_count, 5)
+        self.assertEqual(results, [db.lookup_word(word) for word in words])
+        self.assertEqual(stats, LookupStats(hits=5, misses=1, ambiguous=2, unique=5))
+
+    def test_infer_many(self):
+        db = self._load(use_snapshot=False)
+        words = iter(["года", "гады", "невядома", "года"])
+        stats = LookupStats()
+        results = db.infer_many(words, stats)
+        self.assertEqual(results, [db.infer_grammar_info(word) for word in ["года", "гады", "невядома", "года"]])
+        self.assertEqual(stats, LookupStats(hits=3, misses=1, ambiguous=1, unique=3))
+
+    def test_get_paradigm(self):
+        db = self._load(use_snapshot=False, workers=2)
+        paradigm = db.get_paradigm(100)
+        self.assertEqual(list(paradigm), ["a"])
+        self.assertEqual([str(v.paradigma_form_id) for v in paradigm["a"]], ["100a.NS", "100a.GS", "100a.NP", "100a.AP"])
+        self.assertEqual(db.paradigm_location(100), ("N.xml", 3))
+        self.assertIsNone(db.get_paradigm(999))
+        self.assertIsNone(db.paradigm_location(999))
+
+    def test_paradigm_source(self):
+        db = self._load(use_snapshot=False, workers=2)
+        source = db.paradigm_source(101)
+        self.assertTrue(source.startswith('<Paradigm pdgId="101" lemma="га+д"'))
+        self.assertTrue(source.endswith("</Paradigm>"))
+        self.assertIn('<Form tag="NP">гады+</Form>', source)
+        self.assertEqual(db.paradigm_source(200).count("<Paradigm"), 1)
+        self.assertIsNone(db.paradigm_source(999))
+
+    def test_paradigm_source_falls_back_to_lines(self):
+        # Закаментаваная парадыгма знаходзіцца праходам па радках, але не разборам XML
+        (self.base_path / "N.xml").write_text(NOUNS_XML.replace("<Wordlist>", '<Wordlist>\n    <!-- <Paradigm pdgId="999"></Paradigm> -->'), encoding="utf-8")
+        with self.assertLogs("automations.grammar_db", level="WARNING"):
+            db = self._load(use_snapshot=False)
+        source = db.paradigm_source(101)
+        self.assertTrue(source.startswith('<Paradigm pdgId="101" lemma="га+д"'))
+        self.assertTrue(source.endswith("</Paradigm>"))
+        self.assertIn('<Form tag="NP">гады+</Form>', source)
+        self.assertIsNone(db.paradigm_source(999))
+
+    def test_find_paradigms_by_lemma(self):
+        db = self._load(use_snapshot=False)
+        self.assertEqual(db.find_paradigms_by_lemma("ГО+Д"), [100])
+        self.assertEqual(db.find_paradigms_by_lemma("гад"), [101])
+        self.assertEqual(db.find_paradigms_by_lemma("гады"), [])
+
+    def test_complete_prefix(self):
+        db = self._load(use_snapshot=False)
+        self.assertEqual(db.complete_prefix("Г"), ["гад", "гады", "год", "года"])
+        self.assertEqual(db.complete_prefix("го", limit=1), ["год"])
+        self.assertEqual(db.complete_prefix("ж"), [])
+
+    def test_find_similar(self):
+        db = self._load(use_snapshot=False)
+        self.assertEqual(db.find_similar("гота"), [("года", 1), ("год", 2)])
+        self.assertEqual(db.find_similar("гота", max_distance=3), [("года", 1), ("год", 2), ("гад", 3), ("гады", 3), ("на", 3)])
+        self.assertEqual(db.find_similar("гота", max_distance=1), [("года", 1)])
+        self.assertEqual(db.find_similar("жжжжж"), [])
+
+    def test_find_by_tag(self):
+        db = self._load(use_snapshot=False)
+
+        def found(*args, **kwargs):
+            return [(form, str(variant.paradigma_form_id)) for form, variant in db.find_by_tag(*args, **kwargs)]
+
+        self.assertEqual(found("NC", "NP"), [("гады", "100a.NP"), ("гады", "101a.NP")])
+        self.assertEqual(found(form_tag=".P"), [("гады", "100a.NP"), ("гады", "100a.AP"), ("гады", "101a.NP")])
+        self.assertEqual(found("N.A"), [("гады", "101a.NP"), ("гад", "101a.NS")])
+        self.assertEqual(found("NC", "NP", limit=1), [("гады", "100a.NP")])
+        self.assertEqual(found("I"), [("на", "200a.")])
+        self.assertEqual(found("NC", "GS."), [])
+        self.assertEqual(found("X"), [])
+        self.assertEqual(len(found()), 7)
+
+        (self.base_path / "E.xml").write_text(PREPOSITIONS_XML.replace('pdgId="200" lemma="на+" tag="I"', 'pdgId="300" lemma="на+" tag="E"'), encoding="utf-8")
+        db.load_from_xml(self.base_path / "E.xml")
+        self.assertEqual(found("E"), [("на", "300a.")])
+
+    def test_lookup_compound(self):
+        db = self._load(use_snapshot=False)
+        self.assertEqual(db.lookup_compound("гады"), db.lookup_word("гады"))
+
+        def found(word):
+            return [(variant.normalized_lemma, str(variant.paradigma_form_id)) for variant in db.lookup_compound(word)]
+
+        # Галоўная частка - апошняя, калі гэта не часціца
+        self.assertEqual(found("Сіні-года"), [("Сіні-го́д", "100a.GS")])
+        self.assertEqual(found("года-небудзь"), [("го́д-небудзь", "100a.GS")])
+        self.assertEqual(found("абы-гад"), [("абы-га́д", "101a.NS")])
+        self.assertEqual(found("сіні-года-небудзь"), [("сіні-го́д-небудзь", "100a.GS")])
+        self.assertIsNone(db.lookup_compound("года-сіні"))
+        self.assertIsNone(db.lookup_compound("-года"))
+        self.assertIsNone(db.lookup_compound("невядома"))
+
+    def test_infer_compound(self):
+        db = self._load(use_snapshot=False)
+        self.assertEqual(db.infer_compound("года"), db.infer_grammar_info("года"))
+        with mock.patch.object(db, "_decompose", wraps=db._decompose) as decompose:
+            paradigma_form_id, lemma, linguistic_tag = db.infer_compound("сіні-года")
+            self.assertEqual(db.infer_compound("сіні-года"), (paradigma_form_id, lemma, linguistic_tag))
+            decompose.assert_called_once()
+        self.assertIsNone(paradigma_form_id)
+        self.assertEqual(lemma, "сіні-го́д")
+        self.assertEqual(str(linguistic_tag), "NCIINM2|GS")
+        self.assertEqual(db.infer_compound("года-сіні"), (None, None, None))
+
+    def test_compound_cache_is_bounded(self):
+        db = self._load(use_snapshot=False)
+        with mock.patch.object(GrammarDB, "COMPOUND_CACHE_SIZE", 2):
+            for prefix in ["сіні", "белы", "новы"]:
+                db.infer_compound(f"{prefix}-года")
+            self.assertEqual(list(db._index.compounds), ["белы-года", "новы-года"])
+            # Зноў выкарыстаны разбор выцясняецца апошнім
+            db.infer_compound("белы-года")
+            db.infer_compound("сіні-года")
+            self.assertEqual(list(db._index.compounds), ["белы-года", "сіні-года"])
+        self.assertNotIn("compounds", db._index_state())
+
+    def test_guess(self):
+        db = self._load(use_snapshot=False)
+        guesses = db.guess("Склад")
+        self.assertEqual([str(guess.linguistic_tag) for guess in guesses], ["NCIINM2|NS", "NCAINM1|NS"])
+        # Лема захоўвае напісанне слова
+        self.assertEqual({(guess.lemma, guess.probability, guess.suffix) for guess in guesses}, {("Склад", 0.5, "д")})
+        self.assertEqual(db.guess("Склад", limit=1), guesses[:1])
+        # Канчатак "ы" ёсць толькі ў адной вядомай форме, гэтага мала для здагадкі
+        self.assertEqual(db.guess("невядомы"), [])
+
+    def test_guess_lemma_rewrite(self):
+        db = self._load(use_snapshot=False)
+        guesser = SuffixGuesser(((form, variants) for form, variants, _ in db.iter_index()), min_count=1)
+        (guess,) = guesser.guess("пагода")
+        self.assertEqual((str(guess.linguistic_tag), guess.lemma, guess.probability, guess.suffix), ("NCIINM2|GS", "пагод", 1.0, "года"))
+
+    def test_guess_lemma_keeps_spelling(self):
+        (self.base_path / "V.xml").write_text(
+            """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Wordlist>
+    <Paradigm pdgId="400" lemma="пасміхну+цца" tag="VIPR1">
+        <Variant id="a" lemma="пасміхну+цца">
+            <Form tag="XP">пасміхну+ўшыся</Form>
+        </Variant>
+    </Paradigm>
+    <Paradigm pdgId="401" lemma="сло+ўны" tag="ARP">
+        <Variant id="a" lemma="сло+ўны">
+            <Form tag="PNP">сло+ўныя</Form>
+        </Variant>
+    </Paradigm>
+</Wordlist>
+""",
+            encoding="utf-8",
+        )
+        db = self._load(use_snapshot=False)
+        guesser = SuffixGuesser(((form, variants) for form, variants, _ in db.iter_index()), min_count=1)
+        self.assertEqual(guesser.guess("Ўсміхнуўшыся")[0].lemma, "Ўсміхнуцца")
+        self.assertEqual(guesser.guess("Заўсёдныя")[0].lemma, "Заўсёдны")
+
+    def test_parallel_load_keeps_variant_order(self):
+        sequential = self._load(use_snapshot=False)
+        parallel = self._load(use_snapshot=False, workers=2)
+        self.assertEqual(list(parallel._index.word_forms), list(sequential._index.word_forms))
+        for normalized_form, variants in sequential._index.word_forms.items():
+            self.assertEqual(parallel._index.word_forms[normalized_form], variants)
+
+    def test_snapshot_is_reused(self):
+        expected = self._load()
+        self.assertTrue((self.base_path / GrammarDB.SNAPSHOT_FILE_NAME).exists())
+
+        with mock.patch.object(GrammarDB, "load_from_xml") as load_from_xml:
+            db = self._load()
+            load_from_xml.assert_not_called()
+
+        self.assertEqual(db.lookup_word("гады"), expected.lookup_word("гады"))
+        self.assertEqual(db.lookup_word("на"), expected.lookup_word("на"))
+        self.assertEqual(db.get_paradigm(100), expected.get_paradigm(100))
+        self.assertEqual(db.find_paradigms_by_lemma("на"), [200])
+        self.assertEqual(db.paradigm_source(100), expected.paradigm_source(100))
+
+    def test_snapshot_is_rebuilt_when_xml_changes(self):
+        self._load()
+        xml_path = self.base_path / "I.xml"
+        xml_path.write_text(PREPOSITIONS_XML.replace("на+", "ля+"), encoding="utf-8")
+        self._touch(xml_path)
+
+        db = self._load()
+        self.assertIsNone(db.lookup_word("на"))
+        self.assertIsNotNone(db.lookup_word("ля"))
+
+    def _touch(self, xml_path: Path) -> None:
+        stat = xml_path.stat()
+        os.utime(xml_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    def test_refresh_reindexes_changed_file(self):
+        db = self._load()
+        self.assertEqual(db.refresh(), [])
+
+        xml_path = self.base_path / "N.xml"
+        xml_path.write_text(NOUNS_XML.replace("га+д", "гу+д"), encoding="utf-8")
+        self._touch(xml_path)
+        with mock.patch("automations.grammar_db._index_xml_file", wraps=grammar_db._index_xml_file) as index_xml_file:
+            self.assertEqual(db.refresh(), ["N.xml"])
+            index_xml_file.assert_called_once_with(xml_path, None)
+
+        expected = self._load(use_snapshot=False)
+        self.assertEqual(db._index.word_forms, expected._index.word_forms)
+        self.assertEqual(db._index.inferences, expected._index.inferences)
+        self.assertIsNone(db.lookup_word("гад"))
+        self.assertEqual(db.find_paradigms_by_lemma("гуд"), [101])
+        self.assertEqual(db.find_paradigms_by_lemma("гад"), [])
+        self.assertIn("гу+д", db.paradigm_source(101))
+        self.assertEqual(db.complete_prefix("г"), ["гады", "год", "года", "гуд"])
+
+    def test_refresh_skips_touched_file_with_same_content(self):
+        db = self._load()
+        self._touch(self.base_path / "I.xml")
+        self.assertEqual(db.refresh(), [])
+
+    def test_refresh_handles_added_and_removed_files(self):
+        db = self._load(use_snapshot=False)
+        (self.base_path / "I.xml").unlink()
+        (self.base_path / "E.xml").write_text(PREPOSITIONS_XML.replace('pdgId="200" lemma="на+" tag="I"', 'pdgId="300" lemma="на+" tag="E"'), encoding="utf-8")
+        self.assertEqual(db.refresh(), ["E.xml", "I.xml"])
+        self.assertEqual([str(v.paradigma_form_id) for v in db.lookup_word("на")], ["300a."])
+        self.assertIsNone(db.get_paradigm(200))
+        self.assertEqual(db.find_paradigms_by_lemma("на"), [300])
+
+    def test_refresh_keeps_lemma_paradigm_order(self):
+        # A.xml ідзе перад N.xml, таму пасля абнаўлення яго парадыгмы павінны застацца першымі
+        adjectives_xml = PREPOSITIONS_XML.replace('pdgId="200" lemma="на+" tag="I"', 'pdgId="150" lemma="го+д" tag="A"').replace("на+", "го+д")
+        (self.base_path / "A.xml").write_text(adjectives_xml, encoding="utf-8")
+        db = self._load(use_snapshot=False)
+        self.assertEqual(db.find_paradigms_by_lemma("год"), [150, 100])
+
+        (self.base_path / "A.xml").write_text(adjectives_xml.replace('pravapis="A2008"', 'pravapis="A1957"'), encoding="utf-8")
+        self._touch(self.base_path / "A.xml")
+        self.assertEqual(db.refresh(), ["A.xml"])
+        expected = self._load(use_snapshot=False)
+        self.assertEqual(db._index.lemma_paradigms, expected._index.lemma_paradigms)
+        self.assertEqual(db.find_paradigms_by_lemma("год"), [150, 100])
+
+    def test_refresh_keeps_files_loaded_outside_directory(self):
+        with tempfile.TemporaryDirectory() as other_dir:
+            external_path = Path(other_dir) / "E.xml"
+            external_path.write_text(PREPOSITIONS_XML.replace('pdgId="200" lemma="на+" tag="I"', 'pdgId="300" lemma="на+" tag="E"'), encoding="utf-8")
+            db = self._load(use_snapshot=False)
+            db.load_from_xml(external_path)
+
+            xml_path = self.base_path / "N.xml"
+            xml_path.write_text(NOUNS_XML.replace("га+д", "гу+д"), encoding="utf-8")
+            self._touch(xml_path)
+            self.assertEqual(db.refresh(), ["N.xml"])
+            expected = self._load(use_snapshot=False)
+            expected.load_from_xml(external_path)
+            self.assertEqual(db._index.word_forms, expected._index.word_forms)
+            self.assertEqual(db._index.lemma_paradigms, expected._index.lemma_paradigms)
+            self.assertEqual([str(v.paradigma_form_id) for v in db.lookup_word("на")], ["200a.", "300a."])
+
+            external_path.unlink()
+            self.assertEqual(db.refresh(), ["E.xml"])
+            self.assertEqual([str(v.paradigma_form_id) for v in db.lookup_word("на")], ["200a."])
+
+    def test_refresh_keeps_index_for_broken_file(self):
+        db = self._load(use_snapshot=False)
+        index = db._index
+        xml_path = self.base_path / "N.xml"
+        # Файл захаваны напалову
+        xml_path.write_text(NOUNS_XML.replace("га+д", "гу+д")[: len(NOUNS_XML) // 2], encoding="utf-8")
+        self._touch(xml_path)
+        with self.assertLogs("automations.grammar_db", level="WARNING"):
+            self.assertEqual(db.refresh(), [])
+        self.assertIs(db._index, index)
+        self.assertEqual(db.find_paradigms_by_lemma("гад"), [101])
+
+        xml_path.write_text(NOUNS_XML.replace("га+д", "гу+д"), encoding="utf-8")
+        self._touch(xml_path)
+        self.assertEqual(db.refresh(), ["N.xml"])
+        self.assertEqual(db.find_paradigms_by_lemma("гуд"), [101])
+        # Чытач, які ўзяў індэкс да абнаўлення, бачыць яго цэлым
+        self.assertEqual(index.paradigms[101][0].lemma, "га+д")
+
+    def test_refresh_if_due(self):
+        db = self._load(use_snapshot=False)
+        with mock.patch.object(GrammarDB, "refresh", return_value=[]) as refresh:
+            db.refresh_if_due(3600)
+            refresh.assert_not_called()
+            db.refresh_if_due(0)
+            refresh.assert_called_once()
+
+    def test_loading_leaves_normalizer_caches_empty(self):
+        db = self._load(use_snapshot=False)
+        self.assertTrue(all(info.currsize == 0 for info in db._normalizer.cache_info().values()))
+        db.lookup_word("гады")
+        self.assertTrue(any(info.currsize for info in db._normalizer.cache_info().values()))
+
+    def test_load_with_filters(self):
+        (self.base_path / "H.xml").write_text(HOURS_XML, encoding="utf-8")
+        db = self._load(use_snapshot=False, pravapis=["A1957"])
+        self.assertIsNone(db.lookup_word("год"))
+        self.assertEqual([str(v.paradigma_form_id) for v in db.lookup_word("гадзіны")], ["102a.NP"])
+        self.assertEqual(db.lookup_word("гадзіны")[0].properties["form_slouniki"], "piskunou2012:123")
+        self.assertEqual(db.infer_grammar_info("гадзіны")[0].is_singular(), True)
+
+        db = self._load(use_snapshot=False, slouniki=["sbm2012", "piskunou2012"])
+        self.assertEqual([str(v.paradigma_form_id) for v in db.lookup_word("гады")], ["100a.NP", "100a.AP"])
+        self.assertEqual(len(db.lookup_word("гадзіны")), 2)
+        self.assertIsNone(db.lookup_word("гадзіна"))
+        self.assertEqual(db.find_paradigms_by_lemma("гадзіна"), [102])
+        self.assertEqual(db.lookup_word("на")[0].properties["form_slouniki"], "sbm2012")
+
+    def test_shared_properties_are_immutable(self):
+        db = self._load(use_snapshot=False)
+        first, second = db.lookup_word("гады")[:2]
+        self.assertIs(first.properties, second.properties)
+        with self.assertRaises(TypeError):
+            first.properties["form_slouniki"] = "іншы"
+        self.assertEqual(pickle.loads(pickle.dumps(first.properties)), first.properties)
+        self.assertEqual(dict(first.properties)["form_slouniki"], "sbm2012")
+
+    def test_filtered_view_matches_filtered_load(self):
+        (self.base_path / "H.xml").write_text(HOURS_XML, encoding="utf-8")
+        full = self._load(use_snapshot=False)
+        for kwargs in [{"pravapis": ["A2008"]}, {"slouniki": ["sbm2012"]}, {"pravapis": ["A1957"], "slouniki": ["piskunou2012", "tsbm1984"]}]:
+            view = full.filtered(**kwargs)
+            expected = self._load(use_snapshot=False, **kwargs)
+            self.assertEqual(view._index.word_forms, expected._index.word_forms)
+            self.assertEqual(view._index.inferences, expected._index.inferences)
+            self.assertEqual(view._index.paradigms, expected._index.paradigms)
+            self.assertEqual(view._index.lemma_paradigms, expected._index.lemma_paradigms)
+        self.assertEqual(len(full.lookup_word("гадзіны")), 2)
+
+    def test_filter_has_own_snapshot(self):
+        (self.base_path / "H.xml").write_text(HOURS_XML, encoding="utf-8")
+        full = self._load()
+        filtered = self._load(pravapis=["A1957"])
+        self.assertNotEqual(len(full.lookup_word("гадзіны")), len(filtered.lookup_word("гадзіны")))
+        self.assertEqual(self._load().lookup_word("гадзіны"), full.lookup_word("гадзіны"))
+        self.assertEqual(self._load(pravapis=["A1957"]).lookup_word("гадзіны"), filtered.lookup_word("гадзіны"))
+
+    def test_corrupted_snapshot_is_ignored(self):
+        (self.base_path / GrammarDB.SNAPSHOT_FILE_NAME).write_bytes(b"not a snapshot")
+        db = self._load()
+        self.assertIsNotNone(db.lookup_word("на"))
+
+
+class LoadedGrammarDBTestCase(unittest.TestCase):
+    """База з N.xml і I.xml, загружаная без здымка, для параўнання з іншымі сховішчамі."""
+
+    def setUp(self):
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.base_path = Path(self._tmp_dir.name)
+        (self.base_path / "N.xml").write_text(NOUNS_XML, encoding="utf-8")
+        (self.base_path / "I.xml").write_text(PREPOSITIONS_XML, encoding="utf-8")
+        self.grammar_db = GrammarDB()
+        self.grammar_db.load_directory(self.base_path, use_snapshot=False)
+
+    def tearDown(self):
+        self._tmp_dir.cleanup()
+
+
+class TestMmapGrammarDB(LoadedGrammarDBTestCase):
+    def setUp(self):
+        super().setUp()
+        MmapGrammarDB.build(self.grammar_db, self.base_path / "compiled")
+        self.mmap_db = MmapGrammarDB(self.base_path / "compiled")
+
+    def tearDown(self):
+        self.mmap_db.close()
+        super().tearDown()
+
+    def test_same_lookup_results(self):
+        for word in ["гады", "ГОДА", "на", "гад", "невядома"]:
+            self.assertEqual(self.mmap_db.lookup_word(word), self.grammar_db.lookup_word(word))
+
+    def test_same_inference(self):
+        for word in ["гады", "года", "на", "невядома"]:
+            self.assertEqual(self.mmap_db.infer_grammar_info(word), self.grammar_db.infer_grammar_info(word))
+
+    def test_same_batch_results(self):
+        words = ["гады", "года", "на", "невядома", "на"]
+        mmap_stats, stats = LookupStats(), LookupStats()
+        self.assertEqual(self.mmap_db.infer_many(words, mmap_stats), self.grammar_db.infer_many(words, stats))
+        self.assertEqual(mmap_stats, stats)
+
+    def test_broken_files_are_closed(self):
+        broken_path = self.base_path / "broken"
+        broken_path.mkdir()
+        (broken_path / MmapGrammarDB.KEYS_FILE_NAME).write_bytes((self.base_path / "compiled" / MmapGrammarDB.KEYS_FILE_NAME).read_bytes())
+        (broken_path / MmapGrammarDB.RECORDS_FILE_NAME).write_bytes(b"\0" * 64)
+        opened = []
+
+        def tracking_open(*args, **kwargs):
+            opened.append(open(*args, **kwargs))
+            return opened[-1]
+
+        with mock.patch("automations.mmap_grammar_db.open", tracking_open, create=True):
+            with self.assertRaises(ValueError):
+                MmapGrammarDB(broken_path)
+        self.assertEqual(len(opened), 2)
+        self.assertTrue(all(f.closed for f in opened))
+
+
+class TestSqliteGrammarDB(LoadedGrammarDBTestCase):
+    def setUp(self):
+        super().setUp()
+        SqliteGrammarDB.build(self.grammar_db, self.base_path / "grammar.sqlite")
+        self.sqlite_db = SqliteGrammarDB(self.base_path / "grammar.sqlite")
+
+    def tearDown(self):
+        self.sqlite_db.close()
+        super().tearDown()
+
+    def test_same_lookup_results(self):
+        for word in ["гады", "ГОДА", "на", "гад", "невядома"]:
+            self.assertEqual(self.sqlite_db.lookup_word(word), self.grammar_db.lookup_word(word))
+
+    def test_same_inference(self):
+        words = ["гады", "года", "на", "невядома", "на"]
+        for word in words:
+            self.assertEqual(self.sqlite_db.infer_grammar_info(word), self.grammar_db.infer_grammar_info(word))
+        self.assertEqual(self.sqlite_db.infer_many(words), self.grammar_db.infer_many(words))
+
+    def test_same_paradigms(self):
+        self.assertEqual(self.sqlite_db.get_paradigm(100), self.grammar_db.get_paradigm(100))
+        self.assertEqual(self.sqlite_db.paradigm_location(100), self.grammar_db.paradigm_location(100))
+        self.assertIsNone(self.sqlite_db.get_paradigm(999))
+        self.assertEqual(self.sqlite_db.find_paradigms_by_lemma("ГОД"), self.grammar_db.find_paradigms_by_lemma("ГОД"))
+
+    def test_wrong_version(self):
+        path = self.base_path / "old.sqlite"
+        SqliteGrammarDB.build(self.grammar_db, path)
+        connection = sqlite3.connect(path)
+        connection.execute("PRAGMA user_version = 0")
+        connection.close()
+        with self.assertRaises(ValueError):
+            SqliteGrammarDB(path)
+
+    def test_failed_build_leaves_no_files(self):
+        path = self.base_path / "broken.sqlite"
+        with mock.patch.object(GrammarDB, "iter_index", side_effect=RuntimeError("збой")):
+            with self.assertRaises(RuntimeError):
+                SqliteGrammarDB.build(self.grammar_db, path)
+        self.assertEqual(list(path.parent.glob(f"{path.name}*")), [])
+
+
+def _infer_in_shared_grammar_db(name, words):
+    with SharedGrammarDB.attach(name) as shared_db:
+        return shared_db.infer_many(words)
+
+
+class TestSharedGrammarDB(LoadedGrammarDBTestCase):
+    def setUp(self):
+        super().setUp()
+        self.shared_db = SharedGrammarDB.create(self.grammar_db)
+
+    def tearDown(self):
+        self.shared_db.close()
+        super().tearDown()
+
+    def test_same_lookup_results(self):
+        for word in ["гады", "ГОДА", "на", "гад", "невядома"]:
+            self.assertEqual(self.shared_db.lookup_word(word), self.grammar_db.lookup_word(word))
+
+    def test_attach_in_worker_process(self):
+        words = ["гады", "года", "на", "невядома"]
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            inferences = executor.submit(_infer_in_shared_grammar_db, self.shared_db.name, words).result()
+        self.assertEqual(inferences, self.grammar_db.infer_many(words))
+        # Адключэнне працоўнага працэса не выдаляе сегмент
+        self.assertEqual(self.shared_db.infer_many(words), inferences)
+
+    def test_attached_segment_is_read_only(self):
+        with SharedGrammarDB.attach(self.shared_db.name) as attached:
+            self.assertEqual(attached.lookup_word("гады"), self.grammar_db.lookup_word("гады"))
+            with self.assertRaises(TypeError):
+                attached._records[0] = 0
+        # Сегмент застаецца, пакуль яго не выдаліць уладальнік
+        self.assertEqual(self.shared_db.lookup_word("на"), self.grammar_db.lookup_word("на"))
+
+    def test_attach_in_independent_process(self):
+        code = f"from automations.shared_grammar_db import SharedGrammarDB; SharedGrammarDB.attach({self.shared_db.name!r}).close()"
+        subprocess.run([sys.executable, "-c", code], check=True, cwd=Path(__file__).parent.parent)
+        # Выхад незалежнага працэса не выдаляе сегмент
+        SharedGrammarDB.attach(self.shared_db.name).close()
+
+    def test_close_unlinks_segment(self):
+        name = self.shared_db.name
+        self.shared_db.close()
+        with self.assertRaises(FileNotFoundError):
+            SharedGrammarDB.attach(name)
+        self.shared_db = SharedGrammarDB.create(self.grammar_db)
+
+
+class TestGrammarDBServer(LoadedGrammarDBTestCase):
+    def setUp(self):
+        super().setUp()
+
+        self.server = GrammarDBServer(self.grammar_db, self.base_path / "grammar_db.sock")
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        # Маленькія кавалкі, каб адзін пакет ішоў некалькімі канвеерызаванымі запытамі
+        self.client = GrammarDBClient(self.base_path / "grammar_db.sock", batch_size=2)
+
+    def tearDown(self):
+        self.client.close()
+        self.server.shutdown()
+        self.server.server_close()
+        super().tearDown()
+
+    def test_same_lookup_results(self):
+        words = ["гады", "ГОДА", "на", "гад", "невядома", "гады"]
+        stats, expected_stats = LookupStats(), LookupStats()
+        self.assertEqual(self.client.lookup_words(words, stats), self.grammar_db.lookup_words(words, expected_stats))
+        self.assertEqual(stats, expected_stats)
+        self.assertEqual(self.client.lookup_word("гады"), self.grammar_db.lookup_word("гады"))
+
+    def test_same_inference(self):
+        words = ["гады", "года", "на", "невядома"] * 3
+        self.assertEqual(self.client.infer_many(words), self.grammar_db.infer_many(words))
+        self.assertEqual(self.client.infer_grammar_info("года"), self.grammar_db.infer_grammar_info("года"))
+
+    def test_server_error(self):
+        with self.assertRaises(RuntimeError):
+            self.client._call("unknown", ["на"])
+        self.assertIsNone(self.client.lookup_word("невядома"))
+
+    def test_running_server_socket_is_kept(self):
+        with self.assertRaises(OSError):
+            GrammarDBServer(self.grammar_db, self.base_path / "grammar_db.sock")
+        self.assertEqual(self.client.lookup_word("на"), self.grammar_db.lookup_word("на"))
+
+    def test_stale_socket_is_replaced(self):
+        stale_path = self.base_path / "stale.sock"
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as stale:
+            stale.bind(str(stale_path))
+        with GrammarDBServer(self.grammar_db, stale_path):
+            self.assertTrue(stale_path.exists())
+
+    def test_call_after_failed_batch(self):
+        # Памылка ў кожным з некалькіх кавалкаў не пакідае непрачытаных адказаў для наступнага выкліку
+        with self.assertRaises(RuntimeError):
+            self.client._call("unknown", ["на", "гады", "год", "года", "гад"])
+        words = ["гады", "на", "год", "года", "гад"]
+        self.assertEqual(self.client.lookup_words(words), self.grammar_db.lookup_words(words))
+
+    def test_refresh_error_keeps_serving(self):
+        self.server.refresh_interval = 1
+        with mock.patch.object(GrammarDB, "refresh_if_due", side_effect=OSError("няма дырэкторыі")):
+            with self.assertLogs("automations.grammar_server", level="WARNING"):
+                self.assertEqual(self.client.lookup_word("гады"), self.grammar_db.lookup_word("гады"))
+
+
+if __name__ == "__main__":
+    unittest.main()
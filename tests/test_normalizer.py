@@ -1,6 +1,20 @@
+import pickle
 import unittest
+from pathlib import Path
+from lxml import etree
 from automations.normalizer import Normalizer
 
+GRAMMAR_BASE_PATH = Path(__file__).parent.parent / "grammar-base"
+
+
+def _reference_normalize(table: dict, word: str) -> str:
+    """Ранейшая рэалізацыя нармалізацыі цыклам па сімвалах, з якой параўноўваюцца табліцы str.translate."""
+    result = []
+    for c in word:
+        if normalized := table.get(c):
+            result.append(normalized)
+    return "".join(result)
+
 
 class TestNormalizer(unittest.TestCase):
     def setUp(self):
@@ -46,24 +60,120 @@ class TestNormalizer(unittest.TestCase):
         self.assertTrue(self.normalizer.is_letter("q"))
         self.assertTrue(self.normalizer.is_letter("9"))
         self.assertFalse(self.normalizer.is_letter("!"))
-        # todo: дадаць тэсты для камбінаваных літар з націскам, калі будзе рэалізавана
+        self.assertTrue(self.normalizer.is_letter("á"))  # літара з убудаваным націскам
+        self.assertTrue(self.normalizer.is_letter("Ó"))
+
+    def test_precomposed_stress_normalize(self):
+        self.assertEqual(self.normalizer.tokinization_normalize("мáма"), "ма\u0301ма")
+        self.assertEqual(self.normalizer.tokinization_normalize("Íван"), "І\u0301ван")
+        self.assertEqual(self.normalizer.grammar_db_aggressive_normalize("ÉЎ"), "е\u0301у")
+        self.assertEqual(self.normalizer.grammar_db_light_normalize("дóм"), "до\u0301м")
+        self.assertEqual(self.normalizer.tokinization_normalize("Ýлада"), "У\u0301лада")
+        # Тое ж, што і слова з кірылічнай літарай і асобным націскам
+        self.assertEqual(self.normalizer.grammar_db_aggressive_normalize("мóва"), self.normalizer.grammar_db_aggressive_normalize("мо\u0301ва"))
+
+    def test_precomposed_stress_in_latin_words(self):
+        # Слова без кірыліцы застаюцца лацінскімі, як і ў unstress і stress_variants
+        self.assertEqual(self.normalizer.tokinization_normalize("café"), "cafe\u0301")
+        self.assertEqual(self.normalizer.grammar_db_light_normalize("José"), "Jose\u0301")
+        self.assertEqual(self.normalizer.grammar_db_aggressive_normalize("José"), "jose\u0301")
+        self.assertEqual(self.normalizer.normalize_many(["café", "мóва", "José"], Normalizer.TOKENIZATION), ["cafe\u0301", "мо\u0301ва", "Jose\u0301"])
 
     def test_unstress(self):
         self.assertEqual(self.normalizer.unstress("прывіта́ньне"), "прывітаньне")
         self.assertEqual(self.normalizer.unstress("прывіта´ньне"), "прывітаньне")
         self.assertEqual(self.normalizer.unstress("прывіта+ньне"), "прывітаньне")
         self.assertEqual(self.normalizer.unstress("прывітаньне"), "прывітаньне")
+        self.assertEqual(self.normalizer.unstress("дóм"), "дом")
+        self.assertEqual(self.normalizer.unstress("кáт"), "кат")
+        self.assertEqual(self.normalizer.unstress("café"), "cafe")  # слова без кірыліцы застаецца лацінскім
 
     def test_has_stress(self):
         self.assertTrue(self.normalizer.has_stress("прывіта́ньне"))
         self.assertTrue(self.normalizer.has_stress("прывіта´ньне"))
         self.assertTrue(self.normalizer.has_stress("прывіта+ньне"))
         self.assertFalse(self.normalizer.has_stress("прывітаньне"))
+        self.assertTrue(self.normalizer.has_stress("дóм"))
 
     def test_db_stress_normalize(self):
         self.assertEqual(self.normalizer.db_stress_normalize("прывіта́ньне"), "прывіта+ньне")
         self.assertEqual(self.normalizer.db_stress_normalize("прывіта´ньне"), "прывіта+ньне")
         self.assertEqual(self.normalizer.db_stress_normalize("прывітаньне"), "прывітаньне")
+        self.assertEqual(self.normalizer.db_stress_normalize("прывіта+ньне"), "прывіта+ньне")
+        self.assertEqual(self.normalizer.db_stress_normalize("дóм"), "до+м")
+
+    def test_stress_variants(self):
+        for word in ["прывіта́ньне", "прывіта´ньне", "прывіта+ньне"]:
+            self.assertEqual(self.normalizer.stress_variants(word), ("прывітаньне", "прывіта\u0301ньне"))
+        self.assertEqual(self.normalizer.stress_variants("дóм"), ("дом", "до\u0301м"))
+        self.assertEqual(self.normalizer.stress_variants("Andrés"), ("Andres", "Andre\u0301s"))
+        self.assertEqual(self.normalizer.stress_variants("прывітаньне"), ("прывітаньне", "прывітаньне"))
+        self.normalizer.stress_variants("прывітаньне")
+        self.assertEqual(self.normalizer.cache_info()[Normalizer.STRESS_VARIANTS].hits, 1)
+
+    def test_normalize_many(self):
+        words = ["Прывіта+ньне", "ЎЧОРА", "", "гуся-сюся!", "a\x00b", "café"]
+        for mode, normalize in [
+            (Normalizer.TOKENIZATION, self.normalizer.tokinization_normalize),
+            (Normalizer.GRAMMAR_DB_AGGRESSIVE, self.normalizer.grammar_db_aggressive_normalize),
+            (Normalizer.GRAMMAR_DB_LIGHT, self.normalizer.grammar_db_light_normalize),
+        ]:
+            self.assertEqual(self.normalizer.normalize_many(words, mode), [normalize(word) for word in words])
+            self.assertEqual(self.normalizer.normalize_many(words[:4], mode), [normalize(word) for word in words[:4]])
+            self.assertEqual(self.normalizer.normalize_many(iter([]), mode), [])
+
+    def test_tables_are_shared(self):
+        other = Normalizer()
+        self.assertIs(other._translate_tables, self.normalizer._translate_tables)
+        self.assertIs(other._batch_tables, self.normalizer._batch_tables)
+        self.assertIs(other._grammar_search_aggressive_normalize, self.normalizer._grammar_search_aggressive_normalize)
+
+    def test_cache(self):
+        normalizer = Normalizer(cache_size=2)
+        words = ["Год", "год", "Год", "Год", "ГОД", "год"]
+        self.assertEqual([normalizer.grammar_db_aggressive_normalize(word) for word in words], ["год"] * len(words))
+        info = normalizer.cache_info()[Normalizer.GRAMMAR_DB_AGGRESSIVE]
+        self.assertEqual((info.hits, info.misses, info.currsize), (2, 4, 2))
+        self.assertEqual(normalizer.cache_info()[Normalizer.TOKENIZATION].misses, 0)
+
+        normalizer.cache_clear()
+        info = normalizer.cache_info()[Normalizer.GRAMMAR_DB_AGGRESSIVE]
+        self.assertEqual((info.hits, info.misses, info.currsize), (0, 0, 0))
+
+    def test_without_cache(self):
+        normalizer = Normalizer(cache_size=0)
+        self.assertEqual(normalizer.tokinization_normalize("Прывіта´ньне"), "Прывіта\u0301ньне")
+        self.assertEqual(normalizer.tokinization_normalize("Прывіта´ньне"), "Прывіта\u0301ньне")
+        self.assertEqual(normalizer.cache_info()[Normalizer.TOKENIZATION].currsize, 0)
+
+    def test_pickle(self):
+        normalizer = pickle.loads(pickle.dumps(Normalizer(cache_size=10)))
+        self.assertEqual(normalizer.grammar_db_aggressive_normalize("Ўчора"), "учора")
+        self.assertEqual(normalizer.cache_info()[Normalizer.GRAMMAR_DB_AGGRESSIVE].maxsize, 10)
+
+    def test_same_as_reference_for_all_characters(self):
+        text = "".join(chr(c) for c in range(0x3000)) + "😀\U000e0001𝐀"
+        for table, normalize in self._engines():
+            self.assertEqual(normalize(text), _reference_normalize(table, text))
+
+    @unittest.skipUnless(GRAMMAR_BASE_PATH.is_dir(), "няма граматычнай базы")
+    def test_same_as_reference_for_grammar_base(self):
+        words = set()
+        for xml_path in GRAMMAR_BASE_PATH.glob("*.xml"):
+            for _, element in etree.iterparse(str(xml_path), events=("end",)):
+                words.update(value for value in element.attrib.values())
+                if element.text:
+                    words.add(element.text)
+        words = sorted(words)
+        for table, normalize in self._engines():
+            self.assertEqual([normalize(word) for word in words], [_reference_normalize(table, word) for word in words])
+
+    def _engines(self):
+        return [
+            (self.normalizer._tokenization_normalize, self.normalizer.tokinization_normalize),
+            (self.normalizer._grammar_search_aggressive_normalize, self.normalizer.grammar_db_aggressive_normalize),
+            (self.normalizer._grammar_search_light_normalize, self.normalizer.grammar_db_light_normalize),
+        ]
 
 
 if __name__ == "__main__":
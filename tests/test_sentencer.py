@@ -1,5 +1,6 @@
+import random
 import unittest
-from automations.tokenizer import Token, TokenType
+from automations.tokenizer import Token, TokenType, Tokenizer
 from automations.sentencer import Sentencer, SentenceItem, SentenceItemType
 
 class TestSentencer(unittest.TestCase):
@@ -287,5 +288,30 @@ class TestSentencer(unittest.TestCase):
                 self.assertEqual(actual.type, expected.type)
                 self.assertEqual(actual.glue_next, expected.glue_next)
 
+    def test_iter_sentences(self):
+        def tokens():
+            yield Token("Так", TokenType.AlphaNumeric)
+            yield Token("!", TokenType.NonAlphaNumeric)
+            yield Token(None, TokenType.SentenceSeparator)
+            raise AssertionError("другі сказ не павінен чытацца раней, чым яго папросяць")
+
+        sentences = self.sentencer.iter_sentences(tokens())
+        first = next(sentences)
+        self.assertEqual([(item.text, item.type, item.glue_next) for item in first], [
+            ("Так", SentenceItemType.Word, True),
+            ("!", SentenceItemType.Punctuation, False),
+        ])
+
+    def test_fused_same_as_two_stage(self):
+        tokenizer = Tokenizer()
+        alphabet = "абвгдзАБЎўіiIqz09 .?!\n-'ʼ’´\u0301[],:;«»—…\t\xa0😀áÓ+&<"
+        rnd = random.Random(2)
+        texts = ["Хто піпку ку\u00b4рыць, хто сьмяецца,\nА іншы песьню бурудзіць.", "- Адно, слова... А: потым ? 123 мо'' 'ак з'ява", "Ну...!? Так"]
+        texts += ["".join(rnd.choice(alphabet) for _ in range(rnd.randint(0, 40))) for _ in range(20000)]
+        for text in texts:
+            fused = [[(item.text, item.type, item.glue_next) for item in sentence] for sentence in tokenizer.iter_sentences(text)]
+            two_stage = [[(item.text, item.type, item.glue_next) for item in sentence] for sentence in self.sentencer.to_sentences(tokenizer.parse(text))]
+            self.assertEqual(fused, two_stage, repr(text))
+
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
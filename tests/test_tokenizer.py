@@ -1,7 +1,63 @@
+import random
 import unittest
+from automations.normalizer import Normalizer
 from automations.tokenizer import Tokenizer, Token, TokenType
 
 
+def _reference_parse(normalizer: Normalizer, line: str) -> list:
+    """Ранейшая рэалізацыя Tokenizer.parse цыклам па сімвалах, з якой параўноўваецца сканер па табліцы класаў."""
+    result = []
+    current_word = []
+    current_tail = []
+
+    def append_znak(char: str):
+        if not current_tail:
+            while current_word:
+                last_char = current_word[-1]
+                if normalizer.is_apostrophe(last_char) or last_char == normalizer.DASH:
+                    current_word.pop()
+                    current_tail.insert(0, last_char)
+                else:
+                    break
+        current_tail.append(char)
+
+    def close_word():
+        if current_word:
+            result.append(Token(normalizer.tokinization_normalize("".join(current_word)), TokenType.AlphaNumeric))
+        if current_tail:
+            result.append(Token("".join(current_tail), TokenType.NonAlphaNumeric))
+        current_word.clear()
+        current_tail.clear()
+
+    for char in line.strip():
+        if char == "\n":
+            close_word()
+            result.append(Token(None, TokenType.LineBreak))
+        elif char in ".?!":
+            if not current_word and not current_tail and result and result[-1].type == TokenType.SentenceSeparator:
+                prev = result[-2]
+                if prev.type == TokenType.NonAlphaNumeric:
+                    prev.text += char
+            else:
+                append_znak(char)
+                close_word()
+                result.append(Token(None, TokenType.SentenceSeparator))
+        elif normalizer.is_apostrophe(char) or char == normalizer.DASH:
+            if current_word and not current_tail:
+                current_word.append(char)
+            else:
+                append_znak(char)
+        elif normalizer.is_letter(char) or char in "[]":
+            if current_tail:
+                close_word()
+            current_word.append(char)
+        else:
+            append_znak(char)
+
+    close_word()
+    return result
+
+
 class TestTokenizer(unittest.TestCase):
     def setUp(self):
         self.tokenizer = Tokenizer()
@@ -226,6 +282,30 @@ class TestTokenizer(unittest.TestCase):
             self.assertEqual(actual.text, expected.text)
             self.assertEqual(actual.type, expected.type)
 
+    def test_iter_tokens(self):
+        tokens = self.tokenizer.iter_tokens("Ну... Так")
+        self.assertEqual(next(tokens).text, "Ну")
+        self.assertEqual(
+            [(token.text, token.type) for token in tokens], [("...", TokenType.NonAlphaNumeric), (None, TokenType.SentenceSeparator), (" ", TokenType.NonAlphaNumeric), ("Так", TokenType.AlphaNumeric)]
+        )
+
+    def test_precomposed_stress_in_latin_words(self):
+        tokens = self.tokenizer.parse("Кáва ў café José")
+        self.assertEqual([token.text for token in tokens if token.type == TokenType.AlphaNumeric], ["Ка\u0301ва", "ў", "cafe\u0301", "Jose\u0301"])
+
+    def test_same_as_reference(self):
+        normalizer = Normalizer()
+        alphabet = "абвгдзАБЎўіiIqz09 .?!\n-'ʼ’´\u0301[],:;«»—…\t\xa0😀áÓ+&<"
+        rnd = random.Random(1)
+        for _ in range(20000):
+            text = "".join(rnd.choice(alphabet) for _ in range(rnd.randint(0, 30)))
+            actual = [(token.text, token.type) for token in self.tokenizer.parse(text)]
+            # Токены запісваюцца ў момант, калі генератар іх аддаў: пазней яны мяняцца не павінны
+            streamed = [(token.text, token.type) for token in self.tokenizer.iter_tokens(text)]
+            self.assertEqual(streamed, actual, repr(text))
+            expected = [(token.text, token.type) for token in _reference_parse(normalizer, text)]
+            self.assertEqual(actual, expected, repr(text))
+
 
 if __name__ == "__main__":
     unittest.main()